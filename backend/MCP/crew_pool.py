@@ -0,0 +1,168 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from backend.src.cancellation import current_token
+from backend.src.metrics import record_llm_usage
+
+# ───────────────────── per-request crew pool ────────────────────
+# A Crew and its Tasks/Agents hold per-run state (task outputs, agent
+# executors), so one instance must never serve two requests at once. Each
+# crew module builds fresh crew sets through a CrewPool: LLM clients and tools
+# are module-level and shared, a finished crew set is parked and reused by the
+# next request, and at most `max_concurrency` runs of a crew type are in
+# flight at the same time. A run abandoned by a cancelled search keeps its
+# slot until its worker thread actually stops.
+
+CREW_MAX_CONCURRENCY = int(os.getenv("CREW_MAX_CONCURRENCY", "4"))
+# How often a search waiting for a crew slot checks its CancelToken
+SLOT_POLL_SECONDS = 0.1
+
+
+class CrewPool:
+    def __init__(self, name, build, max_concurrency=CREW_MAX_CONCURRENCY):
+        """
+        Args:
+            name: Crew type, used in logs.
+            build: Zero-argument callable returning a new crew set (an object
+                with a `crew` attribute plus whatever tasks `run` reads).
+            max_concurrency: Concurrent runs allowed for this crew type.
+        """
+        self.name = name
+        self.build = build
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        Checks out a crew set for exclusive use, waiting for a free slot.
+        The wait is also bounded by the current search's CancelToken.
+
+        Raises:
+            TimeoutError: if no slot frees up within `timeout` seconds.
+            SearchCancelled: if the search is cancelled or out of time first.
+        """
+        if not self._wait_for_slot(timeout):
+            raise TimeoutError(f"No free {self.name} crew within {timeout}s")
+        crew_set = None
+        try:
+            with self._lock:
+                crew_set = self._idle.pop() if self._idle else None
+            if crew_set is None:
+                crew_set = self.build()
+            yield crew_set
+        except BaseException:
+            run = _take_abandoned(crew_set)
+            if run is None:
+                # A crew set whose run failed is not reused
+                self._release(None)
+            else:
+                # Hold the slot and the crew set until the orphaned run stops
+                run.add_done_callback(lambda r: self._release(crew_set if r.exception() is None else None))
+            raise
+        self._release(crew_set)
+
+    def _wait_for_slot(self, timeout):
+        token = current_token()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = SLOT_POLL_SECONDS
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return self._slots.acquire(blocking=False)
+                wait = min(wait, remaining)
+            if self._slots.acquire(timeout=wait):
+                return True
+            if token is not None:
+                token.check()
+
+    def _release(self, crew_set):
+        if crew_set is not None:
+            with self._lock:
+                self._idle.append(crew_set)
+        self._slots.release()
+
+
+_weave_projects = set()
+_weave_lock = threading.Lock()
+
+
+def init_weave(project):
+    """weave.init once per process instead of on every run."""
+    with _weave_lock:
+        if project not in _weave_projects:
+            import weave
+
+            weave.init(project)
+            _weave_projects.add(project)
+
+
+# ───────────────────── LLM usage of crew runs ───────────────────
+def record_crew_usage(caller, crew, output):
+    """
+    Counts the LLM calls and tokens of a finished crew run. CrewAI wraps the
+    agents' LLMs in its own (LiteLLM) client, so the usage comes from the
+    run's aggregated token_usage rather than per-call callbacks.
+    """
+    usage = getattr(output, "token_usage", None)
+    if usage is None:
+        return
+    llm = crew.agents[0].llm if crew.agents else None
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or "unknown"
+    record_llm_usage(caller, model, usage.successful_requests, usage.prompt_tokens, usage.completion_tokens)
+
+
+# ───────────────────── cancellable kickoff ──────────────────────
+_abandoned = {}
+_abandoned_lock = threading.Lock()
+
+
+def _take_abandoned(crew_set):
+    """The still-running kickoff a cancelled search left on `crew_set`, if any."""
+    crew = getattr(crew_set, "crew", None)
+    with _abandoned_lock:
+        return _abandoned.pop(id(crew), None)
+
+
+def _start(crew, inputs):
+    """crew.kickoff on its own thread, carrying the caller's cancel token and trace."""
+    run = Future()
+    context = contextvars.copy_context()
+
+    def work():
+        try:
+            run.set_result(context.run(crew.kickoff, inputs=inputs))
+        except BaseException as e:
+            run.set_exception(e)
+
+    threading.Thread(target=work, name="crew-kickoff", daemon=True).start()
+    return run
+
+
+def kickoff(crew, inputs, caller="crew", poll_interval=0.1):
+    """
+    Runs crew.kickoff under the current search's CancelToken and returns as
+    soon as the search is cancelled or out of time (raising SearchCancelled)
+    instead of waiting for every agent iteration. The worker thread stops at
+    its next step_callback/tool check; until then CrewPool.acquire keeps the
+    crew set and its slot. The run's LLM usage is recorded under `caller`.
+    """
+    token = current_token()
+    run = _start(crew, inputs)
+    while True:
+        try:
+            output = run.result(timeout=poll_interval)
+            break
+        except FutureTimeout:
+            if token is not None and token.cancelled:
+                with _abandoned_lock:
+                    _abandoned[id(crew)] = run
+                token.check()
+    record_crew_usage(caller, crew, output)
+    return output
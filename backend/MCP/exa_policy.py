@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from backend.src.cancellation import check_cancelled
+from backend.src.dedup import canonicalize_url
+from backend.src.metrics import observe_external, record_cache
+
+# ───────────────────── Exa search & content policy ──────────────
+# A live crawl is the slowest part of an Exa call. Searches therefore run in
+# two steps: a plain search for EXA_CANDIDATES results (no contents), then,
+# for the best EXA_FETCH_TOP results with distinct canonical URLs, highlights
+# from the per-URL cache or one get_contents call. How hard get_contents
+# crawls depends on the intent: News needs today's version of the page,
+# Research pages rarely change, so Exa's cached copy is used when it has one.
+
+EXA_LIVECRAWL = {
+    "news": os.getenv("EXA_LIVECRAWL_NEWS", "always"),
+    "research": os.getenv("EXA_LIVECRAWL_RESEARCH", "fallback"),
+}
+# Oldest cached highlights (seconds) a search of each intent accepts
+EXA_HIGHLIGHT_TTL = {
+    "news": float(os.getenv("EXA_HIGHLIGHT_TTL_NEWS", "900")),
+    "research": float(os.getenv("EXA_HIGHLIGHT_TTL_RESEARCH", "86400")),
+}
+EXA_CANDIDATES = int(os.getenv("EXA_CANDIDATES", "10"))
+EXA_FETCH_TOP = int(os.getenv("EXA_FETCH_TOP", "5"))
+EXA_HIGHLIGHT_CACHE_SIZE = int(os.getenv("EXA_HIGHLIGHT_CACHE_SIZE", "5000"))
+
+NO_HIGHLIGHTS = "(no highlights found)"
+
+
+class HighlightCache:
+    """
+    LRU of url -> (fetched at, highlights). Freshness is decided by the
+    reader: a page fetched for a Research query an hour ago is fine for
+    Research but too old for News.
+    """
+
+    def __init__(self, max_entries=EXA_HIGHLIGHT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url, max_age):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or time.monotonic() - entry[0] > max_age:
+                return None
+            self._entries.move_to_end(url)
+            return entry[1]
+
+    def put(self, url, highlights):
+        with self._lock:
+            self._entries[url] = (time.monotonic(), highlights)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+HIGHLIGHTS = HighlightCache()
+
+
+def fetch_highlights(exa, urls, intent):
+    """
+    Highlights for `urls` (url -> list of strings), from the cache where
+    fresh and otherwise from a single get_contents call.
+    """
+    found, missing = {}, []
+    for url in urls:
+        cached = HIGHLIGHTS.get(url, max_age=EXA_HIGHLIGHT_TTL[intent])
+        record_cache("exa_highlights", cached is not None)
+        if cached is None:
+            missing.append(url)
+        else:
+            found[url] = cached
+
+    if missing:
+        check_cancelled()
+        with observe_external("exa.contents"):
+            response = exa.get_contents(missing, highlights=True, livecrawl=EXA_LIVECRAWL[intent])
+        for result in response.results:
+            # `id` echoes the requested URL even when Exa resolved a redirect
+            url = result.id if result.id in missing else result.url
+            highlights = list(result.highlights or [])
+            found[url] = highlights
+            HIGHLIGHTS.put(url, highlights)
+    return found
+
+
+def search(exa, query, intent, candidates=EXA_CANDIDATES, fetch_top=EXA_FETCH_TOP, **search_options):
+    """
+    Exa search with contents for the surviving results only.
+
+    Args:
+        intent: "news" or "research"; selects the livecrawl mode and cache TTL.
+        search_options: Passed to exa.search (e.g. category).
+
+    Returns:
+        [{"title", "url", "snippet"}], best first.
+    """
+    check_cancelled()
+    with observe_external("exa"):
+        response = exa.search(query, type="neural", num_results=candidates, **search_options)
+
+    # Exa returns results by relevance; the same page under two URLs would
+    # waste a content fetch. Titles alone are too thin for near-duplicate
+    # matching (untitled PDFs), which runs later on the full results.
+    ranked, seen = [], set()
+    for r in response.results:
+        canonical = canonicalize_url(r.url)
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+        ranked.append({"title": r.title or "", "url": r.url})
+        if len(ranked) == fetch_top:
+            break
+    highlights = fetch_highlights(exa, [item["url"] for item in ranked], intent)
+    return [
+        {**item, "snippet": " ".join(highlights.get(item["url"]) or [NO_HIGHLIGHTS])}
+        for item in ranked
+    ]
@@ -0,0 +1,111 @@
+import codecs
+import json
+
+# ───────────────────── streaming JSON arrays ────────────────────
+# Search APIs wrap their results in one array ({"articles": [...]}). Reading
+# the body chunk by chunk and decoding one element at a time lets a tool stop
+# after the records it needs, project each one down to the fields the router
+# reads, and never hold the full response text and parsed document at once.
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+# Start of the body kept for errors (APIs answer some errors as HTTP 200 text)
+_HEAD_CHARS = 200
+
+
+class _Buffer:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self.head = ""
+
+    def fill(self):
+        """Appends the next chunk; False once the body is exhausted."""
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                if len(self.head) <= _HEAD_CHARS:
+                    self.head += text[:_HEAD_CHARS + 1 - len(self.head)]
+                # Drop what has been consumed so the buffer stays one element long
+                self.text = self.text[self.pos:] + text
+                self.pos = 0
+                return True
+        self.eof = True
+        return False
+
+    def skip(self, chars):
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in chars:
+                self.pos += 1
+            if self.pos < len(self.text) or not self.fill():
+                return
+
+    def peek(self):
+        self.skip(_WHITESPACE)
+        return self.text[self.pos] if self.pos < len(self.text) else None
+
+
+def _seek_array(buf, key):
+    marker = f'"{key}"'
+    while True:
+        found = buf.text.find(marker, buf.pos)
+        if found != -1:
+            buf.pos = found + len(marker)
+            buf.skip(_WHITESPACE + ":")
+            if buf.peek() == "[":
+                buf.pos += 1
+                return True
+            continue
+        # Keep a tail in case the key straddles two chunks
+        buf.pos = max(buf.pos, len(buf.text) - len(marker))
+        if not buf.fill():
+            return False
+
+
+def iter_json_array(chunks, key, limit=None):
+    """
+    Yields the elements of the array stored under `key` in a JSON object
+    streamed as `chunks` (bytes or str, e.g. response.iter_content()).
+
+    Args:
+        key: Name of the array, matched at any depth (first occurrence).
+        limit: Stop after this many elements without reading the rest.
+
+    Raises:
+        ValueError: if an element is not valid JSON, or the body is neither
+            empty, an empty JSON object/array, nor contains `key`.
+    """
+    buf = _Buffer(chunks)
+    buf.fill()
+    if not _seek_array(buf, key):
+        body = buf.head.strip()
+        # No results: GDELT sends "{}"
+        if len(buf.head) <= _HEAD_CHARS and "".join(body.split()) in ("", "{}", "[]"):
+            return
+        head = body[:_HEAD_CHARS] + ("…" if len(buf.head) > _HEAD_CHARS else "")
+        raise ValueError(f"No '{key}' array in response: {head!r}")
+
+    count = 0
+    while limit is None or count < limit:
+        buf.skip(_WHITESPACE + ",")
+        if buf.peek() in (None, "]"):
+            return
+        while True:
+            try:
+                element, end = _decoder.raw_decode(buf.text, buf.pos)
+            except json.JSONDecodeError as e:
+                # Incomplete element: read more, unless there is nothing left
+                if buf.fill():
+                    continue
+                raise ValueError(f"Invalid JSON in '{key}' array: {e}") from e
+            # A bare number may continue in the next chunk
+            if end == len(buf.text) and not buf.eof and not isinstance(element, (dict, list, str)):
+                if buf.fill():
+                    continue
+            break
+        buf.pos = end
+        count += 1
+        yield element
@@ -6,16 +6,19 @@ import os
 import json
 
 # Import tool classes from newscrew and researchcrew
-from backend.MCP.newscrew import NewsAPISearchTool, GDELTSearchTool, ExaSearchTool as NewsExaSearchTool, NewsSearchInput, SearchInput as NewsSearchInputSimple
+from backend.MCP.newscrew import NewsAPISearchTool, GDELTSearchTool, ExaSearchTool as NewsExaSearchTool, NewsSearchInput, GDELTSearchInput, SearchInput as NewsSearchInputSimple
 from backend.MCP.researchcrew import ExaSearchTool as ResearchExaSearchTool, ArxivSearchTool, SemanticScholarSearchTool, SearchInput as ResearchSearchInput
+from backend.src.metrics import init_fastapi
 
 app = FastAPI(title="MCP Tool Server", description="Expose News and Research tools via FastAPI.")
+# Request metrics + GET /metrics
+init_fastapi(app)
 
 # --- News Tools Input Schemas ---
 class NewsAPISearchRequest(NewsSearchInput):
     pass
 
-class GDELTSearchRequest(NewsSearchInput):
+class GDELTSearchRequest(GDELTSearchInput):
     pass
 
 class NewsExaSearchRequest(NewsSearchInputSimple):
@@ -65,7 +68,8 @@ def gdelt_search(req: GDELTSearchRequest):
         result = tool._run(
             query=req.query,
             from_date=req.from_date,
-            to_date=req.to_date
+            to_date=req.to_date,
+            max_records=req.max_records
         )
         return json.loads(result) if isinstance(result, str) else result
     except Exception as e:
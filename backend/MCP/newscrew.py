@@ -6,6 +6,7 @@
 import os, json, requests, subprocess
 from datetime import datetime, timedelta
 from textwrap import dedent
+from types import SimpleNamespace
 from typing import Type
 import subprocess
 from exa_py import Exa
@@ -15,11 +16,25 @@ from crewai import Agent, Crew, Process, Task
 from crewai.tools import BaseTool
 from langchain_openai import ChatOpenAI
 import weave
+from backend.src.metrics import observe_external
+from backend.src.cancellation import tool_timeout, step_callback
+from backend.MCP.crew_pool import CrewPool, kickoff
+from backend.MCP.json_stream import iter_json_array
+from backend.MCP import exa_policy
+from backend.MCP.tool_output import compact, token_budget, KEY_LEGEND
+from backend.src import dedup
 
 load_dotenv('backend/.env')
 # ──────────────────────── load env vars ───────────────────────
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 OPENAI_MODEL = "gpt-4o"
+# Upstream endpoints (overridable so load tests can point at local fakes)
+EXA_BASE_URL = os.getenv("EXA_BASE_URL", "https://api.exa.ai")
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+GDELT_API_URL = os.getenv("GDELT_API_URL", "https://api.gdeltproject.org/api/v2/doc/doc")
+# Articles requested per GDELT call (the API allows up to 250)
+GDELT_MAX_RECORDS = int(os.getenv("GDELT_MAX_RECORDS", "20"))
+GDELT_MAX_RECORDS_LIMIT = 250
 
 # ────────────────────────── schemas ───────────────────────────
 class SearchInput(BaseModel):
@@ -38,10 +53,17 @@ class NewsSearchInput(SearchInput):
         default=None, description="End date YYYY-MM-DD")
     language: str | None = Field(default="en", description="2-letter code")
 
+
+class GDELTSearchInput(NewsSearchInput):
+    """Adds how many articles to fetch."""
+    max_records: int | None = Field(
+        default=None, ge=1, le=GDELT_MAX_RECORDS_LIMIT,
+        description="Articles to return (default: the tool's limit)")
+
 # ──────────────────────── search tools ────────────────────────
 class ExaSearchTool(BaseTool):
     name: str = "exa_search"
-    description: str = "Search Exa for tutorials, blogs, repos, PDFs."
+    description: str = "Search Exa for tutorials, blogs, repos, PDFs. " + KEY_LEGEND
     args_schema: Type[BaseModel] = SearchInput
 
     def _run(self, query: str, **_) -> str:
@@ -53,36 +75,21 @@ class ExaSearchTool(BaseTool):
             except Exception as e:
                 return f"[Exa input parsing error] {e}"
         try:
-            exa = Exa(api_key=os.getenv("EXA_API_KEY"))
+            exa = Exa(api_key=os.getenv("EXA_API_KEY"), base_url=EXA_BASE_URL)
             print(query)
-            results = exa.search_and_contents(
-                query,
-                type="neural",
-                num_results=5,
-                highlights=True,
-                livecrawl="always"
-            )
-
-            parsed = [
-                {
-                    "title": result.title,
-                    "url": result.url,
-                    "snippet": " ".join(result.highlights or ["(no highlights found)"])
-                }
-                for result in results.results
-            ]
-            return json.dumps(parsed, indent=2)
+            parsed = exa_policy.search(exa, query, intent="news")
+            return compact(parsed, budget=token_budget(self.name))
         except Exception as e:
             return f'[Exa search failed via SDK] {e}'
 class NewsAPISearchTool(BaseTool):
     """Live/archived news via NewsAPI.org "everything" endpoint."""
     name: str = "news_api_search"
-    description: str = "Search NewsAPI for up-to-the-minute headlines & articles."
+    description: str = "Search NewsAPI for up-to-the-minute headlines & articles. " + KEY_LEGEND
     args_schema: Type[BaseModel] = NewsSearchInput
 
     def _run(self, query: str, from_date: str | None = None,
              to_date: str | None = None, language: str = "en", **_) -> str:
-        url = "https://newsapi.org/v2/everything"
+        url = NEWS_API_URL
         params = {
             "q": query,
             "pageSize": 10,
@@ -94,34 +101,38 @@ class NewsAPISearchTool(BaseTool):
             params["from"] = from_date
         if to_date:
             params["to"] = to_date
-        r = requests.get(url, params=params, timeout=15)
-        r.raise_for_status()
+        with observe_external("news_api"):
+            r = requests.get(url, params=params, timeout=tool_timeout(15))
+            r.raise_for_status()
         items = r.json().get("articles", [])
         # strip down to essentials
         slim = [
             {"title": a["title"], "url": a["url"],
-             "snippet": (a.get("description") or "")[:180]}
+             "snippet": a.get("description") or ""}
             for a in items
         ]
-        return json.dumps(slim, indent=2)
+        return compact(dedupe(slim), budget=token_budget(self.name))
 
 class GDELTSearchTool(BaseTool):
     """Historical & global coverage via the GDELT DOC 2.0 API."""
     name: str = "gdelt_search"
-    description: str = "Query the GDELT 2.0 Doc API for worldwide news archives."
-    args_schema: Type[BaseModel] = NewsSearchInput
+    description: str = "Query the GDELT 2.0 Doc API for worldwide news archives. " + KEY_LEGEND
+    args_schema: Type[BaseModel] = GDELTSearchInput
+    max_records: int = GDELT_MAX_RECORDS
 
     def _run(self, query: str, from_date: str | None = None,
-             to_date: str | None = None, **_) -> str:
+             to_date: str | None = None, max_records: int | None = None, **_) -> str:
         # format YYMMDDhhmmss; default span = last 24 h
         def gd_fmt(date_str: str) -> str:
             return date_str.replace("-", "") + "000000"
 
-        url = "https://api.gdeltproject.org/api/v2/doc/doc"
+        limit = min(max_records or self.max_records, GDELT_MAX_RECORDS_LIMIT)
+        url = GDELT_API_URL
         params = {
             "query": query,
             "mode": "ArtList",
-            "maxrecords": 50,
+            # Trimmed server side: only `limit` articles are generated and sent
+            "maxrecords": limit,
             "format": "json",
         }
         if from_date:
@@ -130,82 +141,89 @@ class GDELTSearchTool(BaseTool):
         if to_date:
             params["filter"] = params.get("filter", "") + \
                 f" AND Date<={gd_fmt(to_date)}"  # append
-        r = requests.get(url, params=params, timeout=20)
-        r.raise_for_status()
-        items = r.json().get("articles", [])
-        slim = [
-            {"title": a["title"], "url": a["url"],
-             "snippet": (a.get("source") or "") + " • " + a.get("seendate", "")}
-            for a in items
-        ]
-        return json.dumps(slim, indent=2)
+        with observe_external("gdelt"):
+            with requests.get(url, params=params, timeout=tool_timeout(20), stream=True) as r:
+                r.raise_for_status()
+                # Decoded article by article and projected to the fields the
+                # router reads; the connection is dropped once `limit` are in
+                slim = [
+                    {"title": a.get("title", ""), "url": a.get("url", ""),
+                     "snippet": (a.get("domain") or a.get("source") or "") + " • " + a.get("seendate", "")}
+                    for a in iter_json_array(r.iter_content(chunk_size=16384), "articles", limit=limit)
+                ]
+        return compact(dedupe(slim), budget=token_budget(self.name))
 
 # ───────────────────── router helper ───────────────────────────
 def dedupe(sources: list[dict]) -> list[dict]:
-    """Remove near-duplicate headlines (same leading fragment)."""
-    seen, uniq = set(), []
-    for it in sources:
-        key = it["title"].split(" - ")[0].lower()
-        if key not in seen:
-            seen.add(key); uniq.append(it)
-    return uniq
-
-# ───────────────────────── agents ─────────────────────────────
-router = Agent(
-    role="News Router",
-    backstory=dedent("""\
-        You decide which search tool(s) fit the request and collect sources.
-        • If the prompt contains 'news', 'headline', 'today', 'latest',
-          or a recent date, use **news_api_search**.
-        • If it asks about coverage over time ('since 2022', 'evolution',
-          'trend'), add **gdelt_search**.
-        • Add **exa_search** for tutorials, blog context, or developer angles.
-        You must call the tools and return the raw results for processing."""),
-    goal="Pick tools, fetch results, return raw source data.",
-    tools=[NewsAPISearchTool(), GDELTSearchTool(), ExaSearchTool()],
-    llm=ChatOpenAI(model_name=OPENAI_MODEL, temperature=0.3, api_key=OPENAI_API_KEY),
-    allow_delegation=False,
-    verbose=True,
-    max_iter=4,
-)
-
-# ───────────────────────── tasks ──────────────────────────────
-router_task = Task(
-    description=dedent("""
-        **Step 1 – Collect sources**
-
-        Topic: {{topic}}
-
-        • Use appropriate search tools to find relevant news articles
-        • Focus on recent, credible sources
-        • Collect the raw search results with titles, URLs, and snippets
-    """),
-    expected_output="Raw search results from news tools.",
-    agent=router,
-)
-
-
-# ───────────────────────── crew ───────────────────────────────
-crew = Crew(
-    agents=[router],
-    tasks=[router_task],
-    process=Process.sequential,
-    verbose=True,
-)
+    """Remove near-duplicates (canonical URL match or SimHash of title + snippet)."""
+    return dedup.dedupe(sources)
+
+# ──────────────── shared LLM client & tools ───────────────────
+# Stateless and safe to share; agents/tasks/crews are built per run
+ROUTER_LLM = ChatOpenAI(model_name=OPENAI_MODEL, temperature=0.3, api_key=OPENAI_API_KEY)
+ROUTER_TOOLS = [NewsAPISearchTool(), GDELTSearchTool(), ExaSearchTool()]
+
+# ─────────────────────── crew factory ─────────────────────────
+def build_crew():
+    router = Agent(
+        role="News Router",
+        backstory=dedent("""\
+            You decide which search tool(s) fit the request and collect sources.
+            • If the prompt contains 'news', 'headline', 'today', 'latest',
+              or a recent date, use **news_api_search**.
+            • If it asks about coverage over time ('since 2022', 'evolution',
+              'trend'), add **gdelt_search**.
+            • Add **exa_search** for tutorials, blog context, or developer angles.
+            You must call the tools and return the raw results for processing."""),
+        goal="Pick tools, fetch results, return raw source data.",
+        tools=ROUTER_TOOLS,
+        llm=ROUTER_LLM,
+        allow_delegation=False,
+        verbose=True,
+        max_iter=4,
+    )
+
+    router_task = Task(
+        description=dedent("""
+            **Step 1 – Collect sources**
+
+            Topic: {{topic}}
+
+            • Use appropriate search tools to find relevant news articles
+            • Focus on recent, credible sources
+            • Collect the raw search results with titles, URLs, and snippets
+        """),
+        expected_output="Raw search results from news tools.",
+        agent=router,
+    )
+
+    crew = Crew(
+        agents=[router],
+        tasks=[router_task],
+        process=Process.sequential,
+        verbose=True,
+        step_callback=step_callback,
+    )
+    return SimpleNamespace(crew=crew, router_task=router_task)
+
+
+CREWS = CrewPool("news", build_crew)
 
 # ──────────────────────── entry point ─────────────────────────
 def run(topic: str):
     inputs = {"topic": topic,
               "current_date": datetime.now().strftime("%Y-%m-%d")}
-    final = crew.kickoff(inputs=inputs)
+    with CREWS.acquire() as crew_set:
+        final = kickoff(crew_set.crew, inputs=inputs, caller="crew.news")
+        router_output = crew_set.router_task.output
 
     # Get highlight-source pairs from highlighter output
     results = []
     try:
-        if hasattr(router_task.output, 'raw'):
-            output_str = router_task.output.raw
+        if hasattr(router_output, 'raw'):
+            output_str = router_output.raw
         else:
-            output_str = str(router_task.output)
+            output_str = str(router_output)
 
         # Try to parse as JSON
         try:
@@ -220,4 +238,4 @@ def run(topic: str):
         print(f"Error parsing output: {e}")
         results = []
 
-    return output_str
\ No newline at end of file
+    return output_str
@@ -2,13 +2,17 @@ import requests
 import os
 from datetime import datetime
 from textwrap import dedent
+from types import SimpleNamespace
 from typing import Type
 from pydantic import BaseModel, Field
 from crewai import Agent, Crew, Process, Task
 from crewai.tools import BaseTool
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-import weave
+from backend.MCP.crew_pool import CrewPool, kickoff, init_weave
+from backend.MCP.tool_output import relay, KEY_LEGEND
+from backend.src.metrics import observe_external
+from backend.src.cancellation import tool_timeout, step_callback
 
 # Load environment variables
 load_dotenv('backend/.env')
@@ -25,138 +29,158 @@ class NewsSearchInput(SearchInput):
     to_date: str | None = Field(default=None, description="End date YYYY-MM-DD")
     language: str | None = Field(default="en", description="2-letter code")
 
+class GDELTSearchInput(NewsSearchInput):
+    max_records: int | None = Field(default=None, description="Articles to return (default: server limit)")
+
 # --- HTTP Tool Wrappers ---
 class NewsAPISearchHTTPTool(BaseTool):
     name: str = "news_api_search"
-    description: str = "Search NewsAPI via MCP server."
+    description: str = "Search NewsAPI via MCP server. " + KEY_LEGEND
     args_schema: Type[BaseModel] = NewsSearchInput
 
     def _run(self, query: str, from_date: str = None, to_date: str = None, language: str = "en", **_):
         url = f"{MCP_BASE_URL}/news/news_api_search"
         payload = {"query": query, "from_date": from_date, "to_date": to_date, "language": language}
-        resp = requests.post(url, json=payload, timeout=20)
-        resp.raise_for_status()
-        return resp.json()
+        with observe_external("mcp.news_api_search"):
+            resp = requests.post(url, json=payload, timeout=tool_timeout(20))
+            resp.raise_for_status()
+        return relay(resp.json())
 
 class GDELTSearchHTTPTool(BaseTool):
     name: str = "gdelt_search"
-    description: str = "Search GDELT via MCP server."
-    args_schema: Type[BaseModel] = NewsSearchInput
+    description: str = "Search GDELT via MCP server. " + KEY_LEGEND
+    args_schema: Type[BaseModel] = GDELTSearchInput
 
-    def _run(self, query: str, from_date: str = None, to_date: str = None, **_):
+    def _run(self, query: str, from_date: str = None, to_date: str = None, max_records: int = None, **_):
         url = f"{MCP_BASE_URL}/news/gdelt_search"
-        payload = {"query": query, "from_date": from_date, "to_date": to_date}
-        resp = requests.post(url, json=payload, timeout=20)
-        resp.raise_for_status()
-        return resp.json()
+        payload = {"query": query, "from_date": from_date, "to_date": to_date, "max_records": max_records}
+        with observe_external("mcp.gdelt_search"):
+            resp = requests.post(url, json=payload, timeout=tool_timeout(20))
+            resp.raise_for_status()
+        return relay(resp.json())
 
 class ExaSearchHTTPTool(BaseTool):
     name: str = "exa_search"
-    description: str = "Search Exa via MCP server."
+    description: str = "Search Exa via MCP server. " + KEY_LEGEND
     args_schema: Type[BaseModel] = SearchInput
 
     def _run(self, query: str, **_):
         url = f"{MCP_BASE_URL}/news/exa_search"
         payload = {"query": query}
-        resp = requests.post(url, json=payload, timeout=20)
-        resp.raise_for_status()
-        return resp.json()
-
-# --- Agents (same as newscrew.py, but use HTTP tools) ---
-router = Agent(
-    role="News Router",
-    backstory=dedent("""
-        You decide which search tool(s) fit the request.
-        • If the prompt contains 'news', 'headline', 'today', 'latest',
-          or a recent date, use **news_api_search**.
-        • If it asks about coverage over time ('since 2022', 'evolution',
-          'trend'), add **gdelt_search**.
-        • Add **exa_search** for tutorials, blog context, or developer angles.
-        You may call multiple tools and must return a single JSON array
-        named `sources` (5-10 de-duplicated items)."""),
-    goal="Pick tools, fetch results, emit a `sources` JSON list.",
-    tools=[NewsAPISearchHTTPTool(), GDELTSearchHTTPTool(), ExaSearchHTTPTool()],
-    llm=ChatOpenAI(model_name="gpt-4o-mini", temperature=0.3),
-    allow_delegation=False,
-    verbose=True,
-    max_iter=4,
-)
-
-summariser = Agent(
-    role="News Explainer",
-    backstory="Turns raw links into short, beginner-friendly news digests.",
-    goal="Produce clear, date-stamped news notes.",
-    tools=[],
-    llm=ChatOpenAI(model_name="gpt-4o-mini", temperature=0.55),
-    allow_delegation=False,
-    verbose=True,
-    max_iter=4,
-)
-
-# --- Tasks (same as newscrew.py) ---
-router_task = Task(
-    description=dedent("""
-        **Step 1 – Pick tools & collect sources**
-
-        Topic: {{topic}}
-
-        • Decide which of `news_api_search`, `gdelt_search`, `exa_search`
-          (or a combo) is appropriate.
-        • Call them.  Merge and de-duplicate the results with `title`, `url`,
-          and `snippet`.  Keep 5–10 items max.
-        • Return exactly *one* JSON list named `sources`.
-    """),
-    expected_output="JSON list of 5-10 sources.",
-    agent=router,
-)
-
-summary_task = Task(
-    description=dedent("""
-        **Step 2 – Write digest**
-
-        For every item in `router_output.json`, craft:
-
-        ### *Headline* (Outlet, YYYY-MM-DD)
-        **What happened:** …  
-        **Why it matters:** …  
-        **Source:** <url>
-
-        • Keep each block ≈60-80 words.
-        • Use plain English and minimal jargon.
-    """),
-    expected_output="Markdown digest for each source.",
-    agent=summariser,
-    context=[router_task],
-)
-
-# --- Crew ---
-crew = Crew(
-    agents=[router, summariser],
-    tasks=[router_task, summary_task],
-    process=Process.sequential,
-    verbose=True,
-)
+        with observe_external("mcp.exa_search"):
+            resp = requests.post(url, json=payload, timeout=tool_timeout(20))
+            resp.raise_for_status()
+        return relay(resp.json())
+
+# --- Shared LLM clients & tools (stateless; agents/tasks/crews are built per run) ---
+ROUTER_LLM = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.3)
+SUMMARY_LLM = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.55)
+ROUTER_TOOLS = [NewsAPISearchHTTPTool(), GDELTSearchHTTPTool(), ExaSearchHTTPTool()]
+
+# --- Crew factory ---
+def build_crew():
+    # --- Agents (same as newscrew.py, but use HTTP tools) ---
+    router = Agent(
+        role="News Router",
+        backstory=dedent("""
+            You decide which search tool(s) fit the request.
+            • If the prompt contains 'news', 'headline', 'today', 'latest',
+              or a recent date, use **news_api_search**.
+            • If it asks about coverage over time ('since 2022', 'evolution',
+              'trend'), add **gdelt_search**.
+            • Add **exa_search** for tutorials, blog context, or developer angles.
+            You may call multiple tools and must return a single JSON array
+            named `sources` (5-10 de-duplicated items)."""),
+        goal="Pick tools, fetch results, emit a `sources` JSON list.",
+        tools=ROUTER_TOOLS,
+        llm=ROUTER_LLM,
+        allow_delegation=False,
+        verbose=True,
+        max_iter=4,
+    )
+
+    summariser = Agent(
+        role="News Explainer",
+        backstory="Turns raw links into short, beginner-friendly news digests.",
+        goal="Produce clear, date-stamped news notes.",
+        tools=[],
+        llm=SUMMARY_LLM,
+        allow_delegation=False,
+        verbose=True,
+        max_iter=4,
+    )
+
+    # --- Tasks (same as newscrew.py) ---
+    router_task = Task(
+        description=dedent("""
+            **Step 1 – Pick tools & collect sources**
+
+            Topic: {{topic}}
+
+            • Decide which of `news_api_search`, `gdelt_search`, `exa_search`
+              (or a combo) is appropriate.
+            • Call them.  Merge and de-duplicate the results with `title`, `url`,
+              and `snippet`.  Keep 5–10 items max.
+            • Return exactly *one* JSON list named `sources`.
+        """),
+        expected_output="JSON list of 5-10 sources.",
+        agent=router,
+    )
+
+    summary_task = Task(
+        description=dedent("""
+            **Step 2 – Write digest**
+
+            For every item in `router_output.json`, craft:
+
+            ### *Headline* (Outlet, YYYY-MM-DD)
+            **What happened:** …  
+            **Why it matters:** …  
+            **Source:** <url>
+
+            • Keep each block ≈60-80 words.
+            • Use plain English and minimal jargon.
+        """),
+        expected_output="Markdown digest for each source.",
+        agent=summariser,
+        context=[router_task],
+    )
+
+    crew = Crew(
+        agents=[router, summariser],
+        tasks=[router_task, summary_task],
+        process=Process.sequential,
+        verbose=True,
+        step_callback=step_callback,
+    )
+    return SimpleNamespace(crew=crew, router_task=router_task, summary_task=summary_task)
+
+
+CREWS = CrewPool("news", build_crew)
 
 def run(topic: str):
-    weave.init("crewai-ai-news-agent")
+    init_weave("crewai-ai-news-agent")
     inputs = {"topic": topic, "current_date": datetime.now().strftime("%Y-%m-%d")}
-    final = crew.kickoff(inputs=inputs)
+    with CREWS.acquire() as crew_set:
+        final = kickoff(crew_set.crew, inputs=inputs, caller="crew.news")
+        output_file = crew_set.router_task.output_file
+        summary_output = crew_set.summary_task.output
     sources = []
-    if router_task.output_file:
+    if output_file:
         try:
-            with open(router_task.output_file, 'r') as f:
+            with open(output_file, 'r') as f:
                 sources = json.loads(f.read())
         except Exception as e:
             print(f"Error reading sources: {e}")
             sources = []
     result = {
         "topic": topic,
-        "digest": str(summary_task.output) if summary_task.output else "",
+        "digest": str(summary_output) if summary_output else "",
         "links": sources,
         "timestamp": datetime.now().isoformat()
     }
     print("\n\n### NEWS DIGEST (HTTP) ###\n")
-    print(summary_task.output)
+    print(summary_output)
     print(f"\n### LINKS (JSON) ###\n")
     print(result)
     return result
@@ -1,9 +1,10 @@
 # learning_assistant.py – prompts tweaked for general learning, SerpAPI version
 import os, json, requests
-from datetime import datetime
 from textwrap import dedent
+from types import SimpleNamespace
 from typing import Type
 import subprocess
+import threading
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field, constr
 from crewai import Agent, Crew, Process, Task
@@ -11,6 +12,12 @@ from crewai.tools import BaseTool
 from exa_py import Exa
 from langchain_openai import ChatOpenAI
 from langchain_community.utilities import ArxivAPIWrapper
+from backend.src.metrics import observe_external
+from backend.src.cancellation import check_cancelled, tool_timeout, step_callback
+from backend.MCP.crew_pool import CrewPool, kickoff, record_crew_usage
+from backend.MCP import exa_policy
+from backend.MCP.tool_output import compact, fit_text, token_budget, KEY_LEGEND
+from backend.src.query_expansion import expand_query, remember_rewrite
 
 import os, requests, json
 from pydantic import BaseModel, Field, constr
@@ -20,6 +27,11 @@ from typing import Type
 # ───────────────────────────────────────────────────────────────
 load_dotenv()                         # SERPAPI_API_KEY, S2_API_KEY must be set
 OPENAI_MODEL = "gpt-4o-mini"
+# Upstream endpoints (overridable so load tests can point at local fakes)
+EXA_BASE_URL = os.getenv("EXA_BASE_URL", "https://api.exa.ai")
+S2_API_URL = os.getenv("S2_API_URL", "https://api.semanticscholar.org/graph/v1/paper/search")
+# Also run the LLM query enhancer, concurrently and off the critical path
+RESEARCH_LLM_ENHANCER = os.getenv("RESEARCH_LLM_ENHANCER", "0") == "1"
 
 # ────────────────────────── generic schema ─────────────────────
 class SearchInput(BaseModel):
@@ -31,7 +43,7 @@ class SearchInput(BaseModel):
 # ────────────────────────── search tools ───────────────────────
 class ExaSearchTool(BaseTool):
     name: str = "exa_search"
-    description: str = "Search Exa for tutorials, blogs, repos, PDFs."
+    description: str = "Search Exa for tutorials, blogs, repos, PDFs. " + KEY_LEGEND
     args_schema: Type[BaseModel] = SearchInput
 
     def _run(self, query: str, **_) -> str:
@@ -43,25 +55,10 @@ class ExaSearchTool(BaseTool):
             except Exception as e:
                 return f"[Exa input parsing error] {e}"
         try:
-            exa = Exa(api_key=os.getenv("EXA_API_KEY"))
+            exa = Exa(api_key=os.getenv("EXA_API_KEY"), base_url=EXA_BASE_URL)
             print(query)
-            results = exa.search_and_contents(
-                query,
-                type="neural",
-                num_results=5,
-                highlights=True,
-                livecrawl="always"
-            )
-
-            parsed = [
-                {
-                    "title": result.title,
-                    "url": result.url,
-                    "snippet": " ".join(result.highlights or ["(no highlights found)"])
-                }
-                for result in results.results
-            ]
-            return json.dumps(parsed, indent=2)
+            parsed = exa_policy.search(exa, query, intent="research")
+            return compact(parsed, budget=token_budget(self.name))
         except Exception as e:
             return f'[Exa search failed via SDK] {e}'
 class ArxivSearchTool(BaseTool):
@@ -71,15 +68,18 @@ class ArxivSearchTool(BaseTool):
     _wrapper = ArxivAPIWrapper(load_max_docs=5)
     def _run(self, query: str, **_) -> str:
         try:
-            return self._wrapper.run(query)
+            check_cancelled()
+            with observe_external("arxiv"):
+                text = self._wrapper.run(query)
+            return fit_text(text, budget=token_budget(self.name))
         except Exception as e:
             return f"[arXiv search failed] {e}"
 
 class SemanticScholarSearchTool(BaseTool):
     name: str = "s2_search"
-    description: str = "Search Semantic Scholar for metadata & citations."
+    description: str = "Search Semantic Scholar for metadata & citations. " + KEY_LEGEND
     args_schema: Type[BaseModel] = SearchInput
-    S2_ENDPOINT: str = "https://api.semanticscholar.org/graph/v1/paper/search"
+    S2_ENDPOINT: str = S2_API_URL
     def _run(self, query: str, **_) -> str:
         params = {
             "query": query, "limit": 5,
@@ -87,90 +87,155 @@ class SemanticScholarSearchTool(BaseTool):
         }
         headers = {"x-api-key": os.getenv("S2_API_KEY")}
         try:
-            r = requests.get(self.S2_ENDPOINT, params=params,
-                             headers=headers, timeout=15)
-            r.raise_for_status()
-            return json.dumps(r.json(), indent=2)
+            with observe_external("semantic_scholar"):
+                r = requests.get(self.S2_ENDPOINT, params=params,
+                                 headers=headers, timeout=tool_timeout(15))
+                r.raise_for_status()
+            # Projected: the raw response nests authors as objects with ids
+            papers = [
+                {"title": p.get("title"), "url": p.get("url"), "year": p.get("year"),
+                 "venue": p.get("venue"), "citations": p.get("citationCount"),
+                 "authors": ", ".join(a.get("name", "") for a in (p.get("authors") or [])[:3])}
+                for p in r.json().get("data") or []
+            ]
+            return compact(papers, budget=token_budget(self.name))
         except Exception as e:
             return f"[Semantic Scholar search failed] {e}"
 
-enhancer = Agent(
-    role="Query Enhancer",
-    backstory=dedent("""
-        You are an expert at rewriting and expanding search queries for news and research. Your job is to take a user-provided topic and turn it into a clear, detailed, and effective search query that will yield the best results from search.
-    """),
-    goal="Rewrite or expand the topic into a more effective search query.",
-    tools=[],
-    llm=ChatOpenAI(model_name=OPENAI_MODEL, temperature=0.4),
-    allow_delegation=False,
-    verbose=True,
-    max_iter=2,
-)
-# ────────────────────────── agents ─────────────────────────────
-router = Agent(
-    role="Learning Router",
-    backstory=(
-        "You triage a learner’s topic and pick the best retrieval tool(s).\n"
-        "• If it sounds like general learning (tutorial, how-to, basics, guide), "
-        "favour **serpapi_search** for blogs, docs, repos.\n"
-        "• If it sounds like deep research (paper, benchmark, SOTA, citation), "
-        "favour **arxiv_search** and **s2_search**.\n"
-        "You may call several tools for a balanced view and return raw JSON."
-    ),
-    goal="Select the right tools and fetch 5–10 useful sources.",
-    tools=[ExaSearchTool(), ArxivSearchTool(), SemanticScholarSearchTool()],
-    allow_delegation=False, verbose=True, max_iter=4,
-    llm=ChatOpenAI(model_name=OPENAI_MODEL, temperature=0.4),
-)
-enhance_task = Task(
-    description=dedent("""
-        **Step 0 – Enhance the query for better search
-            Take the userprovided query and enhance to be more clear and detailed}**
-
-    """),
-    expected_output="A rewritten or expanded search query string.",
-    agent=enhancer,
-)
-# ────────────────────────── tasks ──────────────────────────────
-router_task = Task(
-    description=dedent(
-        """
-        **Step 1 – Choose the right sources**
-
-        Topic: {{topic}}
-
-        • Decide whether this looks like a *general learning* request or a
-          *research-level* request (inspect keywords).
-        • Prefer **serpapi_search** for tutorials / guides, **arxiv_search** + **s2_search**
-          for research. Use both categories if helpful.
-        • Return a JSON list called `sources` each item:
-
-          {"title": "...", "url": "...", "snippet": "...",
-           "source": "serpapi|arxiv|s2"}
-        """
-    ),
-    expected_output="JSON list of 5–10 sources.",
-    agent=router,
-    context={enhance_task}
-)
-
-# ────────────────────────── crew ───────────────────────────────
-crew = Crew(
-    agents=[enhancer, router],
-    tasks=[enhance_task,router_task],
-    process=Process.sequential,
-    verbose=True,
-)
+# ─────────────────── shared LLM client & tools ──────────────────
+# Stateless and safe to share; agents/tasks/crews are built per run
+AGENT_LLM = ChatOpenAI(model_name=OPENAI_MODEL, temperature=0.4)
+ROUTER_TOOLS = [ExaSearchTool(), ArxivSearchTool(), SemanticScholarSearchTool()]
+
+# ────────────────────────── crew factories ─────────────────────
+def build_crew():
+    router = Agent(
+        role="Learning Router",
+        backstory=(
+            "You triage a learner’s topic and pick the best retrieval tool(s).\n"
+            "• If it sounds like general learning (tutorial, how-to, basics, guide), "
+            "favour **serpapi_search** for blogs, docs, repos.\n"
+            "• If it sounds like deep research (paper, benchmark, SOTA, citation), "
+            "favour **arxiv_search** and **s2_search**.\n"
+            "You may call several tools for a balanced view and return raw JSON."
+        ),
+        goal="Select the right tools and fetch 5–10 useful sources.",
+        tools=ROUTER_TOOLS,
+        allow_delegation=False, verbose=True, max_iter=4,
+        llm=AGENT_LLM,
+    )
+
+    router_task = Task(
+        description=dedent(
+            """
+            **Step 1 – Choose the right sources**
+
+            Topic: {{topic}}
+            Search terms: {{search_terms}}
+
+            • Decide whether this looks like a *general learning* request or a
+              *research-level* request (inspect keywords).
+            • Build tool queries from the topic and the search terms (keywords,
+              expanded acronyms, related concepts).
+            • Prefer **serpapi_search** for tutorials / guides, **arxiv_search** + **s2_search**
+              for research. Use both categories if helpful.
+            • Return a JSON list called `sources` each item:
+
+              {"title": "...", "url": "...", "snippet": "...",
+               "source": "serpapi|arxiv|s2"}
+            """
+        ),
+        expected_output="JSON list of 5–10 sources.",
+        agent=router,
+    )
+
+    crew = Crew(
+        agents=[router],
+        tasks=[router_task],
+        process=Process.sequential,
+        verbose=True,
+        step_callback=step_callback,
+    )
+    return SimpleNamespace(crew=crew, router_task=router_task)
+
+
+def build_enhancer_crew():
+    enhancer = Agent(
+        role="Query Enhancer",
+        backstory=dedent("""
+            You are an expert at rewriting and expanding search queries for news and research. Your job is to take a user-provided topic and turn it into a clear, detailed, and effective search query that will yield the best results from search.
+        """),
+        goal="Rewrite or expand the topic into a more effective search query.",
+        tools=[],
+        llm=AGENT_LLM,
+        allow_delegation=False,
+        verbose=True,
+        max_iter=2,
+    )
+
+    enhance_task = Task(
+        description=dedent("""
+            **Enhance the query for better search**
+
+            Topic: {{topic}}
+
+            Take the user-provided query and enhance it to be more clear and detailed.
+            Respond with ONLY the rewritten query.
+        """),
+        expected_output="A rewritten or expanded search query string.",
+        agent=enhancer,
+    )
+
+    crew = Crew(
+        agents=[enhancer],
+        tasks=[enhance_task],
+        process=Process.sequential,
+        verbose=True,
+    )
+    return SimpleNamespace(crew=crew, enhance_task=enhance_task)
+
+
+CREWS = CrewPool("research", build_crew)
+ENHANCER_CREWS = CrewPool("research-enhancer", build_enhancer_crew)
+
+
+def enhance_in_background(topic: str):
+    """
+    Runs the LLM enhancer off the critical path. Its rewrite does not reach
+    the current search; it is remembered and folded into the local expansion
+    the next time the topic is searched.
+    """
+    def work():
+        try:
+            # Skip rather than queue when every enhancer crew is busy
+            with ENHANCER_CREWS.acquire(timeout=0) as crew_set:
+                output = crew_set.crew.kickoff(inputs={"topic": topic})
+                record_crew_usage("crew.research-enhancer", crew_set.crew, output)
+                remember_rewrite(topic, str(crew_set.enhance_task.output))
+        except TimeoutError:
+            pass
+        except Exception as e:
+            print(f"Background query enhancement failed: {e}")
+
+    threading.Thread(target=work, name="research-enhancer", daemon=True).start()
 
 # ────────────────────────── entry point ────────────────────────
 def run(topic: str):
-    inputs = {"topic": topic, "current_date": datetime.now().strftime("%Y-%m-%d")}
-    final = crew.kickoff(inputs={"topic": topic})
-    print("\n\n### SUMMARY NOTES ###\n", router_task.output)
-    if router_task.output_file:
-        with open(router_task.output_file) as f:
-            print(f"\n--- {router_task.output_file} ---\n{f.read()}")
-    return {"summary": router_task.output}
+    # Local expansion (milliseconds) replaces the sequential LLM enhancer step
+    expansion = expand_query(topic)
+    if RESEARCH_LLM_ENHANCER:
+        enhance_in_background(topic)
+
+    inputs = {"topic": topic, "search_terms": expansion["search_terms"]}
+    with CREWS.acquire() as crew_set:
+        final = kickoff(crew_set.crew, inputs=inputs, caller="crew.research")
+        router_output = crew_set.router_task.output
+        output_file = crew_set.router_task.output_file
+    print("\n\n### SUMMARY NOTES ###\n", router_output)
+    if output_file:
+        with open(output_file) as f:
+            print(f"\n--- {output_file} ---\n{f.read()}")
+    return {"summary": router_output}
 
 if __name__ == "__main__":
     print(run("Getting started with convolutional neural networks"))
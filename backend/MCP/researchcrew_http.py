@@ -2,6 +2,7 @@ import requests
 import os
 from datetime import datetime
 from textwrap import dedent
+from types import SimpleNamespace
 from typing import Type
 from pydantic import BaseModel, Field
 from crewai import Agent, Crew, Process, Task
@@ -9,7 +10,11 @@ from crewai.tools import BaseTool
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 import json
-import weave
+from backend.MCP.crew_pool import CrewPool, kickoff, init_weave
+from backend.MCP.tool_output import relay, KEY_LEGEND
+from backend.src.query_expansion import expand_query
+from backend.src.metrics import observe_external
+from backend.src.cancellation import tool_timeout, step_callback
 
 # Load environment variables
 load_dotenv("backend/MCP/.env")
@@ -25,15 +30,16 @@ class SearchInput(BaseModel):
 # --- HTTP Tool Wrappers ---
 class ExaSearchHTTPTool(BaseTool):
     name: str = "exa_search"
-    description: str = "Search Exa via MCP server."
+    description: str = "Search Exa via MCP server. " + KEY_LEGEND
     args_schema: Type[BaseModel] = SearchInput
 
     def _run(self, query: str, category: str = None, **_):
         url = f"{MCP_BASE_URL}/research/exa_search"
         payload = {"query": query, "category": category}
-        resp = requests.post(url, json=payload, timeout=20)
-        resp.raise_for_status()
-        return resp.json()
+        with observe_external("mcp.exa_search"):
+            resp = requests.post(url, json=payload, timeout=tool_timeout(20))
+            resp.raise_for_status()
+        return relay(resp.json())
 
 class ArxivSearchHTTPTool(BaseTool):
     name: str = "arxiv_search"
@@ -43,120 +49,140 @@ class ArxivSearchHTTPTool(BaseTool):
     def _run(self, query: str, category: str = None, **_):
         url = f"{MCP_BASE_URL}/research/arxiv_search"
         payload = {"query": query, "category": category}
-        resp = requests.post(url, json=payload, timeout=20)
-        resp.raise_for_status()
-        return resp.json()
+        with observe_external("mcp.arxiv_search"):
+            resp = requests.post(url, json=payload, timeout=tool_timeout(20))
+            resp.raise_for_status()
+        return relay(resp.json())
 
 class S2SearchHTTPTool(BaseTool):
     name: str = "s2_search"
-    description: str = "Search Semantic Scholar via MCP server."
+    description: str = "Search Semantic Scholar via MCP server. " + KEY_LEGEND
     args_schema: Type[BaseModel] = SearchInput
 
     def _run(self, query: str, category: str = None, **_):
         url = f"{MCP_BASE_URL}/research/s2_search"
         payload = {"query": query, "category": category}
-        resp = requests.post(url, json=payload, timeout=20)
-        resp.raise_for_status()
-        return resp.json()
-
-# --- Agents (same as researchcrew.py, but use HTTP tools) ---
-router = Agent(
-    role="Learning Router",
-    backstory=(
-        "You triage a learner’s topic and pick the best retrieval tool(s).\n"
-        "• If it sounds like general learning (tutorial, how-to, basics, guide), "
-        "favour **exa_search** for blogs, docs, repos.\n"
-        "• If it sounds like deep research (paper, benchmark, SOTA, citation), "
-        "favour **arxiv_search** and **s2_search**.\n"
-        "You may call several tools for a balanced view and return raw JSON."
-    ),
-    goal="Select the right tools and fetch 5–10 useful sources.",
-    tools=[ExaSearchHTTPTool(), ArxivSearchHTTPTool(), S2SearchHTTPTool()],
-    allow_delegation=False, verbose=True, max_iter=4,
-    llm=ChatOpenAI(model_name="gpt-4o-mini", temperature=0.4),
-)
-
-summariser = Agent(
-    role="Explainer",
-    backstory="Turns mixed sources into beginner-friendly explanations.",
-    goal=(
-        "Write clear, structured notes: plain English, minimum jargon, "
-        "include small code or real-world examples when helpful."
-    ),
-    tools=[], allow_delegation=False, verbose=True, max_iter=4,
-    llm=ChatOpenAI(model_name="gpt-4o-mini", temperature=0.65),
-)
-
-# --- Tasks (same as researchcrew.py) ---
-router_task = Task(
-    description=dedent(
-        """
-        **Step 1 – Choose the right sources**
-
-        Topic: {{topic}}
-
-        • Decide whether this looks like a *general learning* request or a
-          *research-level* request (inspect keywords).
-        • Prefer **exa_search** for tutorials / guides, **arxiv_search** + **s2_search**
-          for research. Use both categories if helpful.
-        • Return a JSON list called `sources` each item:
-
-          {"title": "...", "url": "...", "snippet": "...",
-           "source": "exa|arxiv|s2"}
-        """
-    ),
-    expected_output="JSON list of 5–10 sources.",
-    agent=router,
-)
-
-summary_task = Task(
-    description=dedent(
-        """
-        **Step 2 – Beginner-friendly summary**
-
-        For every item in `router_output.json`, craft a Markdown block:
-
-        ### [Title]
-        • **What it covers:** …  
-        • **Key insight:** …  
-        • **Example / Analogy:** …
-
-        Keep each block ≈80 words; aim for clarity over completeness.
-        """
-    ),
-    expected_output="Markdown notes for each source.",
-    agent=summariser,
-    context=[router_task],
-)
-
-# --- Crew ---
-crew = Crew(
-    agents=[router, summariser],
-    tasks=[router_task, summary_task],
-    process=Process.sequential,
-    verbose=True,
-)
+        with observe_external("mcp.s2_search"):
+            resp = requests.post(url, json=payload, timeout=tool_timeout(20))
+            resp.raise_for_status()
+        return relay(resp.json())
+
+# --- Shared LLM clients & tools (stateless; agents/tasks/crews are built per run) ---
+ROUTER_LLM = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.4)
+SUMMARY_LLM = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.65)
+ROUTER_TOOLS = [ExaSearchHTTPTool(), ArxivSearchHTTPTool(), S2SearchHTTPTool()]
+
+# --- Crew factory ---
+def build_crew():
+    # --- Agents (same as researchcrew.py, but use HTTP tools) ---
+    router = Agent(
+        role="Learning Router",
+        backstory=(
+            "You triage a learner’s topic and pick the best retrieval tool(s).\n"
+            "• If it sounds like general learning (tutorial, how-to, basics, guide), "
+            "favour **exa_search** for blogs, docs, repos.\n"
+            "• If it sounds like deep research (paper, benchmark, SOTA, citation), "
+            "favour **arxiv_search** and **s2_search**.\n"
+            "You may call several tools for a balanced view and return raw JSON."
+        ),
+        goal="Select the right tools and fetch 5–10 useful sources.",
+        tools=ROUTER_TOOLS,
+        allow_delegation=False, verbose=True, max_iter=4,
+        llm=ROUTER_LLM,
+    )
+
+    summariser = Agent(
+        role="Explainer",
+        backstory="Turns mixed sources into beginner-friendly explanations.",
+        goal=(
+            "Write clear, structured notes: plain English, minimum jargon, "
+            "include small code or real-world examples when helpful."
+        ),
+        tools=[], allow_delegation=False, verbose=True, max_iter=4,
+        llm=SUMMARY_LLM,
+    )
+
+    # --- Tasks (same as researchcrew.py) ---
+    router_task = Task(
+        description=dedent(
+            """
+            **Step 1 – Choose the right sources**
+
+            Topic: {{topic}}
+            Search terms: {{search_terms}}
+
+            • Decide whether this looks like a *general learning* request or a
+              *research-level* request (inspect keywords).
+            • Prefer **exa_search** for tutorials / guides, **arxiv_search** + **s2_search**
+              for research. Use both categories if helpful.
+            • Return a JSON list called `sources` each item:
+
+              {"title": "...", "url": "...", "snippet": "...",
+               "source": "exa|arxiv|s2"}
+            """
+        ),
+        expected_output="JSON list of 5–10 sources.",
+        agent=router,
+    )
+
+    summary_task = Task(
+        description=dedent(
+            """
+            **Step 2 – Beginner-friendly summary**
+
+            For every item in `router_output.json`, craft a Markdown block:
+
+            ### [Title]
+            • **What it covers:** …  
+            • **Key insight:** …  
+            • **Example / Analogy:** …
+
+            Keep each block ≈80 words; aim for clarity over completeness.
+            """
+        ),
+        expected_output="Markdown notes for each source.",
+        agent=summariser,
+        context=[router_task],
+    )
+
+    crew = Crew(
+        agents=[router, summariser],
+        tasks=[router_task, summary_task],
+        process=Process.sequential,
+        verbose=True,
+        step_callback=step_callback,
+    )
+    return SimpleNamespace(crew=crew, router_task=router_task, summary_task=summary_task)
+
+
+CREWS = CrewPool("research", build_crew)
 
 def run(topic: str):
-    weave.init("crewai-ai-research-agent")
-    inputs = {"topic": topic, "current_date": datetime.now().strftime("%Y-%m-%d")}
-    final = crew.kickoff(inputs=inputs)
+    init_weave("crewai-ai-research-agent")
+    # Local query expansion, same as researchcrew.run
+    search_terms = expand_query(topic)["search_terms"]
+    inputs = {"topic": topic, "search_terms": search_terms,
+              "current_date": datetime.now().strftime("%Y-%m-%d")}
+    with CREWS.acquire() as crew_set:
+        final = kickoff(crew_set.crew, inputs=inputs, caller="crew.research")
+        output_file = crew_set.router_task.output_file
+        summary_output = crew_set.summary_task.output
     sources = []
-    if router_task.output_file:
+    if output_file:
         try:
-            with open(router_task.output_file, 'r') as f:
+            with open(output_file, 'r') as f:
                 sources = json.loads(f.read())
         except Exception as e:
             print(f"Error reading sources: {e}")
             sources = []
     result = {
         "topic": topic,
-        "summary": str(summary_task.output) if summary_task.output else "",
+        "summary": str(summary_output) if summary_output else "",
         "links": sources,
         "timestamp": datetime.now().isoformat()
     }
     print("\n\n### RESEARCH SUMMARY (HTTP) ###\n")
-    print(summary_task.output)
+    print(summary_output)
     print(f"\n### LINKS (JSON) ###\n")
     print(result)
     return result
@@ -0,0 +1,121 @@
+import json
+import os
+
+# ───────────────────── compact tool output ──────────────────────
+# Tool results are most of the router's prompt tokens. Every search tool
+# serializes its records here: short keys, no whitespace, snippets cut to
+# TOOL_SNIPPET_CHARS, and the whole result held to a per-tool token budget
+# (counted with the router model's tokenizer). Records are passed best-first;
+# over budget, snippets are shortened further, then trailing records dropped,
+# and a lone record left over budget has its other text fields (title,
+# authors, ...) cut as well. URLs are never cut.
+
+TOOL_TOKEN_BUDGET = int(os.getenv("TOOL_TOKEN_BUDGET", "700"))
+# Per-tool overrides, e.g. "gdelt_search=400,s2_search=500"
+TOOL_TOKEN_BUDGETS = {
+    name.strip(): int(budget)
+    for name, budget in (
+        item.split("=", 1) for item in os.getenv("TOOL_TOKEN_BUDGETS", "").split(",") if "=" in item
+    )
+}
+TOOL_SNIPPET_CHARS = int(os.getenv("TOOL_SNIPPET_CHARS", "200"))
+MIN_SNIPPET_CHARS = 40
+
+SHORT_KEYS = {
+    "title": "t",
+    "url": "u",
+    "snippet": "s",
+    "authors": "a",
+    "year": "y",
+    "venue": "v",
+    "citations": "c",
+}
+# Appended to tool descriptions so the agent can read the records
+KEY_LEGEND = "Returns compact JSON records: " + ", ".join(f"{short}={key}" for key, short in SHORT_KEYS.items()) + "."
+
+_encoding = None
+
+
+def count_tokens(text):
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o / gpt-4o-mini
+        except Exception as e:
+            # No tokenizer files available offline: ~4 characters per token
+            print(f"tiktoken unavailable, estimating tokens: {e}")
+            _encoding = False
+    if _encoding is False:
+        return (len(text) + 3) // 4
+    return len(_encoding.encode(text))
+
+
+def token_budget(tool_name):
+    return TOOL_TOKEN_BUDGETS.get(tool_name, TOOL_TOKEN_BUDGET)
+
+
+def dumps(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _clip(text, limit):
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _shorten(record, snippet_chars, field_chars=None):
+    row = {}
+    for key, value in record.items():
+        if value in (None, "", []):
+            continue
+        if key == "snippet":
+            value = _clip(value, snippet_chars)
+        elif field_chars is not None and key != "url":
+            if isinstance(value, list) and all(isinstance(v, str) for v in value):
+                value = _clip(", ".join(value), field_chars)
+            elif isinstance(value, str):
+                value = _clip(value, field_chars)
+        row[SHORT_KEYS.get(key, key)] = value
+    return row
+
+
+def compact(records, budget=TOOL_TOKEN_BUDGET, snippet_chars=TOOL_SNIPPET_CHARS):
+    """
+    Serializes `records` (dicts with long key names, best first) within
+    `budget` tokens. At least one record is always kept, with its snippet
+    and other text fields cut to MIN_SNIPPET_CHARS if that is what it takes.
+    """
+    records = list(records)
+    field_chars = None
+    while True:
+        text = dumps([_shorten(r, snippet_chars, field_chars) for r in records])
+        if count_tokens(text) <= budget:
+            return text
+        if snippet_chars > MIN_SNIPPET_CHARS:
+            snippet_chars = max(MIN_SNIPPET_CHARS, snippet_chars // 2)
+        elif len(records) > 1:
+            records.pop()
+        elif field_chars is None:
+            field_chars = TOOL_SNIPPET_CHARS
+        elif field_chars > MIN_SNIPPET_CHARS:
+            field_chars = max(MIN_SNIPPET_CHARS, field_chars // 2)
+        else:
+            return text
+
+
+def fit_text(text, budget=TOOL_TOKEN_BUDGET):
+    """Plain-text tool output cut to `budget` tokens."""
+    text = "\n".join(line.strip() for line in str(text).splitlines() if line.strip())
+    if count_tokens(text) <= budget:
+        return text
+    # Shrink by the overshoot ratio until it fits
+    while text and count_tokens(text) > budget:
+        text = text[:int(len(text) * budget / count_tokens(text) * 0.95)]
+    return text.rstrip() + "…"
+
+
+def relay(body):
+    """Tool output for a body returned by the MCP server (already compact)."""
+    return body if isinstance(body, str) else dumps(body)
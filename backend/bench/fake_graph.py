@@ -0,0 +1,136 @@
+"""In-memory stand-in for Neo4j behind run_db_query.
+
+Understands exactly the Cypher statements the backend issues (schema
+bootstrap, MERGE writes, UNWIND batches and the read queries in
+query_orch/concept_cache) and keeps the Concept/Query/Link graph in plain
+dictionaries. Anything else returns the same "Error! ..." string that
+run_db_query returns for a database error.
+"""
+
+import re
+import sys
+import threading
+
+
+def _compact(cypher):
+    return re.sub(r"\s+", "", cypher)
+
+
+class InMemoryGraph:
+    def __init__(self):
+        self.concepts = {}   # name -> {"name", "intent", "embeds"}
+        self.queries = {}    # content -> {"content", "intent"}
+        self.links = {}      # address -> {"address"}
+        self.searched_by = set()  # (concept name, query content)
+        self.clicked = set()      # (query content, link address)
+        self._lock = threading.Lock()
+
+    # --- entry point, same signature as run_db_query ---
+    def run(self, query, vars={}):
+        try:
+            with self._lock:
+                return self._dispatch(query, dict(vars or {}))
+        except Exception as e:
+            return f"Error! Database error: {e}"
+
+    def _dispatch(self, query, vars):
+        text = _compact(query)
+
+        if text.startswith("CREATECONSTRAINT") or text.startswith("CREATEVECTORINDEX"):
+            return []
+        if text.startswith("SHOWCONSTRAINTS") or text.startswith("SHOWINDEXES"):
+            # Imported here: importing db_migrations at module level would bind
+            # the real run_db_query before install() patches db_controller
+            from backend.src.db_migrations import CONSTRAINTS, INDEXES
+
+            if text.startswith("SHOWCONSTRAINTS"):
+                return [{"name": name} for name in CONSTRAINTS]
+            return [{"name": name, "state": "ONLINE"} for name in INDEXES]
+
+        if text.startswith("UNWIND$rowsASrow"):
+            body = text[len("UNWIND$rowsASrow"):].replace("row.", "$")
+            for row in vars.get("rows", []):
+                self._write(body, row)
+            return []
+        if text.startswith("MERGE"):
+            self._write(text, vars)
+            return []
+
+        if "count(c)AScount" in text:
+            return [{"count": sum(1 for c in self.concepts.values() if c.get("embeds") is not None)}]
+        if "c.embedsASembeds" in text:
+            return [
+                {"name": c["name"], "intent": c["intent"], "embeds": c["embeds"]}
+                for c in self.concepts.values() if c.get("embeds") is not None
+            ]
+        if text.endswith("RETURNl"):
+            name = vars["concept_name"]
+            queries = {q for c, q in self.searched_by if c == name}
+            return [{"l": self.links[l]} for q, l in sorted(self.clicked) if q in queries]
+        if text.endswith("RETURNm") and "CLICKED" in text:
+            content = vars["query_content"]
+            return [{"m": self.links[l]} for q, l in sorted(self.clicked) if q == content]
+        if text.endswith("RETURNn") and "SEARCHED_BY" in text:
+            content = vars["query_content"]
+            return [{"n": self.concepts[c]} for c, q in sorted(self.searched_by) if q == content]
+        if text.endswith("RETURNn,r,m"):
+            return self._graph()
+
+        raise ValueError(f"Unsupported statement in fake graph: {query.strip()[:80]}")
+
+    def _write(self, text, vars):
+        concept_name = vars.get("concept_name", vars.get("name"))
+        content = vars.get("query_content")
+        address = vars.get("link_address")
+
+        if "MERGE(c:Concept" in text:
+            if concept_name not in self.concepts:
+                created = {"name": concept_name, "intent": None, "embeds": None}
+                if "ONCREATESETc.intent" in text:
+                    created["intent"] = vars.get("intent")
+                    created["embeds"] = vars.get("embedding", vars.get("embeds"))
+                self.concepts[concept_name] = created
+        if "MERGE(q:Query" in text:
+            if content not in self.queries:
+                created = {"content": content}
+                if "ONCREATESETq.intent" in text:
+                    created["intent"] = vars.get("intent")
+                self.queries[content] = created
+        if "MERGE(l:Link" in text:
+            self.links.setdefault(address, {"address": address})
+        if "[:SEARCHED_BY]" in text:
+            self.searched_by.add((concept_name, content))
+        if "[:CLICKED]" in text:
+            self.clicked.add((content, address))
+
+    def _graph(self):
+        records = []
+        for c, q in self.searched_by:
+            records.append({"n": self.concepts[c], "r": (self.concepts[c], "SEARCHED_BY", self.queries[q]), "m": self.queries[q]})
+        for q, l in self.clicked:
+            records.append({"n": self.queries[q], "r": (self.queries[q], "CLICKED", self.links[l]), "m": self.links[l]})
+        # OPTIONAL MATCH: nodes without outgoing relationships come back once with r = m = null
+        sources = {id(record["n"]) for record in records}
+        for node in list(self.concepts.values()) + list(self.queries.values()) + list(self.links.values()):
+            if id(node) not in sources:
+                records.append({"n": node, "r": None, "m": None})
+        return records
+
+
+def install(graph=None):
+    """
+    Points run_db_query at an InMemoryGraph. Modules import the function by
+    name, so db_controller is patched first (covering anything imported
+    afterwards) and every already-imported backend module is patched too.
+
+    Returns:
+        The InMemoryGraph in use.
+    """
+    from backend.src import db_controller
+
+    graph = graph or InMemoryGraph()
+    db_controller.run_db_query = graph.run
+    for name, module in list(sys.modules.items()):
+        if name.startswith("backend.") and hasattr(module, "run_db_query"):
+            module.run_db_query = graph.run
+    return graph
@@ -0,0 +1,159 @@
+"""Local fake of every external HTTP API the backend talks to.
+
+In the spirit of browser/fake_backend/server.js: one threaded HTTP server
+that answers OpenAI chat completions, Exa, NewsAPI, GDELT, Semantic Scholar
+and the MCP tool server routes with small canned payloads, plus an optional
+artificial delay so load tests can model upstream latency.
+
+Run standalone:
+    python -m backend.bench.fake_services --port 8765 --latency-ms 50
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def fake_articles(query, count=5):
+    slug = re.sub(r"[^a-z0-9]+", "-", (query or "topic").lower()).strip("-") or "topic"
+    return [
+        {
+            "title": f"{query} - Story {i}",
+            "url": f"https://example.com/{slug}/{i}",
+            "snippet": f"Fake coverage of {query}, item {i}.",
+            "publishedDate": "2025-07-01T00:00:00Z",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def fake_chat_reply(prompt):
+    """Picks a canned reply that matches the shape each prompt asks for."""
+    if "high-level concept" in prompt:
+        match = re.search(r'Sentence: "(.*?)"', prompt, re.S)
+        words = (match.group(1) if match else "General").split()
+        return " ".join(words[:2]).title() or "General"
+    if "intent-classification" in prompt:
+        return "Research: 0.6\nAnswer: 0.2\nTransactional: 0.05\nNews: 0.1\nNavigational: 0.05"
+    if "extract the 'Title'" in prompt:
+        return " / ".join(a["title"] for a in fake_articles("result"))
+    if "extract the 'URL'" in prompt:
+        return " ".join(a["url"] for a in fake_articles("result"))
+    if "extract the 'Snippet'" in prompt:
+        return " // ".join(a["snippet"] for a in fake_articles("result"))
+    # Agent loops (CrewAI): finish immediately with a sources list
+    return "Thought: I now know the final answer\nFinal Answer: " + json.dumps(fake_articles("result"))
+
+
+class FakeServicesHandler(BaseHTTPRequestHandler):
+    latency_ms = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        time.sleep(self.latency_ms / 1000)
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path.endswith("/v2/everything"):  # NewsAPI
+            articles = [
+                {"title": a["title"], "url": a["url"], "description": a["snippet"], "publishedAt": a["publishedDate"]}
+                for a in fake_articles(params.get("q"), int(params.get("pageSize", 10)))
+            ]
+            return self._send({"status": "ok", "articles": articles})
+        if url.path.endswith("/doc/doc"):  # GDELT
+            articles = [
+                {"title": a["title"], "url": a["url"], "source": "example.com", "seendate": "20250701T000000Z"}
+                for a in fake_articles(params.get("query"), int(params.get("maxrecords", 50)))
+            ]
+            return self._send({"articles": articles})
+        if url.path.endswith("/paper/search"):  # Semantic Scholar
+            papers = [
+                {"title": a["title"], "year": 2025, "venue": "FakeConf", "authors": [{"name": "A. Author"}],
+                 "citationCount": 0, "url": a["url"]}
+                for a in fake_articles(params.get("query"), int(params.get("limit", 5)))
+            ]
+            return self._send({"total": len(papers), "data": papers})
+
+        self._send({"error": f"no fake for GET {url.path}"}, status=404)
+
+    def do_POST(self):
+        time.sleep(self.latency_ms / 1000)
+        path = urlparse(self.path).path
+        body = self._body()
+
+        if path.endswith("/chat/completions"):  # OpenAI
+            prompt = "\n".join(str(m.get("content")) for m in body.get("messages", []))
+            reply = fake_chat_reply(prompt)
+            return self._send({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-4o-mini"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": reply}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(reply) // 4,
+                          "total_tokens": (len(prompt) + len(reply)) // 4},
+            })
+        if path.endswith("/search") and "query" in body:  # Exa
+            results = [
+                {"id": a["url"], "title": a["title"], "url": a["url"], "publishedDate": a["publishedDate"],
+                 "highlights": [a["snippet"]], "highlightScores": [0.9], "text": a["snippet"]}
+                for a in fake_articles(body["query"], body.get("numResults", 5))
+            ]
+            return self._send({"requestId": "fake", "results": results})
+        if path.endswith("/contents") and "urls" in body:  # Exa contents
+            results = [
+                {"id": url, "url": url, "title": url.rsplit("/", 2)[-2], "highlights": [f"Highlight from {url}"],
+                 "highlightScores": [0.9]}
+                for url in body["urls"]
+            ]
+            return self._send({"requestId": "fake", "results": results})
+        if path.startswith("/news/") or path.startswith("/research/"):  # MCP tool server
+            return self._send([
+                {"title": a["title"], "url": a["url"], "snippet": a["snippet"]}
+                for a in fake_articles(body.get("query"))
+            ])
+
+        self._send({"error": f"no fake for POST {path}"}, status=404)
+
+
+def start(port=0, latency_ms=0):
+    """
+    Starts the fake services in a daemon thread.
+
+    Returns:
+        (server, base_url)
+    """
+    handler = type("Handler", (FakeServicesHandler,), {"latency_ms": latency_ms})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI/Exa/NewsAPI/GDELT/S2/MCP server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server, url = start(args.port, args.latency_ms)
+    print(f"Fake services listening on {url}")
+    threading.Event().wait()
@@ -0,0 +1,276 @@
+"""Offline benchmark for the intent stack.
+
+Runs a labelled query file through each intent source and reports accuracy,
+a confusion matrix, latency percentiles and throughput at several
+concurrency levels. LLM-backed calls (get_intent) can be recorded once and
+replayed, so runs are reproducible, offline and free.
+
+Usage:
+    python -m backend.bench.intent_bench sample.tsv --llm record --recordings rec.json
+    python -m backend.bench.intent_bench sample.tsv --llm replay --recordings rec.json \
+        --sources rules,roberta,zero_shot,llm,cascade --concurrency 1,4,16
+"""
+
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.bench.stats import latency_summary, format_table
+from backend.src.tracing import collect_spans
+from backend.tools.intent_router import INTENT_LABELS
+
+# Gold labels are mapped onto the set of intents that count as correct.
+# ORCAS-I "Informational" is either a Research or an Answer query for us.
+ORCAS_LABEL_MAP = {
+    "Navigational": {"Navigational"},
+    "Transactional": {"Transactional"},
+    "Informational": {"Research", "Answer"},
+    "Factual": {"Answer"},
+    "Instrumental": {"Answer", "Research"},
+    "Abstain": {"Research"},
+}
+
+
+def read_labelled(path, limit=None):
+    """Reads (query, label) pairs from a TSV/CSV with query + label/level_1 columns or JSON lines."""
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f, delimiter="\t" if path.endswith(".tsv") else ",")
+        for record in records:
+            label = record.get("label") or record.get("level_1")
+            if record.get("query") and label:
+                rows.append((record["query"], label))
+            if limit and len(rows) >= limit:
+                break
+    return rows
+
+
+def accepted_intents(label):
+    if label in INTENT_LABELS:
+        return {label}
+    return ORCAS_LABEL_MAP.get(label, {label})
+
+
+################################################
+# RECORDED LLM RESPONSES
+################################################
+class RecordedLLM:
+    """
+    Wraps get_intent. Modes:
+        live   - call the real LLM
+        record - call the real LLM and store responses + latency
+        replay - serve stored responses (optionally sleeping the recorded latency)
+        stub   - uniform scores, no network at all
+    """
+
+    def __init__(self, mode, path=None, replay_latency=False):
+        self.mode = mode
+        self.path = path
+        self.replay_latency = replay_latency
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.recordings = {}
+        if path and os.path.exists(path) and mode in ("record", "replay"):
+            with open(path, encoding="utf-8") as f:
+                self.recordings = json.load(f)
+
+    def wrap(self, real_get_intent):
+        uniform = {label: round(1 / len(INTENT_LABELS), 4) for label in INTENT_LABELS}
+
+        def get_intent(sentence):
+            if self.mode == "live":
+                return real_get_intent(sentence)
+            if self.mode == "stub":
+                return dict(uniform)
+            if self.mode == "replay":
+                recorded = self.recordings.get(sentence)
+                if recorded is None:
+                    with self._lock:
+                        self.misses += 1
+                    return dict(uniform)
+                if self.replay_latency:
+                    time.sleep(recorded["latency_ms"] / 1000)
+                return dict(recorded["scores"])
+
+            start = time.perf_counter()
+            scores = real_get_intent(sentence)
+            with self._lock:
+                self.recordings[sentence] = {
+                    "scores": scores,
+                    "latency_ms": (time.perf_counter() - start) * 1000,
+                }
+            return scores
+
+        return get_intent
+
+    def save(self):
+        if self.mode == "record" and self.path:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.recordings, f, indent=2)
+
+
+def install_llm(recorder):
+    """Routes every caller of get_intent through the recorder."""
+    from backend.tools import intent_categorizer
+    from backend.src import fivedvector
+
+    wrapped = recorder.wrap(intent_categorizer.get_intent)
+    intent_categorizer.get_intent = wrapped
+    fivedvector.get_intent = wrapped
+
+
+################################################
+# SOURCES
+################################################
+def _from_scores(scores):
+    if scores is None:
+        return None
+    return max(scores, key=scores.get)
+
+
+def build_sources(names):
+    """Returns {name: fn(query) -> (intent or None, deciding stage)} for the requested sources."""
+    sources = {}
+    for name in names:
+        if name == "rules":
+            from backend.tools.intent_router import rule_intent
+            sources[name] = lambda q, f=rule_intent: ((f(q) or {}).get("intent"), "rules")
+        elif name == "roberta":
+            from backend.tools.intent_roberta_classifier import classify_intent_roberta
+            sources[name] = lambda q, f=classify_intent_roberta: ((f(q) or {}).get("predicted_intent"), "roberta")
+        elif name == "zero_shot":
+            from backend.tools.intent_zero_shot_classifier import classify_intent_zero_shot
+            sources[name] = lambda q, f=classify_intent_zero_shot: (f(q)["predicted_intent"], "zero_shot")
+        elif name == "llm":
+            from backend.tools import intent_categorizer
+            sources[name] = lambda q, m=intent_categorizer: (_from_scores(m.get_intent(q)), "llm")
+        elif name == "cascade":
+            from backend.src.fivedvector import collect_all_intent
+
+            def cascade(q, f=collect_all_intent):
+                best = f(q)["most_significant"]
+                return best["intent"], best["source"]
+            sources[name] = cascade
+        else:
+            raise ValueError(f"Unknown source: {name}")
+    return sources
+
+
+################################################
+# BENCHMARK
+################################################
+def run_accuracy(fn, rows):
+    confusion = {}
+    latencies, stages = [], {}
+    # Cascade stages (intent.rules, intent.roberta, intent.deberta, intent.llm)
+    # are timed separately from the spans collect_all_intent opens
+    stage_latencies = {}
+    correct = abstained = 0
+
+    for query, label in rows:
+        start = time.perf_counter()
+        with collect_spans() as spans:
+            predicted, stage = fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        for span_name, ms in spans:
+            if span_name.startswith("intent."):
+                stage_latencies.setdefault(span_name, []).append(ms)
+
+        stages[stage] = stages.get(stage, 0) + 1
+        if predicted is None:
+            abstained += 1
+            predicted = "(none)"
+        if predicted in accepted_intents(label):
+            correct += 1
+        confusion.setdefault(label, {}).setdefault(predicted, 0)
+        confusion[label][predicted] += 1
+
+    answered = len(rows) - abstained
+    return {
+        "accuracy": round(correct / len(rows), 4) if rows else 0.0,
+        "accuracy_when_answered": round(correct / answered, 4) if answered else 0.0,
+        "coverage": round(answered / len(rows), 4) if rows else 0.0,
+        "latency": latency_summary(latencies),
+        "stage_latency": {name: latency_summary(ms) for name, ms in stage_latencies.items()},
+        "decided_by": stages,
+        "confusion": confusion,
+    }
+
+
+def run_throughput(fn, rows, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda row: fn(row[0]), rows))
+    elapsed = time.perf_counter() - start
+    return round(len(rows) / elapsed, 2) if elapsed else 0.0
+
+
+def print_report(name, report, throughput):
+    print(f"\n=== {name} ===")
+    print(f"accuracy {report['accuracy']}  (when answered {report['accuracy_when_answered']}, "
+          f"coverage {report['coverage']})")
+    lat = report["latency"]
+    print(f"latency ms  mean {lat['mean_ms']}  p50 {lat['p50_ms']}  p95 {lat['p95_ms']}  p99 {lat['p99_ms']}")
+    if report["stage_latency"]:
+        print(format_table(
+            ["stage", "calls", "mean ms", "p50 ms", "p95 ms", "p99 ms"],
+            [[name, s["count"], s["mean_ms"], s["p50_ms"], s["p95_ms"], s["p99_ms"]]
+             for name, s in report["stage_latency"].items()]
+        ))
+    print(f"decided by  {report['decided_by']}")
+    print("throughput  " + "  ".join(f"c={c}: {qps} q/s" for c, qps in throughput.items()))
+
+    predicted = sorted({p for row in report["confusion"].values() for p in row})
+    rows = [[gold] + [report["confusion"][gold].get(p, 0) for p in predicted]
+            for gold in sorted(report["confusion"])]
+    print(format_table(["gold \\ predicted"] + predicted, rows))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark intent classification sources.")
+    parser.add_argument("path", help="Labelled .tsv/.csv (query + label/level_1) or .jsonl file")
+    parser.add_argument("--sources", default="rules,roberta,zero_shot,llm,cascade")
+    parser.add_argument("--llm", choices=["live", "record", "replay", "stub"], default="replay")
+    parser.add_argument("--recordings", default="intent_llm_recordings.json")
+    parser.add_argument("--replay-latency", action="store_true",
+                        help="Sleep the recorded LLM latency when replaying")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--json", dest="json_out", default=None, help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    rows = read_labelled(args.path, args.limit)
+    print(f"Loaded {len(rows)} labelled queries from {args.path}")
+    if not rows:
+        parser.error(f"no labelled queries in {args.path} (expected query + label/level_1 columns)")
+
+    recorder = RecordedLLM(args.llm, args.recordings, args.replay_latency)
+    install_llm(recorder)
+
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    results = {}
+    for name, fn in build_sources(args.sources.split(",")).items():
+        # Warm-up call so one-time model loads don't land in the percentiles
+        fn(rows[0][0])
+        report = run_accuracy(fn, rows)
+        throughput = {c: run_throughput(fn, rows, c) for c in levels}
+        print_report(name, report, throughput)
+        results[name] = {**report, "throughput_qps": throughput}
+
+    recorder.save()
+    if args.llm == "replay" and recorder.misses:
+        print(f"\nWarning: {recorder.misses} LLM calls had no recording and used uniform scores")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""End-to-end load test for the Flask API, fully offline.
+
+Boots backend/src/app.py in-process against local stand-ins: an in-memory
+graph behind run_db_query (fake_graph) and a fake OpenAI/Exa/NewsAPI/GDELT/
+Semantic Scholar/MCP server (fake_services). Optionally the embedding model
+and the zero-shot classifier are swapped for cheap deterministic fakes, so
+the run needs no model downloads either. Reports RPS, p50/p95/p99 latency
+and error rate per endpoint.
+
+Usage:
+    python -m backend.bench.load_test --duration 30 --concurrency 8 --fake-models
+    python -m backend.bench.load_test --mix search=1,add-links=4,new-query=2,get-graph=1 --upstream-latency-ms 80
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from backend.bench import fake_graph, fake_services
+from backend.bench.stats import latency_summary, format_table
+
+QUERIES = [
+    "github.com",
+    "buy noise cancelling headphones",
+    "latest news on AI chip export controls",
+    "what is a transformer model",
+    "history and causes of the 2008 financial crisis",
+    "how do vaccines train the immune system",
+    "sourdough starter troubleshooting",
+    "quantum error correction surface codes",
+]
+
+
+class HashingEmbedder:
+    """Deterministic stand-in for SentenceTransformer.encode (384-dim, unit norm)."""
+
+    dims = 384
+
+    def _one(self, text):
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for token in str(text).lower().split():
+            digest = int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16)
+            vector[digest % self.dims] += 1.0 if (digest >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, texts, **_):
+        if isinstance(texts, str):
+            return self._one(texts)
+        return np.stack([self._one(t) for t in texts]) if len(texts) else np.zeros((0, self.dims), dtype=np.float32)
+
+
+def fake_zero_shot(query, candidates, hypothesis_template=None, multi_label=False):
+    scores = [1.0 / len(candidates)] * len(candidates)
+    return {"sequence": query, "labels": list(candidates), "scores": scores}
+
+
+def configure_environment(base_url):
+    """Points every upstream client at the fake services (must run before importing the app)."""
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-fake",
+        "OPENAI_API_BASE": f"{base_url}/v1",
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "EXA_API_KEY": "fake",
+        "EXA_BASE_URL": base_url,
+        "NEWS_API_KEY": "fake",
+        "NEWS_API_URL": f"{base_url}/v2/everything",
+        "GDELT_API_URL": f"{base_url}/api/v2/doc/doc",
+        "S2_API_URL": f"{base_url}/graph/v1/paper/search",
+        "MCP_BASE_URL": base_url,
+        "WEAVE_DISABLED": "true",
+        "WANDB_MODE": "disabled",
+    })
+
+
+def install_fake_models():
+    from backend.src import query_orch
+    from backend.tools import intent_zero_shot_classifier
+
+    query_orch.EMBEDDING_MODEL = HashingEmbedder()
+    intent_zero_shot_classifier.CLASSIFIER = fake_zero_shot
+
+
+def boot_backend(port):
+    from werkzeug.serving import make_server
+    from backend.src.app import app
+
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+################################################
+# WORKLOAD
+################################################
+def make_request(endpoint, rng):
+    query = rng.choice(QUERIES)
+    if endpoint == "search":
+        return "POST", "/api/search", {"query": query}
+    if endpoint == "add-links":
+        return "POST", "/api/add-links", {
+            "query": query, "intent": "Research",
+            "links": [f"https://example.com/{rng.randint(1, 50)}"],
+        }
+    if endpoint == "new-query":
+        return "POST", "/api/new-query", {"query": query, "intent": "Research"}
+    if endpoint == "get-graph":
+        return "GET", "/api/get-graph", None
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def worker(api_url, weights, deadline, seed, samples, lock):
+    rng = random.Random(seed)
+    session = requests.Session()
+    names, values = list(weights), list(weights.values())
+
+    while time.monotonic() < deadline:
+        endpoint = rng.choices(names, values)[0]
+        method, path, payload = make_request(endpoint, rng)
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, api_url + path, json=payload, timeout=120)
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with lock:
+            samples.setdefault(endpoint, []).append((elapsed_ms, ok))
+
+
+def report(samples, duration):
+    rows, results = [], {}
+    for endpoint in sorted(samples):
+        latencies = [ms for ms, _ in samples[endpoint]]
+        errors = sum(1 for _, ok in samples[endpoint] if not ok)
+        summary = latency_summary(latencies)
+        results[endpoint] = {
+            **summary,
+            "rps": round(len(latencies) / duration, 2),
+            "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        }
+        r = results[endpoint]
+        rows.append([endpoint, r["count"], r["rps"], r["p50_ms"], r["p95_ms"], r["p99_ms"], r["error_rate"]])
+
+    print(format_table(["endpoint", "requests", "rps", "p50 ms", "p95 ms", "p99 ms", "error rate"], rows))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the Flask API.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default="search=1,add-links=4,new-query=2,get-graph=1",
+                        help="Comma separated endpoint=weight")
+    parser.add_argument("--upstream-latency-ms", type=int, default=0,
+                        help="Artificial delay added by the fake external APIs")
+    parser.add_argument("--fake-models", action="store_true",
+                        help="Replace the embedding model and zero-shot classifier with cheap fakes")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_out", default=None)
+    args = parser.parse_args(argv)
+
+    _, services_url = fake_services.start(latency_ms=args.upstream_latency_ms)
+    configure_environment(services_url)
+    graph = fake_graph.install()
+    if args.fake_models:
+        install_fake_models()
+
+    server, api_url = boot_backend(args.port)
+    fake_graph.install(graph)  # re-patch modules imported by the app
+    print(f"Backend on {api_url}, fake services on {services_url}")
+
+    weights = parse_mix(args.mix)
+    samples, lock = {}, threading.Lock()
+    deadline = time.monotonic() + args.duration
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i in range(args.concurrency):
+            pool.submit(worker, api_url, weights, deadline, args.seed + i, samples, lock)
+    elapsed = time.monotonic() - start
+
+    results = report(samples, elapsed)
+    server.shutdown()
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
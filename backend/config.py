@@ -5,7 +5,67 @@ load_dotenv()
 NEO4J_API_URL= os.getenv('NEO4J_API_URL')
 NEO4J_USER=os.getenv('NEO4J_USER')
 NEO4J_PASSWORD=os.getenv('NEO4J_PASSWORD')
+NEO4J_POOL_SIZE=int(os.getenv('NEO4J_POOL_SIZE', '50'))
 OPENAI_API_KEY=os.getenv('OPENAI_API_KEY')
 EXA_API_KEY=os.getenv('EXA_API_KEY')
 WANDB_API_KEY=os.getenv('WANDB_API_KEY')
-NEWS_API_KEY=os.getenv('NEWS_API_KEY')
\ No newline at end of file
+NEWS_API_KEY=os.getenv('NEWS_API_KEY')
+
+# Optional on-disk journal for the write-behind queue (unset = memory only)
+WRITE_QUEUE_JOURNAL=os.getenv('WRITE_QUEUE_JOURNAL')
+
+# Optional path prefix for a memory-mapped concept embedding snapshot
+CONCEPT_CACHE_PATH=os.getenv('CONCEPT_CACHE_PATH')
+
+# Fine-tuned RoBERTa intent model (directory from trainer.save_model); unset disables it
+ROBERTA_INTENT_MODEL_PATH=os.getenv('ROBERTA_INTENT_MODEL_PATH')
+# Label names in id order for checkpoints saved with the default LABEL_<n> names
+ROBERTA_INTENT_LABELS=os.getenv('ROBERTA_INTENT_LABELS', 'Informational,Navigational,Transactional').split(',')
+ROBERTA_INT8=os.getenv('ROBERTA_INT8', '0') == '1'
+
+# Per-stage tracing: "none", "console" or "file" (OpenTelemetry console exporter)
+TRACING_EXPORTER=os.getenv('TRACING_EXPORTER', 'none')
+TRACING_FILE=os.getenv('TRACING_FILE', 'traces.jsonl')
+# Return the per-request stage breakdown in a Server-Timing response header
+TRACE_HEADER=os.getenv('TRACE_HEADER', '0') == '1'
+
+# Shared LLM gateway (backend/tools/llm_gateway.py): rate limits, prompt cache, retries
+LLM_REQUESTS_PER_MINUTE=int(os.getenv('LLM_REQUESTS_PER_MINUTE', '500'))
+LLM_TOKENS_PER_MINUTE=int(os.getenv('LLM_TOKENS_PER_MINUTE', '200000'))
+LLM_CACHE_TTL=float(os.getenv('LLM_CACHE_TTL', '3600'))
+LLM_CACHE_SIZE=int(os.getenv('LLM_CACHE_SIZE', '5000'))
+LLM_MAX_RETRIES=int(os.getenv('LLM_MAX_RETRIES', '4'))
+
+# LLM backend for the gateway: "openai", "local" (OpenAI-compatible server at
+# LLM_BASE_URL) or "inprocess" (transformers model LLM_LOCAL_MODEL)
+LLM_BACKEND=os.getenv('LLM_BACKEND', 'openai')
+LLM_BASE_URL=os.getenv('LLM_BASE_URL')
+LLM_LOCAL_MODEL=os.getenv('LLM_LOCAL_MODEL', 'Qwen/Qwen2.5-0.5B-Instruct')
+LLM_MAX_NEW_TOKENS=int(os.getenv('LLM_MAX_NEW_TOKENS', '64'))
+
+# Import the search stack and load local models in a background thread at startup
+APP_WARMUP=os.getenv('APP_WARMUP', '0') == '1'
+
+# Shared model-serving process (backend/src/inference_server.py); unset = load models in-process
+INFERENCE_SERVER_ADDRESS=os.getenv('INFERENCE_SERVER_ADDRESS')
+# Shared secret for the server handshake; required on both sides, there is no default
+INFERENCE_SERVER_AUTHKEY=os.getenv('INFERENCE_SERVER_AUTHKEY')
+# Seconds a worker waits for the server before answering with its own in-process models
+INFERENCE_SERVER_TIMEOUT=float(os.getenv('INFERENCE_SERVER_TIMEOUT', '10'))
+# Seconds a worker skips the server after it failed
+INFERENCE_SERVER_RETRY_SECONDS=float(os.getenv('INFERENCE_SERVER_RETRY_SECONDS', '30'))
+# '1' lets workers load the models themselves while the server is unavailable
+# (multi-GB per worker); otherwise those requests fail or skip the stage
+INFERENCE_LOCAL_FALLBACK=os.getenv('INFERENCE_LOCAL_FALLBACK', '0') == '1'
+INFERENCE_BATCH_SIZE=int(os.getenv('INFERENCE_BATCH_SIZE', '64'))
+INFERENCE_MAX_WAIT_MS=float(os.getenv('INFERENCE_MAX_WAIT_MS', '5'))
+
+# Upper bound on one /api/search (crew runs and tool calls are cut off after it)
+SEARCH_DEADLINE_SECONDS=float(os.getenv('SEARCH_DEADLINE_SECONDS', '60'))
+
+# Re-ranking of consolidated search results (backend/src/rerank.py)
+RERANK_CACHE_SIZE=int(os.getenv('RERANK_CACHE_SIZE', '20000'))
+RERANK_RECENCY_WEIGHT=float(os.getenv('RERANK_RECENCY_WEIGHT', '0.3'))
+RERANK_HALF_LIFE_HOURS=float(os.getenv('RERANK_HALF_LIFE_HOURS', '48'))
+# Sources returned per search after ranking (0 = all)
+RERANK_TOP_N=int(os.getenv('RERANK_TOP_N', '0'))
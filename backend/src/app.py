@@ -1,21 +1,112 @@
+import importlib
+import threading
+import time
+import uuid
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from backend.src.db_schema import Query, Link
-from backend.src.fivedvector import collect_all_intent
-from backend.MCP.newscrew_http import run as news_run
-from backend.MCP.researchcrew import run as res_run
-from backend.tools.sources_parser import consolidate
-from backend.src.query_orch import connect_links_to_query, find_similar_concepts, create_concept, connect_concept_to_query, retrieve_all_links_to_concept, retrieve_graph
-from backend.tools.concept_categorizer import get_concept
+from backend.src.db_schema import Query
+from backend.src.query_orch import retrieve_all_links_to_concept, retrieve_graph
+from backend.src.db_migrations import ensure_schema
+from backend.src.write_queue import WriteBehindQueue
+from backend.config import WRITE_QUEUE_JOURNAL, APP_WARMUP, SEARCH_DEADLINE_SECONDS, RERANK_TOP_N
+from backend.src.cancellation import CancelToken, SearchCancelled, cancel_scope, registered, cancel_search
+from backend.src.dedup import dedupe, RECENT_STORIES
+from backend.src import tracing, metrics
+
+
+# Crews and ML-backed modules (transformers, torch, sentence-transformers,
+# langchain, CrewAI, weave) are imported on first use, so the server accepts
+# connections quickly and routes like /api/get-graph never pay for them.
+def lazy(module, name):
+    """Returns a callable that imports `module` on first call and forwards to `module.name`."""
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+    call.__module__ = module
+    call.__name__ = name
+    return call
+
+collect_all_intent = lazy('backend.src.fivedvector', 'collect_all_intent')
+news_run = lazy('backend.MCP.newscrew_http', 'run')
+res_run = lazy('backend.MCP.researchcrew', 'run')
+consolidate = lazy('backend.tools.sources_parser', 'consolidate')
+get_concept = lazy('backend.tools.concept_categorizer', 'get_concept')
+ingest_records = lazy('backend.src.ingest', 'ingest_records')
+rerank = lazy('backend.src.rerank', 'rerank')
+
+
+def warm_up():
+    """Imports the search stack and loads the local models ahead of the first search."""
+    with tracing.span("warmup"):
+        for module in ['backend.src.fivedvector', 'backend.tools.sources_parser',
+                       'backend.MCP.newscrew_http', 'backend.MCP.researchcrew']:
+            importlib.import_module(module)
+
+        from backend.src.query_orch import get_embedding_model
+        from backend.tools.intent_zero_shot_classifier import initialize_classifier
+        from backend.tools.intent_roberta_classifier import initialize_roberta_classifier
+
+        get_embedding_model()
+        initialize_roberta_classifier()
+        initialize_classifier()
+    print("Warm-up finished")
+
+
+def bootstrap_schema():
+    """
+    Constraints/indexes must exist before the MERGE-heavy write paths run.
+    Runs in the background so an unreachable Neo4j neither blocks nor breaks
+    startup (the schema can also be applied with `python -m backend.src.db_migrations`).
+    """
+    try:
+        ensure_schema()
+    except Exception as e:
+        print(f"Graph schema bootstrap failed: {e}")
+
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['Server-Timing'])
+tracing.init_app(app)
+metrics.init_app(app)
+
+threading.Thread(target=bootstrap_schema, name="schema-bootstrap", daemon=True).start()
+
+# Graph mutations from the browser are applied off the request path
+write_queue = WriteBehindQueue(journal_path=WRITE_QUEUE_JOURNAL)
+write_queue.start()
+metrics.WRITE_QUEUE_DEPTH.set_function(write_queue.pending)
+
+if APP_WARMUP:
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
 
 @app.route('/api/search', methods=['POST'])
 def search():
     data = request.get_json()
     query = Query(data['query'], intent="")
 
+    # Optional client-chosen id lets the extension abandon this search via
+    # /api/cancel-search; every search is bounded by a deadline either way
+    search_id = data.get('search_id')
+    try:
+        deadline = float(data.get('deadline_seconds') or SEARCH_DEADLINE_SECONDS)
+    except (TypeError, ValueError):
+        return jsonify("Error: 'deadline_seconds' must be a number"), 400
+    if not deadline > 0:
+        return jsonify("Error: 'deadline_seconds' must be positive"), 400
+    # Clients may ask for less time than the server allows, never more
+    token = CancelToken(min(deadline, SEARCH_DEADLINE_SECONDS))
+
+    try:
+        with registered(search_id, token), cancel_scope(token):
+            return run_search(query)
+    except SearchCancelled as e:
+        print(f"Search {search_id or query.getContent()!r} stopped: {e}")
+        if token.expired:
+            return jsonify(f'Error: {e}'), 504
+        # Cancelled through /api/cancel-search
+        return jsonify(f'Error: {e}'), 409
+
+
+def run_search(query):
     result = collect_all_intent(query=query.content)
 
     intent = result.get('most_significant').get('intent')
@@ -24,9 +115,13 @@ def search():
 
     if intent == 'News':
         links = consolidate(query.getContent(), news_run)
+        links = dedupe(links, recent=RECENT_STORIES)
+        links = rerank(query.getContent(), links, intent=intent, top_n=RERANK_TOP_N or None)
         answer = {'links': links, 'intent': intent}
     elif intent == 'Research':
         links = consolidate(query.getContent(), res_run)
+        links = dedupe(links, recent=RECENT_STORIES)
+        links = rerank(query.getContent(), links, intent=intent, top_n=RERANK_TOP_N or None)
         answer = {'links': links, 'intent': intent}
     else:
         # For Navigational, Transactional, and Answer intents, just return the query
@@ -39,6 +134,19 @@ def search():
         return jsonify(answer), 400
 
 
+@app.route('/api/cancel-search', methods=['POST'])
+def cancel_search_route():
+    data = request.get_json() or {}
+    search_id = data.get('search_id')
+
+    if not search_id:
+        return jsonify("Error: 'search_id' is required"), 400
+    if not cancel_search(search_id):
+        return jsonify(f'Error: no running search {search_id}'), 404
+
+    return jsonify('Cancelled'), 200
+
+
 @app.route('/api/add-links', methods=['POST'])
 def link_adder():
     try:
@@ -47,11 +155,14 @@ def link_adder():
         query = data.get('query')
         intent = data.get('intent')
 
-        q = Query(query, intent)
-        l = [Link(i) for i in links]
-        connect_links_to_query(q, l)
+        if not isinstance(query, str) or not query:
+            raise ValueError("'query' is required")
+        if not isinstance(links, list) or not all(isinstance(link, str) and link for link in links):
+            raise ValueError("'links' must be a list of URL strings")
+
+        write_queue.submit('links', {'query': query, 'intent': intent, 'links': links})
 
-        return jsonify('Success!'), 200
+        return jsonify('Accepted'), 202
     except Exception as e:
         return jsonify(f"Error: {e}"), 400
 
@@ -63,23 +174,71 @@ def query_adder():
         query = data.get('query')
         intent = data.get('intent')
 
-        q = Query(query, intent)
-        sim_concepts = find_similar_concepts(q)
+        if not query:
+            raise ValueError("'query' is required")
+
+        write_queue.submit('query', {'query': query, 'intent': intent})
+
+        return jsonify('Accepted'), 202
+
+    except Exception as e:
+        return jsonify(f'Error: {e}'), 400
+
+
+# Bulk history imports run in the background; job state is kept in memory.
+# Finished jobs can be polled for INGEST_JOB_TTL seconds; at most
+# MAX_FINISHED_INGEST_JOBS are kept.
+INGEST_JOBS = {}
+INGEST_JOB_TTL = 3600
+MAX_FINISHED_INGEST_JOBS = 1000
+
+def run_ingest_job(job_id, records):
+    try:
+        INGEST_JOBS[job_id] = {'status': 'done', 'stats': ingest_records(records), 'finished_at': time.time()}
+    except Exception as e:
+        INGEST_JOBS[job_id] = {'status': 'failed', 'error': str(e), 'finished_at': time.time()}
+
 
-        if sim_concepts[0].get('similarity') < 0.35:
-            create_concept(q)
+def prune_ingest_jobs():
+    finished = sorted(
+        (job['finished_at'], job_id) for job_id, job in list(INGEST_JOBS.items()) if 'finished_at' in job
+    )
+    expired = time.time() - INGEST_JOB_TTL
+    excess = len(finished) - MAX_FINISHED_INGEST_JOBS
+    for i, (finished_at, job_id) in enumerate(finished):
+        if finished_at < expired or i < excess:
+            INGEST_JOBS.pop(job_id, None)
 
-        else:
-            for i in sim_concepts:
-                if i.get('similarity') > 0.40:
-                    connect_concept_to_query(q, i)
 
-        return jsonify('Success!'), 200
+@app.route('/api/ingest', methods=['POST'])
+def ingest():
+    try:
+        data = request.get_json()
+        records = data.get('records')
+
+        if not isinstance(records, list):
+            raise ValueError("'records' must be a list of {query, intent, links}")
+
+        prune_ingest_jobs()
+        job_id = uuid.uuid4().hex
+        INGEST_JOBS[job_id] = {'status': 'running', 'records': len(records)}
+        threading.Thread(target=run_ingest_job, args=(job_id, records), daemon=True).start()
+
+        return jsonify({'job_id': job_id}), 202
 
     except Exception as e:
         return jsonify(f'Error: {e}'), 400
 
 
+@app.route('/api/ingest/<job_id>', methods=['GET'])
+def ingest_status(job_id):
+    job = INGEST_JOBS.get(job_id)
+    if job is None:
+        return jsonify(f'Error: unknown job {job_id}'), 404
+
+    return jsonify(job), 200
+
+
 @app.route('/api/get-all-links-to-concept', methods=['POST'])
 def get_all_links_to_concept():
     try:
@@ -0,0 +1,129 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+################################################
+# DEADLINES AND CANCELLATION FOR SEARCHES
+################################################
+# /api/search runs under a CancelToken carrying the request's deadline. The
+# token is reachable from anywhere on the search path through a context
+# variable (crew_pool.kickoff copies it into the crew's worker thread), so crew
+# step callbacks and tools can stop work once the user has gone away
+# (/api/cancel-search) or the deadline has passed, and HTTP tools never wait
+# longer than the time the search has left.
+
+
+class SearchCancelled(BaseException):
+    """
+    Raised when the current search was cancelled or ran out of time. Like
+    asyncio.CancelledError it derives from BaseException so the broad
+    `except Exception` handlers in tools and CrewAI do not swallow it.
+    """
+
+
+class CancelToken:
+    def __init__(self, deadline_seconds=None):
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set() or self.expired
+
+    def remaining(self):
+        """Seconds left before the deadline (None when there is no deadline)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise SearchCancelled("search cancelled")
+        if self.expired:
+            raise SearchCancelled("search deadline exceeded")
+
+
+_current = ContextVar("cancel_token", default=None)
+
+
+def current_token():
+    return _current.get()
+
+
+@contextmanager
+def cancel_scope(token):
+    """Makes `token` the current token for the enclosed block."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def check_cancelled():
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+def tool_timeout(default, minimum=1.0):
+    """
+    Timeout for an outbound call made on behalf of the current search: the
+    tool's own default, capped by the time left before the deadline.
+    """
+    token = _current.get()
+    if token is None:
+        return default
+    token.check()
+    remaining = token.remaining()
+    if remaining is None:
+        return default
+    return max(minimum, min(default, remaining))
+
+
+def step_callback(_step):
+    """CrewAI step_callback: stops the agent loop between steps once cancelled."""
+    check_cancelled()
+
+
+################################################
+# IN-FLIGHT SEARCH REGISTRY
+################################################
+_searches = {}
+_searches_lock = threading.Lock()
+
+
+@contextmanager
+def registered(search_id, token):
+    """Lets /api/cancel-search find `token` by id while the search runs."""
+    if search_id:
+        with _searches_lock:
+            _searches[search_id] = token
+    try:
+        yield token
+    finally:
+        if search_id:
+            with _searches_lock:
+                if _searches.get(search_id) is token:
+                    del _searches[search_id]
+
+
+def cancel_search(search_id):
+    """
+    Returns:
+        True if a running search with that id was found and cancelled.
+    """
+    with _searches_lock:
+        token = _searches.get(search_id)
+    if token is None:
+        return False
+    token.cancel()
+    return True
@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from backend.src.db_controller import run_db_query
+from backend.config import CONCEPT_CACHE_PATH
+from backend.src.metrics import record_cache
+
+################################################
+# IN-MEMORY CONCEPT EMBEDDING MATRIX
+################################################
+# All concept embeddings live in one contiguous float32 matrix with unit-norm
+# rows, so cosine similarity against every concept is a single mat-vec
+# product instead of a Cypher scan over c.embeds.
+
+
+# Debounce for rewriting the snapshot after add(): bursts of new concepts
+# cost one write
+SNAPSHOT_DELAY = 30.0
+
+
+def _checksum(embedding):
+    """Sum of the raw embedding, computed the same way as the Cypher reduce() below."""
+    total = 0.0
+    for x in np.asarray(embedding, dtype=np.float64).reshape(-1):
+        total += float(x)
+    return total
+
+
+def _fingerprint(names, intents, checksums):
+    """
+    Content hash of the cached concepts, independent of their order. A
+    snapshot is only reused when it matches the graph's fingerprint, so a
+    renamed concept or changed intent/embedding forces a rebuild.
+    """
+    digest = hashlib.sha256()
+    for name, intent, checksum in sorted(zip(names, intents, checksums), key=lambda row: row[0]):
+        digest.update(f"{name}\x1f{intent}\x1f{checksum:.6e}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _unit(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class ConceptMatrix:
+    def __init__(self, names=None, intents=None, matrix=None, checksums=None):
+        self.names = list(names or [])
+        self.intents = list(intents or [])
+        self.checksums = list(checksums) if checksums is not None else [0.0] * len(self.names)
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self._matrix = matrix if matrix is not None else np.zeros((0, 0), dtype=np.float32)
+        self._lock = threading.Lock()
+        # Called (outside the lock) after add() changed the cache
+        self.on_change = None
+        # Fingerprint stored with a loaded snapshot (see save())
+        self.snapshot_fingerprint = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def matrix(self):
+        """The populated rows (the backing array over-allocates to amortise add())."""
+        return self._matrix[:len(self.names)]
+
+    @classmethod
+    def from_db(cls):
+        result = run_db_query("""
+        MATCH (c:Concept)
+        WHERE c.embeds IS NOT NULL
+        RETURN c.name AS name, c.intent AS intent, c.embeds AS embeds
+        """)
+        if isinstance(result, str):
+            raise RuntimeError(result)
+
+        if not result:
+            return cls()
+
+        matrix = np.ascontiguousarray(_unit([r["embeds"] for r in result]))
+        checksums = [_checksum(r["embeds"]) for r in result]
+        return cls([r["name"] for r in result], [r["intent"] for r in result], matrix, checksums)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a snapshot written by save(). With mmap the matrix is mapped
+        read-only from disk, so several worker processes share one copy.
+        """
+        with open(path + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(path + ".npy", mmap_mode="r" if mmap else None)
+
+        cache = cls(meta["names"], meta["intents"], matrix, meta.get("checksums"))
+        cache.snapshot_fingerprint = meta.get("fingerprint")
+        return cache
+
+    def save(self, path):
+        """
+        Writes a snapshot. Both files are replaced atomically, so processes
+        that still have the previous matrix mapped keep a valid file.
+        """
+        with self._lock:
+            matrix = np.ascontiguousarray(self.matrix)
+            meta = {
+                "names": list(self.names),
+                "intents": list(self.intents),
+                "checksums": list(self.checksums),
+                "fingerprint": _fingerprint(self.names, self.intents, self.checksums),
+            }
+
+        np.save(path + ".tmp.npy", matrix)
+        os.replace(path + ".tmp.npy", path + ".npy")
+        with open(path + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(path + ".json.tmp", path + ".json")
+
+    def add(self, name, intent, embedding):
+        """
+        Incrementally adds a concept. Mirrors MERGE ... ON CREATE: a name that
+        is already cached keeps its original embedding.
+        """
+        vector = _unit(embedding).reshape(-1)
+        checksum = _checksum(embedding)
+
+        if self.contains(name):
+            return
+
+        with self._lock:
+            if name in self.positions:
+                return
+
+            n = len(self.names)
+            if self._matrix.shape[0] == n or not self._matrix.flags.writeable:
+                # Grow geometrically; this also copies a read-only mmap into memory
+                capacity = max(16, 2 * n)
+                grown = np.zeros((capacity, vector.shape[0]), dtype=np.float32)
+                if n:
+                    grown[:n] = self._matrix[:n]
+                self._matrix = grown
+
+            self._matrix[n] = vector
+            self.positions[name] = n
+            self.names.append(name)
+            self.intents.append(intent)
+            self.checksums.append(checksum)
+
+        if self.on_change is not None:
+            self.on_change()
+
+    def contains(self, name):
+        """Name lookup, counted in the concept_matrix cache metric."""
+        cached = name in self.positions
+        record_cache("concept_matrix", cached)
+        return cached
+
+    def similarities(self, embedding):
+        """Cosine similarity of `embedding` against every cached concept."""
+        if not self.names:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ _unit(embedding).reshape(-1)
+
+    def top_k(self, embedding, top_k=5):
+        """
+        Returns the `top_k` most similar concepts in the same shape as the
+        old Cypher query: [{"name", "intent", "similarity"}] sorted descending.
+        """
+        scores = self.similarities(embedding)
+        if scores.size == 0:
+            return []
+
+        k = min(top_k, scores.size)
+        # argpartition is O(n); only the k survivors get sorted
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+
+        return [
+            {"name": self.names[i], "intent": self.intents[i], "similarity": float(scores[i])}
+            for i in idx
+        ]
+
+    def top_k_many(self, embeddings, top_k=5):
+        """
+        Batched top_k: scores every query against every concept with one
+        matrix multiply and returns one result list per query row.
+        """
+        queries = _unit(embeddings).reshape(len(embeddings), -1)
+        if not self.names or queries.shape[0] == 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        scores = queries @ self.matrix.T
+        k = min(top_k, scores.shape[1])
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, idx, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+
+        return [
+            [
+                {"name": self.names[i], "intent": self.intents[i], "similarity": float(scores[row, i])}
+                for i in idx[row]
+            ]
+            for row in range(scores.shape[0])
+        ]
+
+
+CONCEPT_CACHE = None
+_cache_lock = threading.Lock()
+
+
+def _graph_fingerprint():
+    # One float per concept instead of the full 384-d embedding
+    result = run_db_query("""
+    MATCH (c:Concept)
+    WHERE c.embeds IS NOT NULL
+    RETURN c.name AS name, c.intent AS intent, reduce(s = 0.0, x IN c.embeds | s + x) AS checksum
+    """)
+    if isinstance(result, str):
+        return None
+    return _fingerprint([r["name"] for r in result], [r["intent"] for r in result],
+                        [r["checksum"] for r in result])
+
+
+_snapshot_timer = None
+_snapshot_lock = threading.Lock()
+
+
+def _save_snapshot():
+    global _snapshot_timer
+    with _snapshot_lock:
+        _snapshot_timer = None
+    cache = CONCEPT_CACHE
+    if cache is not None and CONCEPT_CACHE_PATH:
+        try:
+            cache.save(CONCEPT_CACHE_PATH)
+        except OSError as e:
+            print(f"Concept cache snapshot failed: {e}")
+
+
+def _schedule_snapshot():
+    """Rewrites the snapshot SNAPSHOT_DELAY seconds after the first change."""
+    global _snapshot_timer
+    with _snapshot_lock:
+        if _snapshot_timer is None:
+            _snapshot_timer = threading.Timer(SNAPSHOT_DELAY, _save_snapshot)
+            _snapshot_timer.daemon = True
+            _snapshot_timer.start()
+
+
+def get_concept_cache():
+    """
+    Returns the process-wide ConceptMatrix, building it on first use.
+    If CONCEPT_CACHE_PATH is set, a snapshot whose content fingerprint still
+    matches the graph is memory-mapped from disk; otherwise it is rebuilt
+    from Neo4j and the snapshot rewritten. Concepts added later are written
+    back to the snapshot shortly after.
+    """
+    global CONCEPT_CACHE
+    if CONCEPT_CACHE is not None:
+        return CONCEPT_CACHE
+
+    with _cache_lock:
+        if CONCEPT_CACHE is None:
+            cache = None
+            if CONCEPT_CACHE_PATH and os.path.exists(CONCEPT_CACHE_PATH + ".npy"):
+                snapshot = ConceptMatrix.load(CONCEPT_CACHE_PATH)
+                fingerprint = snapshot.snapshot_fingerprint
+                if fingerprint is not None and fingerprint == _graph_fingerprint():
+                    cache = snapshot
+                record_cache("concept_snapshot", cache is not None)
+            if cache is None:
+                cache = ConceptMatrix.from_db()
+                if CONCEPT_CACHE_PATH:
+                    cache.save(CONCEPT_CACHE_PATH)
+            if CONCEPT_CACHE_PATH:
+                cache.on_change = _schedule_snapshot
+            print(f"Concept cache loaded with {len(cache)} concepts")
+            CONCEPT_CACHE = cache
+
+    return CONCEPT_CACHE
+
+
+def invalidate_concept_cache():
+    """Drops the cache so the next lookup reloads it from the graph."""
+    global CONCEPT_CACHE
+    with _cache_lock:
+        CONCEPT_CACHE = None
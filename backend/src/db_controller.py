@@ -1,14 +1,36 @@
 import flask
+import threading
+import time
 from neo4j import GraphDatabase
-from backend.config import NEO4J_API_URL, NEO4J_PASSWORD, NEO4J_USER
+from backend.config import NEO4J_API_URL, NEO4J_PASSWORD, NEO4J_USER, NEO4J_POOL_SIZE
+from backend.src.metrics import NEO4J_POOL_SIZE as POOL_SIZE_GAUGE, NEO4J_ACTIVE_SESSIONS, NEO4J_QUERY_LATENCY
 
 URI = NEO4J_API_URL
 AUTH = (NEO4J_USER, NEO4J_PASSWORD)
 
+# One driver (and so one connection pool) per process instead of per query
+DRIVER = None
+_driver_lock = threading.Lock()
+
+def get_driver():
+    global DRIVER
+    if DRIVER is None:
+        with _driver_lock:
+            if DRIVER is None:
+                DRIVER = GraphDatabase.driver(URI, auth=AUTH, max_connection_pool_size=NEO4J_POOL_SIZE)
+                POOL_SIZE_GAUGE.set(NEO4J_POOL_SIZE)
+    return DRIVER
+
 def run_db_query(query, vars={}):
-    with GraphDatabase.driver(URI, auth=AUTH).session() as session:
-        try:
-            result = session.run(query, vars)
-            return [record.data() for record in result]
-        except Exception as e:
-            return f"Error! Database error: {e}"
\ No newline at end of file
+    NEO4J_ACTIVE_SESSIONS.inc()
+    start = time.perf_counter()
+    try:
+        with get_driver().session() as session:
+            try:
+                result = session.run(query, vars)
+                return [record.data() for record in result]
+            except Exception as e:
+                return f"Error! Database error: {e}"
+    finally:
+        NEO4J_ACTIVE_SESSIONS.dec()
+        NEO4J_QUERY_LATENCY.observe(time.perf_counter() - start)
@@ -0,0 +1,100 @@
+from backend.src.db_controller import run_db_query
+
+################################################
+# SCHEMA BOOTSTRAP FOR THE MAIN GRAPH
+################################################
+# Every write in query_orch MERGEs on one of these keys, so without a
+# uniqueness constraint (which also creates a backing index) each MERGE
+# turns into a full label scan.
+EMBEDDING_DIMENSIONS = 384  # all-MiniLM-L6-v2
+
+CONSTRAINTS = {
+    "concept_name_unique": """
+    CREATE CONSTRAINT concept_name_unique IF NOT EXISTS
+    FOR (c:Concept) REQUIRE c.name IS UNIQUE
+    """,
+    "query_content_unique": """
+    CREATE CONSTRAINT query_content_unique IF NOT EXISTS
+    FOR (q:Query) REQUIRE q.content IS UNIQUE
+    """,
+    "link_address_unique": """
+    CREATE CONSTRAINT link_address_unique IF NOT EXISTS
+    FOR (l:Link) REQUIRE l.address IS UNIQUE
+    """,
+}
+
+INDEXES = {
+    "concept_embeds": f"""
+    CREATE VECTOR INDEX concept_embeds IF NOT EXISTS
+    FOR (c:Concept) ON c.embeds
+    OPTIONS {{indexConfig: {{
+        `vector.dimensions`: {EMBEDDING_DIMENSIONS},
+        `vector.similarity_function`: 'cosine'
+    }}}}
+    """,
+}
+
+
+def create_schema():
+    """
+    Creates every constraint and index in CONSTRAINTS and INDEXES.
+    The statements are idempotent, so this is safe to run on every startup.
+
+    Returns:
+        A dictionary of schema object name -> error message for the
+        statements the database rejected.
+    """
+    errors = {}
+    for name, statement in {**CONSTRAINTS, **INDEXES}.items():
+        result = run_db_query(statement)
+        if isinstance(result, str):
+            errors[name] = result
+
+    return errors
+
+
+def verify_schema():
+    """
+    Checks which of the expected constraints and indexes exist and are online.
+
+    Returns:
+        A list with the names of missing (or not yet ONLINE) schema objects.
+    """
+    constraints = run_db_query("SHOW CONSTRAINTS YIELD name RETURN name")
+    indexes = run_db_query("SHOW INDEXES YIELD name, state RETURN name, state")
+
+    if isinstance(constraints, str) or isinstance(indexes, str):
+        return list(CONSTRAINTS) + list(INDEXES)
+
+    existing_constraints = {record["name"] for record in constraints}
+    online_indexes = {record["name"] for record in indexes if record["state"] == "ONLINE"}
+
+    missing = [name for name in CONSTRAINTS if name not in existing_constraints]
+    missing += [name for name in INDEXES if name not in online_indexes]
+
+    return missing
+
+
+def ensure_schema():
+    """
+    Startup hook: creates the schema, then verifies it and reports anything
+    that is still missing.
+
+    Returns:
+        A list with the names of missing schema objects (empty when healthy).
+    """
+    errors = create_schema()
+    for name, error in errors.items():
+        print(f"Schema migration failed for {name}: {error}")
+
+    missing = verify_schema()
+    if missing:
+        print(f"Missing graph schema objects: {', '.join(missing)}")
+    else:
+        print("Graph schema verified: all constraints and indexes present")
+
+    return missing
+
+
+if __name__ == "__main__":
+    ensure_schema()
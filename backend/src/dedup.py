@@ -0,0 +1,227 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+################################################
+# NEAR-DUPLICATE DETECTION FOR SEARCH RESULTS
+################################################
+# Syndicated stories come back from NewsAPI, GDELT and Exa under different
+# URLs and slightly different headlines. Two results are duplicates when
+#   * their canonical URLs match (tracking params, www., fragments, AMP
+#     suffixes and trailing slashes removed), or
+#   * the 64-bit SimHash of title + snippet differs in at most
+#     MAX_HAMMING_DISTANCE bits. An LSH index over 16-bit bands finds the
+#     candidates without comparing every pair. Texts shorter than
+#     MIN_SIMHASH_TOKENS ("Home", an untitled PDF) say nothing about the
+#     page, so those results are compared by URL only.
+# Results may use either "url" (tool output) or "link" (consolidate output).
+
+SIMHASH_BITS = 64
+BANDS = 4
+MAX_HAMMING_DISTANCE = 3  # < BANDS, so a near-duplicate shares at least one band exactly
+MIN_SIMHASH_TOKENS = 4
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "cmpid", "ocid", "smid", "sr_share", "spm",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def canonicalize_url(url):
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if not host:
+        # Placeholders such as "N/A" identify nothing
+        return ""
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("m.") or host.startswith("amp."):
+        host = host.split(".", 1)[1]
+
+    path = re.sub(r"/(amp|amp\.html)/?$", "", parts.path) or "/"
+    path = path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS and k.lower() != "amp"
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def _features(text):
+    tokens = _TOKEN.findall(text.lower())
+    # Words plus word bigrams, so re-ordered headlines still differ a little
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def simhash(text, bits=SIMHASH_BITS):
+    weights = [0] * bits
+    for feature in _features(text):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i, w in enumerate(weights) if w > 0)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _item_url(item):
+    return item.get("url") or item.get("link") or ""
+
+
+def _item_text(item):
+    # "Headline - Outlet" suffixes differ between syndicated copies
+    title = (item.get("title") or "").split(" - ")[0]
+    return f"{title} {item.get('snippet') or ''}"
+
+
+def _item_fingerprint(item):
+    """SimHash of the item's text, or None when the text is too short to compare."""
+    text = _item_text(item)
+    if len(_TOKEN.findall(text.lower())) < MIN_SIMHASH_TOKENS:
+        return None
+    return simhash(text)
+
+
+class SimHashIndex:
+    """Banded LSH over SimHash fingerprints."""
+
+    def __init__(self, bands=BANDS, bits=SIMHASH_BITS, max_distance=MAX_HAMMING_DISTANCE):
+        self.bands = bands
+        self.band_bits = bits // bands
+        self.max_distance = max_distance
+        self._buckets = [{} for _ in range(bands)]
+        self._fingerprints = {}
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.bands)]
+
+    def add(self, key, fingerprint):
+        self._fingerprints[key] = fingerprint
+        for band, value in enumerate(self._band_keys(fingerprint)):
+            self._buckets[band].setdefault(value, set()).add(key)
+
+    def remove(self, key):
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for band, value in enumerate(self._band_keys(fingerprint)):
+            bucket = self._buckets[band].get(value)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][value]
+
+    def query(self, fingerprint):
+        """Keys whose fingerprint is within max_distance bits of `fingerprint`."""
+        candidates = set()
+        for band, value in enumerate(self._band_keys(fingerprint)):
+            candidates |= self._buckets[band].get(value, set())
+        return [k for k in candidates if hamming(self._fingerprints[k], fingerprint) <= self.max_distance]
+
+
+class RecentStories:
+    """
+    Stories seen by recent requests (any crew). A syndicated copy of one of
+    them is reported as that story, so repeated searches converge on the same
+    URL per story instead of a different mirror each time.
+    """
+
+    def __init__(self, max_entries=5000, ttl=6 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._index = SimHashIndex()
+        self._urls = {}
+        self._entries = OrderedDict()  # key -> (expires, item)
+        self._lock = threading.Lock()
+        self._next_key = 0
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._entries:
+            key, (expires, _) = next(iter(self._entries.items()))
+            if expires > now and len(self._entries) <= self.max_entries:
+                break
+            self._drop(key)
+
+    def _drop(self, key):
+        _, item = self._entries.pop(key)
+        self._index.remove(key)
+        canonical = canonicalize_url(_item_url(item))
+        if self._urls.get(canonical) == key:
+            del self._urls[canonical]
+
+    def match(self, canonical, fingerprint):
+        with self._lock:
+            self._expire()
+            key = self._urls.get(canonical) if canonical else None
+            if key is None and fingerprint is not None:
+                matches = self._index.query(fingerprint)
+                key = matches[0] if matches else None
+            return None if key is None else self._entries[key][1]
+
+    def add(self, item, canonical, fingerprint):
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = (time.monotonic() + self.ttl, item)
+            if fingerprint is not None:
+                self._index.add(key, fingerprint)
+            if canonical:
+                self._urls.setdefault(canonical, key)
+            self._expire()
+
+
+RECENT_STORIES = RecentStories()
+
+
+def dedupe(items, recent=None):
+    """
+    Drops near-duplicates, keeping the first occurrence (callers pass results
+    best-first). With `recent`, a result matching a story from an earlier
+    request is replaced by the version shown then.
+
+    Returns:
+        A new list; input dictionaries are not modified.
+    """
+    index = SimHashIndex()
+    seen_urls = set()
+    kept = []
+
+    for item in items:
+        canonical = canonicalize_url(_item_url(item))
+        fingerprint = _item_fingerprint(item)
+        if canonical and canonical in seen_urls:
+            continue
+        if fingerprint is not None and index.query(fingerprint):
+            continue
+
+        if recent is not None:
+            earlier = recent.match(canonical, fingerprint)
+            if earlier is None:
+                recent.add(item, canonical, fingerprint)
+            elif _item_url(earlier) != _item_url(item):
+                earlier_canonical = canonicalize_url(_item_url(earlier))
+                # That story is already in this batch under its earlier URL
+                if earlier_canonical and earlier_canonical in seen_urls:
+                    continue
+                item = dict(item)
+                item["link" if "link" in item else "url"] = _item_url(earlier)
+                item["title"] = earlier.get("title", item.get("title"))
+                seen_urls.add(earlier_canonical)
+
+        seen_urls.add(canonical)
+        if fingerprint is not None:
+            index.add(len(kept), fingerprint)
+        kept.append(item)
+
+    return kept
@@ -4,55 +4,70 @@ from backend.src.db_controller import run_db_query
 from backend.src.db_schema import Concept, Query, Link
 from backend.tools.intent_zero_shot_classifier import classify_intent_zero_shot
 from backend.tools.intent_categorizer import get_intent
+from backend.tools.intent_roberta_classifier import classify_intent_roberta
+from backend.tools.intent_router import INTENT_LABELS, is_confident, rule_intent
+from backend.src.tracing import span
 
 vector_bp = Blueprint("vector", __name__, url_prefix='/api/vector')
 
-INTENT_LABELS = ["Research", "Answer", "Transactional", "News", "Navigational"]
 
 def collect_all_intent(query):
-    source_names = ["DB", "RoBERTa", "Gmail", "Browsing", "Other"]
+    # Cascade: regex rules -> fine-tuned RoBERTa -> DeBERTa zero-shot -> LLM over
+    # the memory graph. Each stage only runs when the previous ones were not confident.
+    with span("intent.rules"):
+        rules = rule_intent(query)
+    if rules is not None and is_confident(rules["score"]):
+        return({
+            "most_significant": {"source": "Rules", "intent": rules["intent"], "score": float(rules["score"])}
+        })
+
+    source_names = ["RoBERTa", "DeBERTa", "DB", "Gmail", "Browsing", "Other"]
+    span_names = ["intent.roberta", "intent.deberta", "intent.llm"]
+    stages = [
+        lambda: classify_intent_roberta(query),
+        lambda: classify_intent_zero_shot(query),
+        lambda: {"all_scores": get_intent(query)},
+    ]
     intent_matrix = []
+    matrix_sources = []
+    if rules is not None:
+        # A hint-level rule match (e.g. "cheap", "latest") votes with the model stages
+        intent_matrix.append(list(rules["all_scores"].values()))
+        matrix_sources.append("Rules")
+
+    for source, span_name, stage in zip(source_names, span_names, stages):
+        with span(span_name):
+            result = stage()
+        if result is None:
+            # Source not configured (e.g. no fine-tuned checkpoint)
+            continue
 
-    db_intent_vector = list(get_intent(query).values())
-    for i, score in enumerate(db_intent_vector):
-        if score > 0.85:
-            return({
-                "most_significant": {
-                    "source": source_names[0],
-                    "intent": INTENT_LABELS[i],
-                    "score": float(score)
-                }
-            })
-    intent_matrix.append(db_intent_vector)
-
-    roberta_vector = list(classify_intent_zero_shot(query).get('all_scores').values())
-    for i, score in enumerate(roberta_vector):
-        if score > 0.85:
-            return({
-                "most_significant": {
-                    "source": source_names[1],
-                    "intent": INTENT_LABELS[i],
-                    "score": float(score)
-                }
-            })
-    intent_matrix.append(roberta_vector)
+        vector = list(result.get('all_scores').values())
+        for i, score in enumerate(vector):
+            if is_confident(score):
+                return({
+                    "most_significant": {
+                        "source": source,
+                        "intent": INTENT_LABELS[i],
+                        "score": float(score)
+                    }
+                })
+        intent_matrix.append(vector)
+        matrix_sources.append(source)
 
     # Combine all into 5x5 matrix
-    intent_matrix = np.array([
-        db_intent_vector,
-        roberta_vector,
-    ])
+    intent_matrix = np.array(intent_matrix)
 
     # Find the most significant (max) component
     max_idx = np.unravel_index(np.argmax(intent_matrix, axis=None), intent_matrix.shape)
     source_idx, intent_idx = max_idx
 
     max_info = {
-        "source": source_names[source_idx],
+        "source": matrix_sources[source_idx],
         "intent": INTENT_LABELS[intent_idx],
         "score": float(intent_matrix[source_idx][intent_idx])
     }
 
     return({
         "most_significant": max_info
-    })
\ No newline at end of file
+    })
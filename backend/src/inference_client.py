@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing.connection import Client
+import numpy as np
+from backend.config import (
+    INFERENCE_SERVER_ADDRESS, INFERENCE_SERVER_AUTHKEY,
+    INFERENCE_SERVER_TIMEOUT, INFERENCE_SERVER_RETRY_SECONDS, INFERENCE_LOCAL_FALLBACK,
+)
+
+################################################
+# THIN CLIENT FOR THE INFERENCE SERVER
+################################################
+# When INFERENCE_SERVER_ADDRESS is set, web workers do not load the
+# embedding model or the intent classifiers themselves; the stand-ins below
+# forward to backend/src/inference_server.py over a local socket and mimic
+# the interfaces of the objects they replace. Messages are JSON (never
+# pickle). A server that cannot be reached or does not answer within
+# INFERENCE_SERVER_TIMEOUT is skipped for INFERENCE_SERVER_RETRY_SECONDS.
+# Meanwhile the stand-ins raise InferenceUnavailable (intent stages skip
+# themselves), unless INFERENCE_LOCAL_FALLBACK allows loading the model
+# in-process: that is the per-worker memory the server exists to avoid.
+
+# Set by the inference server itself so its own loaders stay local
+SERVING = False
+# Largest message either side accepts (a batch of embeddings is well below)
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+_local = threading.local()
+_down_until = 0.0
+
+
+class InferenceUnavailable(Exception):
+    """The server could not be reached or did not answer in time."""
+
+
+def use_inference_server():
+    # Without INFERENCE_SERVER_AUTHKEY every call fails as unavailable
+    return bool(INFERENCE_SERVER_ADDRESS) and not SERVING
+
+
+def parse_address(address):
+    """"host:port" -> (host, port) for TCP; anything else is a Unix socket path."""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return (host, int(port))
+    return address
+
+
+def encode_message(value):
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def decode_message(data):
+    return json.loads(data.decode("utf-8"))
+
+
+def _connect(timeout):
+    # Client() has no timeout of its own and the handshake blocks on a hung
+    # server, so it runs on a helper thread that is abandoned on timeout
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(Client(parse_address(INFERENCE_SERVER_ADDRESS),
+                                     authkey=INFERENCE_SERVER_AUTHKEY.encode("utf-8")))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="inference-connect", daemon=True).start()
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        # Close the connection if the handshake finishes after all
+        future.add_done_callback(lambda f: f.exception() is None and f.result().close())
+        raise TimeoutError(f"No handshake from inference server within {timeout}s")
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect(INFERENCE_SERVER_TIMEOUT)
+    return conn
+
+
+def _drop_connection():
+    conn, _local.conn = getattr(_local, "conn", None), None
+    if conn is not None:
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+
+def _request(op, payload):
+    conn = _connection()
+    conn.send_bytes(encode_message([op, payload]))
+    if not conn.poll(INFERENCE_SERVER_TIMEOUT):
+        # The late answer would be read as the reply to the next request
+        _drop_connection()
+        raise TimeoutError(f"Inference server {op} took longer than {INFERENCE_SERVER_TIMEOUT}s")
+    return decode_message(conn.recv_bytes(MAX_MESSAGE_BYTES))
+
+
+def call(op, payload=None):
+    """
+    Sends one request on this thread's connection, reconnecting once if the
+    server was restarted.
+
+    Raises:
+        InferenceUnavailable: if the server is down, hung or recently failed.
+        RuntimeError: if the server answered with an error.
+    """
+    global _down_until
+    if not INFERENCE_SERVER_AUTHKEY:
+        raise InferenceUnavailable("INFERENCE_SERVER_ADDRESS is set without INFERENCE_SERVER_AUTHKEY")
+    if time.monotonic() < _down_until:
+        raise InferenceUnavailable("Inference server recently failed")
+
+    for attempt in range(2):
+        try:
+            status, result = _request(op, payload)
+            break
+        except (EOFError, OSError) as e:  # TimeoutError is an OSError
+            _drop_connection()
+            if attempt or isinstance(e, TimeoutError):
+                _down_until = time.monotonic() + INFERENCE_SERVER_RETRY_SECONDS
+                print(f"Inference server unavailable for {INFERENCE_SERVER_RETRY_SECONDS}s: {e!r}")
+                raise InferenceUnavailable(str(e)) from e
+    if status != "ok":
+        raise RuntimeError(f"Inference server {op} failed: {result}")
+    return result
+
+
+class LocalFallback:
+    """
+    The in-process model, loaded the first time the server is unavailable
+    when INFERENCE_LOCAL_FALLBACK allows it.
+    """
+
+    def __init__(self, load):
+        self._load = load
+        self._model = None
+        self._lock = threading.Lock()
+
+    def get(self, error):
+        """Raises `error` (the server failure) unless the fallback is enabled."""
+        if not INFERENCE_LOCAL_FALLBACK:
+            raise error
+        with self._lock:
+            if self._model is None:
+                self._model = self._load()
+            return self._model
+
+
+class RemoteEmbeddingModel:
+    """Stands in for SentenceTransformer.encode."""
+
+    def __init__(self, load_local):
+        self._local = LocalFallback(load_local)
+
+    def encode(self, sentences, **kwargs):
+        single = isinstance(sentences, str)
+        try:
+            embeddings = call("encode", [sentences] if single else list(sentences))
+        except InferenceUnavailable as e:
+            return self._local.get(e).encode(sentences, **kwargs)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+
+class RemoteZeroShot:
+    """Stands in for the zero-shot-classification pipeline (one sequence per call)."""
+
+    def __init__(self, load_local):
+        self._local = LocalFallback(load_local)
+
+    def __call__(self, sequence, candidate_labels, hypothesis_template="This example is {}.", multi_label=False):
+        try:
+            return call("zero_shot", {
+                "sequence": sequence,
+                "candidate_labels": list(candidate_labels),
+                "hypothesis_template": hypothesis_template,
+                "multi_label": multi_label,
+            })
+        except InferenceUnavailable as e:
+            return self._local.get(e)(sequence, candidate_labels,
+                                     hypothesis_template=hypothesis_template, multi_label=multi_label)
+
+
+class RemoteRoberta:
+    """Stands in for the torch/ONNX backends of intent_roberta_classifier."""
+
+    def __init__(self, load_local):
+        self._local = LocalFallback(load_local)
+        self._id2label = None
+
+    @property
+    def id2label(self):
+        if self._id2label is None:
+            try:
+                self._id2label = {int(k): v for k, v in call("roberta_labels").items()}
+            except InferenceUnavailable as e:
+                return self._local.get(e).id2label
+        return self._id2label
+
+    def logits(self, texts):
+        try:
+            return np.asarray(call("roberta_logits", list(texts)), dtype=np.float32)
+        except InferenceUnavailable as e:
+            return self._local.get(e).logits(texts)
@@ -0,0 +1,196 @@
+"""Model-serving process shared by every web worker on a node.
+
+Owns the MiniLM embedding model, the DeBERTa zero-shot pipeline and (when
+ROBERTA_INTENT_MODEL_PATH is set) the fine-tuned RoBERTa classifier, so the
+weights are loaded once per node instead of once per Flask worker. Web
+workers reach it through backend/src/inference_client.py when
+INFERENCE_SERVER_ADDRESS is set. Concurrent requests for the same model are
+collected into one batched forward pass.
+
+Clients must pass the INFERENCE_SERVER_AUTHKEY handshake, and requests and
+replies are JSON, so a connection can never make the server unpickle
+anything. The server listens on loopback unless told otherwise; a Unix socket
+path keeps it off the network entirely.
+
+Usage:
+    INFERENCE_SERVER_AUTHKEY=... python -m backend.src.inference_server --address /run/gyrus/inference.sock
+    INFERENCE_SERVER_ADDRESS=/run/gyrus/inference.sock INFERENCE_SERVER_AUTHKEY=... flask --app backend.src.app run
+"""
+
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Listener
+from backend.config import (
+    INFERENCE_SERVER_ADDRESS, INFERENCE_SERVER_AUTHKEY,
+    INFERENCE_BATCH_SIZE, INFERENCE_MAX_WAIT_MS,
+)
+from backend.src import inference_client
+from backend.src.inference_client import parse_address, encode_message, decode_message, MAX_MESSAGE_BYTES
+
+
+class BatchingQueue:
+    """
+    Collects requests for up to `max_wait` seconds (or `max_batch` items) and
+    runs them through `run_batch(key, items)` grouped by key.
+    """
+
+    def __init__(self, name, run_batch, max_batch, max_wait):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name=f"batch-{name}", daemon=True).start()
+
+    def submit(self, key, item):
+        future = Future()
+        self._queue.put((key, item, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups = {}
+            for key, item, future in batch:
+                groups.setdefault(key, []).append((item, future))
+
+            for key, entries in groups.items():
+                try:
+                    results = self.run_batch(key, [item for item, _ in entries])
+                except Exception as e:
+                    for _, future in entries:
+                        future.set_exception(e)
+                    continue
+                for (_, future), result in zip(entries, results):
+                    future.set_result(result)
+
+
+def _split(rows, sizes):
+    out, start = [], 0
+    for size in sizes:
+        out.append(rows[start:start + size])
+        start += size
+    return out
+
+
+################################################
+# MODEL OPERATIONS
+################################################
+class InferenceService:
+    def __init__(self, max_batch, max_wait):
+        from backend.src.query_orch import get_embedding_model
+        from backend.tools import intent_zero_shot_classifier, intent_roberta_classifier
+
+        self.embedding_model = get_embedding_model()
+        intent_zero_shot_classifier.initialize_classifier()
+        self.zero_shot = intent_zero_shot_classifier.CLASSIFIER
+        self.roberta = None
+        if intent_roberta_classifier.initialize_roberta_classifier():
+            self.roberta = intent_roberta_classifier.ROBERTA_CLASSIFIER
+
+        self.queues = {
+            "encode": BatchingQueue("encode", self._encode, max_batch, max_wait),
+            "zero_shot": BatchingQueue("zero_shot", self._zero_shot, max_batch, max_wait),
+            "roberta_logits": BatchingQueue("roberta", self._roberta_logits, max_batch, max_wait),
+        }
+
+    def _encode(self, _, requests):
+        texts = [t for texts in requests for t in texts]
+        embeddings = self.embedding_model.encode(texts, batch_size=64, convert_to_numpy=True)
+        return _split(embeddings.tolist(), [len(texts) for texts in requests])
+
+    def _zero_shot(self, key, sequences):
+        candidate_labels, hypothesis_template, multi_label = key
+        results = self.zero_shot(sequences, list(candidate_labels),
+                                 hypothesis_template=hypothesis_template, multi_label=multi_label)
+        # The pipeline returns a bare dict for a single sequence
+        return [results] if isinstance(results, dict) else results
+
+    def _roberta_logits(self, _, requests):
+        texts = [t for texts in requests for t in texts]
+        return _split(self.roberta.logits(texts).tolist(), [len(texts) for texts in requests])
+
+    def handle(self, op, payload):
+        if op == "ping":
+            return "pong"
+        if op == "encode":
+            return self.queues["encode"].submit(None, payload)
+        if op == "zero_shot":
+            key = (tuple(payload["candidate_labels"]), payload["hypothesis_template"], payload["multi_label"])
+            return self.queues["zero_shot"].submit(key, payload["sequence"])
+        if op == "roberta_labels":
+            if self.roberta is None:
+                raise RuntimeError("ROBERTA_INTENT_MODEL_PATH is not set on the inference server")
+            return dict(self.roberta.id2label)
+        if op == "roberta_logits":
+            if self.roberta is None:
+                raise RuntimeError("ROBERTA_INTENT_MODEL_PATH is not set on the inference server")
+            return self.queues["roberta_logits"].submit(None, payload)
+        raise ValueError(f"Unknown op: {op}")
+
+
+def serve_connection(service, conn):
+    with conn:
+        while True:
+            try:
+                data = conn.recv_bytes(MAX_MESSAGE_BYTES)
+            except (EOFError, OSError):
+                return
+            try:
+                op, payload = decode_message(data)
+                reply = ["ok", service.handle(op, payload)]
+            except Exception as e:
+                reply = ["error", f"{type(e).__name__}: {e}"]
+            try:
+                conn.send_bytes(encode_message(reply))
+            except OSError:
+                return
+
+
+def serve(address, authkey, max_batch=INFERENCE_BATCH_SIZE, max_wait_ms=INFERENCE_MAX_WAIT_MS, threads=None):
+    if not authkey:
+        raise ValueError("INFERENCE_SERVER_AUTHKEY must be set to a secret shared with the web workers")
+    inference_client.SERVING = True
+    if threads:
+        import torch
+
+        torch.set_num_threads(threads)
+
+    service = InferenceService(max_batch, max_wait_ms / 1000)
+    # The default backlog of 1 stalls bursts of workers connecting at once
+    with Listener(parse_address(address), backlog=128, authkey=authkey.encode("utf-8")) as listener:
+        print(f"Inference server listening on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                # Bad handshake (e.g. wrong authkey); keep serving everyone else
+                print(f"Rejected inference client: {e}")
+                continue
+            threading.Thread(target=serve_connection, args=(service, conn), daemon=True).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the embedding and intent models to local web workers.")
+    parser.add_argument("--address", default=INFERENCE_SERVER_ADDRESS or "127.0.0.1:6100",
+                        help="host:port (loopback by default) or a Unix socket path")
+    parser.add_argument("--max-batch", type=int, default=INFERENCE_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=INFERENCE_MAX_WAIT_MS)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+    if not INFERENCE_SERVER_AUTHKEY:
+        parser.error("INFERENCE_SERVER_AUTHKEY is not set; refusing to serve without a shared secret")
+
+    serve(args.address, INFERENCE_SERVER_AUTHKEY, args.max_batch, args.max_wait_ms, args.threads)
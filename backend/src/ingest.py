@@ -0,0 +1,180 @@
+import argparse
+import json
+import numpy as np
+from backend.src.db_controller import run_db_query
+from backend.src.concept_cache import get_concept_cache, invalidate_concept_cache
+from backend.src.query_orch import get_embedding_model
+from backend.tools.concept_categorizer import get_concepts
+from backend.tools.llm_gateway import llm_priority, BACKGROUND
+from backend.src.metrics import observe_inference
+
+################################################
+# BULK INGESTION OF BROWSING HISTORY
+################################################
+# Same decisions as /api/new-query + /api/add-links, but made for thousands of
+# records at once: concepts are extracted and embedded in batches, clustered
+# against the shared in-memory concept matrix, and written with UNWIND.
+
+NEW_CONCEPT_THRESHOLD = 0.35
+CONNECT_THRESHOLD = 0.40
+# Candidates considered per query, like find_similar_concepts(top_k=5)
+CONNECT_TOP_K = 5
+
+
+def normalize_records(records):
+    """
+    Merges records for the same query so each query is only classified once.
+
+    Args:
+        records: Iterable of {"query": str, "intent": str, "links": [str]}.
+
+    Returns:
+        A list of merged records, in first-seen order.
+    """
+    merged = {}
+    for record in records:
+        query = (record.get("query") or "").strip()
+        if not query:
+            continue
+        entry = merged.setdefault(query, {"query": query, "intent": record.get("intent") or "", "links": []})
+        if not entry["intent"] and record.get("intent"):
+            entry["intent"] = record["intent"]
+        for link in record.get("links") or []:
+            if link not in entry["links"]:
+                entry["links"].append(link)
+
+    return list(merged.values())
+
+
+def cluster_batch(index, records, concepts, embeddings):
+    """
+    Decides, for every record, whether it creates a new concept or connects to
+    existing ones, mirroring the thresholds used by /api/new-query.
+
+    Returns:
+        (new_concepts, searched_by) row lists ready for UNWIND.
+    """
+    new_concepts, searched_by = [], []
+
+    for record, concept, embedding in zip(records, concepts, embeddings):
+        sims = index.similarities(embedding)
+
+        if index.contains(concept):
+            # MERGE on name would land on the existing node anyway
+            matches = [concept]
+        elif sims.size == 0 or sims.max() < NEW_CONCEPT_THRESHOLD:
+            new_concepts.append({"name": concept, "intent": record["intent"], "embeds": embedding.tolist()})
+            # Later records in the same import can cluster onto this concept
+            index.add(concept, record["intent"], embedding)
+            matches = [concept]
+        else:
+            # Top-k from this record's own row: concepts added earlier in the
+            # batch are in the index but not in a batch-wide top_k_many
+            k = min(CONNECT_TOP_K, sims.size)
+            top = np.argpartition(-sims, k - 1)[:k]
+            matches = [index.names[i] for i in top if sims[i] > CONNECT_THRESHOLD]
+
+        for name in matches:
+            searched_by.append({"concept_name": name, "query_content": record["query"], "intent": record["intent"]})
+
+    return new_concepts, searched_by
+
+
+def write_batch(new_concepts, searched_by, clicked):
+    statements = [
+        ("""
+        UNWIND $rows AS row
+        MERGE (c:Concept {name: row.name})
+        ON CREATE SET c.intent = row.intent, c.embeds = row.embeds
+        """, new_concepts),
+        ("""
+        UNWIND $rows AS row
+        MERGE (c:Concept {name: row.concept_name})
+        MERGE (q:Query {content: row.query_content})
+        ON CREATE SET q.intent = row.intent
+        MERGE (c)-[:SEARCHED_BY]->(q)
+        """, searched_by),
+        ("""
+        UNWIND $rows AS row
+        MERGE (q:Query {content: row.query_content})
+        MERGE (l:Link {address: row.link_address})
+        MERGE (q)-[:CLICKED]-(l)
+        """, clicked),
+    ]
+
+    for cypher_query, rows in statements:
+        if not rows:
+            continue
+        result = run_db_query(cypher_query, {"rows": rows})
+        if isinstance(result, str):
+            raise RuntimeError(result)
+
+
+def ingest_records(records, batch_size=256, max_concurrency=8):
+    """
+    Imports browsing history into the graph in batches.
+
+    Args:
+        records: Iterable of {"query": str, "intent": str, "links": [str]}.
+        batch_size: Records per concept-extraction / embedding / write batch.
+        max_concurrency: Concurrent LLM calls for concept extraction.
+
+    Returns:
+        A dictionary of counts describing what was written.
+    """
+    records = normalize_records(records)
+    model = get_embedding_model()
+    index = get_concept_cache()
+
+    stats = {"records": len(records), "new_concepts": 0, "concept_links": 0, "clicks": 0}
+
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+
+        # get_concepts scrubs PII before anything leaves the process; bulk
+        # imports yield LLM capacity to interactive searches
+        with llm_priority(BACKGROUND):
+            concepts = get_concepts([r["query"] for r in batch], max_concurrency=max_concurrency)
+        with observe_inference("minilm_embedding"):
+            embeddings = model.encode(concepts, batch_size=batch_size, convert_to_numpy=True)
+
+        new_concepts, searched_by = cluster_batch(index, batch, concepts, embeddings)
+        clicked = [
+            {"query_content": r["query"], "link_address": link}
+            for r in batch for link in r["links"]
+        ]
+
+        try:
+            write_batch(new_concepts, searched_by, clicked)
+        except Exception:
+            # The cache already holds this batch's new concepts; resync it
+            invalidate_concept_cache()
+            raise
+
+        stats["new_concepts"] += len(new_concepts)
+        stats["concept_links"] += len(searched_by)
+        stats["clicks"] += len(clicked)
+        print(f"Ingested {min(start + batch_size, len(records))}/{len(records)} records")
+
+    return stats
+
+
+def read_records(path):
+    """Reads a JSON array or a JSON-lines file of history records."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill browsing history into the concept graph.")
+    parser.add_argument("path", help="JSON or JSON-lines file of {query, intent, links} records")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    print(ingest_records(read_records(args.path), batch_size=args.batch_size, max_concurrency=args.max_concurrency))
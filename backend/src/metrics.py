@@ -0,0 +1,160 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+################################################
+# PROMETHEUS METRICS
+################################################
+# Shared by the Flask backend (backend/src/app.py) and the MCP tool server
+# (backend/MCP/mcp_server.py); both expose them on GET /metrics.
+
+REQUEST_COUNT = Counter(
+    "gyrus_http_requests_total", "HTTP requests handled", ["app", "route", "method", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "gyrus_http_request_duration_seconds", "HTTP request latency", ["app", "route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+
+EXTERNAL_LATENCY = Histogram(
+    "gyrus_external_api_duration_seconds", "Latency of calls to external APIs", ["tool"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30)
+)
+EXTERNAL_ERRORS = Counter(
+    "gyrus_external_api_errors_total", "Failed calls to external APIs", ["tool"]
+)
+
+LLM_CALLS = Counter("gyrus_llm_calls_total", "LLM calls", ["caller", "model"])
+LLM_ERRORS = Counter("gyrus_llm_errors_total", "Failed LLM calls", ["caller", "model"])
+LLM_TOKENS = Counter("gyrus_llm_tokens_total", "LLM tokens used", ["caller", "model", "kind"])
+LLM_LATENCY = Histogram(
+    "gyrus_llm_duration_seconds", "LLM call latency", ["caller", "model"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+)
+
+MODEL_INFERENCE = Histogram(
+    "gyrus_model_inference_seconds", "Local model inference time", ["model"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+STAGE_LATENCY = Histogram(
+    "gyrus_stage_duration_seconds", "Latency of traced pipeline stages", ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+CACHE_REQUESTS = Counter(
+    "gyrus_cache_requests_total", "Cache lookups (hit ratio = hit / (hit + miss))", ["cache", "result"]
+)
+
+# Sessions, not pool connections: a session only holds a pooled connection
+# while its query runs, so this is an upper bound on connections in use
+NEO4J_ACTIVE_SESSIONS = Gauge("gyrus_neo4j_active_sessions", "Neo4j sessions currently open")
+NEO4J_POOL_SIZE = Gauge("gyrus_neo4j_pool_max_size", "Configured Neo4j connection pool size")
+NEO4J_QUERY_LATENCY = Histogram(
+    "gyrus_neo4j_query_duration_seconds", "Neo4j query latency",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+WRITE_QUEUE_DEPTH = Gauge("gyrus_write_queue_depth", "Graph mutations waiting in the write-behind queue")
+
+
+@contextmanager
+def observe_external(tool):
+    """Times a call to an external API and counts it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_ERRORS.labels(tool).inc()
+        raise
+    finally:
+        EXTERNAL_LATENCY.labels(tool).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def observe_inference(model):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        MODEL_INFERENCE.labels(model).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def llm_call(caller, model="gpt-4o-mini"):
+    """Counts an LLM call, its latency and (for OpenAI models) its token usage."""
+    from langchain_community.callbacks import get_openai_callback
+
+    start = time.perf_counter()
+    LLM_CALLS.labels(caller, model).inc()
+    try:
+        with get_openai_callback() as cb:
+            yield
+    except Exception:
+        LLM_ERRORS.labels(caller, model).inc()
+        raise
+    finally:
+        LLM_LATENCY.labels(caller, model).observe(time.perf_counter() - start)
+
+    LLM_TOKENS.labels(caller, model, "prompt").inc(cb.prompt_tokens)
+    LLM_TOKENS.labels(caller, model, "completion").inc(cb.completion_tokens)
+
+
+def record_llm_usage(caller, model, calls, prompt_tokens, completion_tokens):
+    """Counts LLM calls whose usage is only known afterwards, e.g. all calls of a crew run."""
+    LLM_CALLS.labels(caller, model).inc(calls)
+    LLM_TOKENS.labels(caller, model, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(caller, model, "completion").inc(completion_tokens)
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def metrics_payload():
+    """(body, content type) for a /metrics response."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def init_app(app, app_name="backend"):
+    """Adds request metrics and a GET /metrics route to a Flask app."""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_COUNT.labels(app_name, route, request.method, str(response.status_code)).inc()
+        if hasattr(g, "metrics_start"):
+            REQUEST_LATENCY.labels(app_name, route, request.method).observe(time.perf_counter() - g.metrics_start)
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        body, content_type = metrics_payload()
+        return Response(body, mimetype=content_type)
+
+
+def init_fastapi(app, app_name="mcp"):
+    """Adds request metrics and a GET /metrics route to a FastAPI app."""
+    from fastapi import Request, Response
+
+    @app.middleware("http")
+    async def _record_request(request: Request, call_next):
+        start = time.perf_counter()
+        status = "500"
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            REQUEST_COUNT.labels(app_name, route, request.method, status).inc()
+            REQUEST_LATENCY.labels(app_name, route, request.method).observe(time.perf_counter() - start)
+
+    @app.get("/metrics")
+    def metrics():
+        body, content_type = metrics_payload()
+        return Response(content=body, media_type=content_type)
@@ -0,0 +1,190 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from backend.src.tracing import span
+
+################################################
+# LOCAL QUERY EXPANSION
+################################################
+# Replaces the LLM "Query Enhancer" step in front of the research router.
+# Runs in a few milliseconds and produces search terms from:
+#   * keywords (stopwords dropped, original order kept),
+#   * acronyms expanded in both directions (LLM <-> large language model),
+#   * the nearest concepts in the memory graph (in-memory concept matrix),
+#     once the embedding model and concept cache are loaded,
+#   * a previous LLM rewrite of the same topic, if one finished in the background.
+# The LLM rewrite never feeds the search that started it; it only improves a
+# repeat search of the same topic.
+
+RELATED_CONCEPT_THRESHOLD = 0.5
+RELATED_CONCEPTS = 3
+REWRITE_TTL = 24 * 3600
+REWRITE_CACHE_SIZE = 1000
+
+STOPWORDS = {
+    "a", "about", "an", "and", "any", "are", "as", "at", "be", "between", "by", "can", "could",
+    "do", "does", "explain", "find", "for", "from", "get", "getting", "give", "how", "i", "in",
+    "into", "is", "it", "its", "latest", "me", "more", "most", "my", "new", "of", "on", "or",
+    "overview", "please", "show", "some", "started", "tell", "that", "the", "their", "this",
+    "to", "tutorial", "using", "vs", "want", "was", "what", "when", "where", "which", "who",
+    "why", "with", "work", "works", "you",
+}
+
+ACRONYMS = {
+    "ai": "artificial intelligence",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "llm": "large language model",
+    "rag": "retrieval augmented generation",
+    "rl": "reinforcement learning",
+    "rlhf": "reinforcement learning from human feedback",
+    "cnn": "convolutional neural network",
+    "rnn": "recurrent neural network",
+    "lstm": "long short-term memory",
+    "gan": "generative adversarial network",
+    "vae": "variational autoencoder",
+    "gnn": "graph neural network",
+    "vit": "vision transformer",
+    "cv": "computer vision",
+    "asr": "automatic speech recognition",
+    "sota": "state of the art",
+    "gpu": "graphics processing unit",
+    "tpu": "tensor processing unit",
+    "api": "application programming interface",
+    "sql": "structured query language",
+    "iot": "internet of things",
+    "ar": "augmented reality",
+    "vr": "virtual reality",
+    "crispr": "clustered regularly interspaced short palindromic repeats",
+    "mrna": "messenger rna",
+    "qec": "quantum error correction",
+}
+EXPANSIONS = {expansion: acronym for acronym, expansion in ACRONYMS.items()}
+
+_WORD = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#.\-]*")
+
+
+def extract_keywords(text, max_keywords=8):
+    seen, keywords = set(), []
+    for word in _WORD.findall(text.lower()):
+        word = word.strip(".-")
+        if len(word) < 2 or word in STOPWORDS or word in seen:
+            continue
+        seen.add(word)
+        keywords.append(word)
+    return keywords[:max_keywords]
+
+
+def expand_acronyms(text, keywords):
+    """Both directions: acronyms in the text get their expansion and vice versa."""
+    lowered = text.lower()
+    found = []
+    for keyword in keywords:
+        # plural acronyms: "LLMs", "CNNs"
+        singular = keyword[:-1] if keyword.endswith("s") and keyword[:-1] in ACRONYMS else keyword
+        if singular in ACRONYMS:
+            found.append(ACRONYMS[singular])
+    for expansion, acronym in EXPANSIONS.items():
+        if expansion in lowered:
+            found.append(acronym.upper())
+    return list(dict.fromkeys(found))
+
+
+_warming = threading.Event()
+
+
+def _warm_concept_lookup():
+    from backend.src.query_orch import get_embedding_model
+    from backend.src.concept_cache import get_concept_cache
+
+    try:
+        get_embedding_model()
+        get_concept_cache()
+    except Exception as e:
+        print(f"Related concept warm-up failed: {e}")
+        _warming.clear()
+
+
+def related_concepts(text, top_k=RELATED_CONCEPTS, threshold=RELATED_CONCEPT_THRESHOLD):
+    """
+    Nearest concepts already in the memory graph (no LLM call: the raw text is
+    embedded). Loading MiniLM and the concept cache takes seconds, so until
+    both are in memory this returns nothing and loads them in the background.
+    """
+    from backend.src import query_orch, concept_cache
+
+    if query_orch.EMBEDDING_MODEL is None or concept_cache.CONCEPT_CACHE is None:
+        if not _warming.is_set():
+            _warming.set()
+            threading.Thread(target=_warm_concept_lookup, name="concept-lookup-warmup", daemon=True).start()
+        return []
+
+    try:
+        embedding = query_orch.get_embedding_model().encode(text)
+        matches = concept_cache.get_concept_cache().top_k(embedding, top_k=top_k)
+    except Exception as e:
+        print(f"Related concept lookup failed: {e}")
+        return []
+    return [m["name"] for m in matches if m["similarity"] >= threshold]
+
+
+################################################
+# BACKGROUND LLM REWRITES
+################################################
+_rewrites = OrderedDict()  # topic -> (expires, rewrite), least recently used first
+_rewrites_lock = threading.Lock()
+
+
+def remember_rewrite(topic, rewrite):
+    rewrite = (rewrite or "").strip().strip('"')
+    if rewrite:
+        key = topic.strip().lower()
+        with _rewrites_lock:
+            _rewrites[key] = (time.monotonic() + REWRITE_TTL, rewrite)
+            _rewrites.move_to_end(key)
+            while len(_rewrites) > REWRITE_CACHE_SIZE:
+                _rewrites.popitem(last=False)
+
+
+def recall_rewrite(topic):
+    key = topic.strip().lower()
+    with _rewrites_lock:
+        entry = _rewrites.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _rewrites[key]
+            return None
+        _rewrites.move_to_end(key)
+    return entry[1]
+
+
+def expand_query(topic, use_graph=True):
+    """
+    Returns:
+        {"keywords", "acronyms", "related_concepts", "rewrite", "search_terms"}
+        where search_terms is a single line suitable for a task prompt.
+    """
+    with span("query_expansion"):
+        keywords = extract_keywords(topic)
+        acronyms = expand_acronyms(topic, keywords)
+        concepts = related_concepts(topic) if use_graph else []
+        rewrite = recall_rewrite(topic)
+
+    parts = [", ".join(keywords)]
+    if acronyms:
+        parts.append("also: " + ", ".join(acronyms))
+    if concepts:
+        parts.append("related: " + ", ".join(concepts))
+    if rewrite:
+        parts.append("rewritten: " + rewrite)
+
+    return {
+        "keywords": keywords,
+        "acronyms": acronyms,
+        "related_concepts": concepts,
+        "rewrite": rewrite,
+        "search_terms": " | ".join(p for p in parts if p),
+    }
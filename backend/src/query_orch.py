@@ -1,49 +1,80 @@
 from backend.src.db_controller import run_db_query
 from backend.src.db_schema import Concept, Query, Link
-from sentence_transformers import SentenceTransformer
-from backend.tools.concept_categorizer import get_concept
+from backend.src.concept_cache import get_concept_cache
 from typing import List
+from backend.src.tracing import span
+from backend.src.metrics import observe_inference
+from backend.src.inference_client import use_inference_server, RemoteEmbeddingModel
+
+# Global variable to hold the embedding model so it is only loaded once
+EMBEDDING_MODEL = None
+
+def _load_embedding_model():
+    # Imported here so graph-only routes never load torch/sentence-transformers
+    from sentence_transformers import SentenceTransformer
+
+    with span("embedding_model.load"):
+        return SentenceTransformer('all-MiniLM-L6-v2', use_auth_token=False)  # or another model
+
+def get_embedding_model():
+    global EMBEDDING_MODEL
+    if EMBEDDING_MODEL is None and use_inference_server():
+        EMBEDDING_MODEL = RemoteEmbeddingModel(_load_embedding_model)
+    if EMBEDDING_MODEL is None:
+        EMBEDDING_MODEL = _load_embedding_model()
+    return EMBEDDING_MODEL
 
 ################################################
 # SINGULAR TRANSACTIONS TO MAIN GRAPH
 ################################################
 def find_similar_concepts(query: Query, top_k=5):
+    from backend.tools.concept_categorizer import get_concept
+
     print("query", query)
-    model = SentenceTransformer('all-MiniLM-L6-v2', use_auth_token=False)  # or another model
+    model = get_embedding_model()
     content = query.getContent()
     print("content", content)
-    relevant_concept = get_concept(content)
+    with span("get_concept"):
+        relevant_concept = get_concept(content)
     print("relevant_concept", relevant_concept)
-    embedding = model.encode(relevant_concept).tolist()
-    print("embedding", embedding)
-
-    db_query = """
-            WITH $embedding AS queryEmbedding
-            MATCH (c:Concept)
-            WITH c,
-                REDUCE(dot = 0.0, i IN RANGE(0, SIZE(queryEmbedding)-1) | dot + queryEmbedding[i] * c.embeds[i]) AS dotProduct,
-                SQRT(REDUCE(qSum = 0.0, i IN RANGE(0, SIZE(queryEmbedding)-1) | qSum + queryEmbedding[i]^2)) AS queryMagnitude,
-                SQRT(REDUCE(cSum = 0.0, i IN RANGE(0, SIZE(c.embeds)-1) | cSum + c.embeds[i]^2)) AS conceptMagnitude
-            WITH c,
-                CASE
-                    WHEN queryMagnitude = 0 OR conceptMagnitude = 0 THEN 0.0
-                    ELSE dotProduct / (queryMagnitude * conceptMagnitude)
-                END AS similarity
-            RETURN c.name AS name, c.intent AS intent, similarity
-            ORDER BY similarity DESC
-            LIMIT $top_k
-            """
-    vars = {"embedding": embedding, "top_k": top_k}
-    result = run_db_query(db_query, vars)
+    with span("embed"), observe_inference("minilm_embedding"):
+        embedding = model.encode(relevant_concept)
+
+    # Cosine top-k over the in-memory concept matrix instead of a Cypher scan
+    with span("concept_similarity"):
+        result = get_concept_cache().top_k(embedding, top_k=top_k)
 
     return result
 
+def find_similar_concepts_many(queries: List[Query], top_k=5, max_concurrency=8):
+    """
+    Batched form of find_similar_concepts for offline jobs: concepts are
+    extracted concurrently, encoded in one batch and all top-k lookups are
+    resolved with a single matrix multiply.
+
+    Returns:
+        One list of {"name", "intent", "similarity"} per query, in order.
+    """
+    if not queries:
+        return []
+    from backend.tools.concept_categorizer import get_concepts
+
+    model = get_embedding_model()
+    concepts = get_concepts([q.getContent() for q in queries], max_concurrency=max_concurrency)
+    with observe_inference("minilm_embedding"):
+        embeddings = model.encode(concepts, batch_size=256, convert_to_numpy=True)
+
+    return get_concept_cache().top_k_many(embeddings, top_k=top_k)
+
 def create_concept(query: Query):
-    model = SentenceTransformer('all-MiniLM-L6-v2', use_auth_token=False)  # or another model
+    from backend.tools.concept_categorizer import get_concept
+
+    model = get_embedding_model()
     content = query.getContent()
     concept = get_concept(content)
     intent = query.intent # Assuming the roberta handles this
-    embedding = model.encode(concept).tolist()
+    with observe_inference("minilm_embedding"):
+        embedding = model.encode(concept).tolist()
 
     concept = Concept(name=concept, intent=intent, embedding=embedding)
 
@@ -64,7 +95,11 @@ def create_concept(query: Query):
         "query_content": content,
     }
 
-    run_db_query(cypher_query, parameters)
+    result = run_db_query(cypher_query, parameters)
+    # run_db_query reports failures as a string; raise so the write is retried
+    if isinstance(result, str):
+        raise RuntimeError(result)
+    get_concept_cache().add(concept.name, concept.intent, concept.embedding)
 
 def connect_concept_to_query(query: Query, concept: Concept):
     cypher_query = """
@@ -78,7 +113,9 @@ def connect_concept_to_query(query: Query, concept: Concept):
         "query_content": query.content
     }
 
-    run_db_query(cypher_query, parameters)
+    result = run_db_query(cypher_query, parameters)
+    if isinstance(result, str):
+        raise RuntimeError(result)
 
 def connect_links_to_query(query: Query, links_visited: List[Link]):
     cypher_query = """
@@ -96,7 +133,45 @@ def connect_links_to_query(query: Query, links_visited: List[Link]):
         parameters["link_address"] = link.address
 
         # print(parameters)
-        run_db_query(cypher_query, parameters)
+        result = run_db_query(cypher_query, parameters)
+        if isinstance(result, str):
+            raise RuntimeError(result)
+
+def connect_links_to_queries(pairs):
+    """
+    Batched form of connect_links_to_query: writes every (query, link) pair
+    with a single UNWIND statement instead of one round trip per link.
+    """
+    cypher_query = """
+    UNWIND $rows AS row
+    MERGE (q: Query {content: row.query_content})
+    MERGE (l: Link {address: row.link_address})
+    MERGE (q)-[:CLICKED]-(l)
+    """
+
+    parameters = {
+        "rows": [
+            {"query_content": query.content, "link_address": link.address}
+            for query, link in pairs
+        ]
+    }
+
+    return run_db_query(cypher_query, parameters)
+
+def add_query_to_graph(query: Query):
+    sim_concepts = find_similar_concepts(query)
+
+    if isinstance(sim_concepts, str):
+        raise RuntimeError(sim_concepts)
+
+    if not sim_concepts or sim_concepts[0].get('similarity') < 0.35:
+        create_concept(query)
+
+    else:
+        for i in sim_concepts:
+            if i.get('similarity') > 0.40:
+                concept = Concept(name=i.get('name'), intent=i.get('intent'), embedding=None)
+                connect_concept_to_query(query, concept)
 
 def retrieve_all_related_concepts(query: Query):
     cypher_query = """
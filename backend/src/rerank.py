@@ -0,0 +1,150 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+import numpy as np
+from backend.config import RERANK_CACHE_SIZE, RERANK_RECENCY_WEIGHT, RERANK_HALF_LIFE_HOURS
+from backend.src.query_orch import get_embedding_model
+from backend.src.tracing import span
+from backend.src.metrics import observe_inference, record_cache
+
+################################################
+# RE-RANKING OF MERGED SEARCH RESULTS
+################################################
+# consolidate() returns sources in whatever order the router LLM emitted
+# them. Here every source is scored by cosine similarity between the query
+# and "title. snippet" using the shared MiniLM model (one batch per request,
+# cached per URL), and News results are additionally weighted by recency.
+
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2}))?")
+_GDELT_DATE = re.compile(r"\b(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})Z\b")
+_URL_DATE = re.compile(r"/(\d{4})/(\d{1,2})/(\d{1,2})/")
+
+
+def _unit(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _source_text(item):
+    return f"{item.get('title') or ''}. {item.get('snippet') or ''}".strip()
+
+
+class URLEmbeddingCache:
+    """LRU of url -> (text digest, unit embedding); a changed title/snippet is re-encoded."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url, digest):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry[0] != digest:
+                return None
+            self._entries.move_to_end(url)
+            return entry[1]
+
+    def put(self, url, digest, vector):
+        with self._lock:
+            self._entries[url] = (digest, vector)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+URL_EMBEDDINGS = URLEmbeddingCache(RERANK_CACHE_SIZE)
+
+
+def embed_sources(items):
+    """Unit embeddings for every item, encoding only the ones not cached by URL."""
+    texts = [_source_text(item) for item in items]
+    digests = [hashlib.sha1(t.encode("utf-8")).hexdigest() for t in texts]
+    vectors = [None] * len(items)
+    missing = []
+
+    for i, item in enumerate(items):
+        url = item.get("link") or item.get("url")
+        cached = URL_EMBEDDINGS.get(url, digests[i]) if url else None
+        record_cache("url_embedding", cached is not None)
+        if cached is None:
+            missing.append(i)
+        else:
+            vectors[i] = cached
+
+    if missing:
+        with observe_inference("minilm_embedding"):
+            encoded = _unit(get_embedding_model().encode([texts[i] for i in missing], convert_to_numpy=True))
+        for i, vector in zip(missing, encoded):
+            vectors[i] = vector
+            url = items[i].get("link") or items[i].get("url")
+            if url:
+                URL_EMBEDDINGS.put(url, digests[i], vector)
+
+    return np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+
+def published_at(item):
+    """Best-effort publication time from the snippet, title or URL (None if absent)."""
+    text = f"{item.get('snippet') or ''} {item.get('title') or ''}"
+    try:
+        match = _GDELT_DATE.search(text)
+        if match:
+            return datetime(*map(int, match.groups()), tzinfo=timezone.utc)
+        match = _ISO_DATE.search(text)
+        if match:
+            parts = [int(p) for p in match.groups() if p is not None]
+            return datetime(*parts, tzinfo=timezone.utc)
+        match = _URL_DATE.search(item.get("link") or item.get("url") or "")
+        if match:
+            return datetime(*map(int, match.groups()), tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    return None
+
+
+def recency(item, now, half_life_hours):
+    """1.0 for brand new, halving every `half_life_hours`; undated items count as one half-life old."""
+    published = published_at(item)
+    if published is None:
+        return 0.5
+    age_hours = max(0.0, (now - published).total_seconds() / 3600)
+    return 0.5 ** (age_hours / half_life_hours)
+
+
+def rerank(query, items, intent=None, top_n=None,
+           recency_weight=RERANK_RECENCY_WEIGHT, half_life_hours=RERANK_HALF_LIFE_HOURS):
+    """
+    Orders consolidated sources by relevance to `query`.
+
+    Args:
+        items: [{"link", "title", "snippet"}] as returned by consolidate().
+        intent: "News" turns on recency weighting.
+        top_n: Keep only the best `top_n` sources (None keeps all).
+
+    Returns:
+        The same dictionaries, best first.
+    """
+    if not items:
+        return items
+
+    with span("rerank"):
+        sources = _unit(embed_sources(items))
+        with observe_inference("minilm_embedding"):
+            query_vector = _unit(get_embedding_model().encode(query, convert_to_numpy=True))
+        scores = sources @ query_vector
+
+        if intent == "News" and recency_weight:
+            now = datetime.now(timezone.utc)
+            fresh = np.array([recency(item, now, half_life_hours) for item in items], dtype=np.float32)
+            scores = (1 - recency_weight) * scores + recency_weight * fresh
+
+        # Stable: equal scores keep the router's order
+        order = np.argsort(-scores, kind="stable")
+
+    ranked = [items[i] for i in order]
+    return ranked[:top_n] if top_n else ranked
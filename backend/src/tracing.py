@@ -0,0 +1,129 @@
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from flask import g, request
+from backend.config import TRACING_EXPORTER, TRACING_FILE, TRACE_HEADER
+from backend.src.metrics import STAGE_LATENCY
+
+################################################
+# PER-STAGE LATENCY TRACING
+################################################
+# span("stage") times a block of the search pipeline. Every span is
+#   * exported as an OpenTelemetry span when TRACING_EXPORTER is "console" or
+#     "file" (and opentelemetry-sdk is installed),
+#   * observed in the gyrus_stage_duration_seconds histogram, and
+#   * recorded in a per-request breakdown that is returned in a
+#     Server-Timing response header when TRACE_HEADER is on.
+
+_request_spans = ContextVar("request_spans", default=None)
+
+# Global variable to hold the OpenTelemetry tracer; False means "disabled"
+TRACER = None
+
+
+def get_tracer():
+    global TRACER
+    if TRACER is None:
+        TRACER = False
+        if TRACING_EXPORTER in ("console", "file"):
+            try:
+                from opentelemetry import trace
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+                out = open(TRACING_FILE, "a", encoding="utf-8") if TRACING_EXPORTER == "file" else None
+                # One span per line, so the file is JSON Lines
+                exporter = ConsoleSpanExporter(
+                    out=out, formatter=lambda s: s.to_json(indent=None) + "\n"
+                ) if out else ConsoleSpanExporter()
+                provider = TracerProvider(resource=Resource.create({"service.name": "gyrus-backend"}))
+                provider.add_span_processor(BatchSpanProcessor(exporter))
+                trace.set_tracer_provider(provider)
+                TRACER = trace.get_tracer("gyrus.backend")
+            except ImportError:
+                print("opentelemetry-sdk not installed; tracing spans will not be exported")
+    return TRACER or None
+
+
+@contextmanager
+def span(name, **attributes):
+    """Times the enclosed block as pipeline stage `name`."""
+    tracer = get_tracer()
+    otel_span = tracer.start_as_current_span(name, attributes=attributes) if tracer else nullcontext()
+    start = time.perf_counter()
+    try:
+        with otel_span:
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.labels(name).observe(elapsed)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, elapsed * 1000))
+
+
+def traced(name):
+    """Decorator form of span() for whole functions."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect_spans():
+    """Records the spans closed inside the block (outside a request, e.g. benchmarks)."""
+    spans = []
+    token = _request_spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _request_spans.reset(token)
+
+
+def request_breakdown():
+    """(stage, milliseconds) pairs recorded so far in the current request."""
+    return list(_request_spans.get() or [])
+
+
+def server_timing(spans, total_ms):
+    entries = [f"{name};dur={ms:.1f}" for name, ms in spans]
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+def init_app(app):
+    """Installs request hooks that open a root span and collect the breakdown."""
+
+    @app.before_request
+    def _start_trace():
+        g.trace_start = time.perf_counter()
+        g.trace_token = _request_spans.set([])
+        tracer = get_tracer()
+        if tracer:
+            from opentelemetry import context, trace
+
+            g.trace_root = tracer.start_span(f"{request.method} {request.path}")
+            g.trace_context = context.attach(trace.set_span_in_context(g.trace_root))
+
+    @app.after_request
+    def _timing_header(response):
+        if TRACE_HEADER and hasattr(g, "trace_start"):
+            total_ms = (time.perf_counter() - g.trace_start) * 1000
+            response.headers["Server-Timing"] = server_timing(request_breakdown(), total_ms)
+        return response
+
+    @app.teardown_request
+    def _end_trace(exc):
+        if hasattr(g, "trace_root"):
+            from opentelemetry import context
+
+            context.detach(g.trace_context)
+            g.trace_root.end()
+        if hasattr(g, "trace_token"):
+            _request_spans.reset(g.trace_token)
@@ -0,0 +1,240 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from backend.src.db_schema import Query, Link
+from backend.src.query_orch import connect_links_to_queries, add_query_to_graph
+from backend.tools.llm_gateway import llm_priority, BACKGROUND
+
+################################################
+# WRITE-BEHIND QUEUE FOR GRAPH MUTATIONS
+################################################
+# UI-triggered writes (/api/add-links, /api/new-query) are accepted here and
+# applied by a background worker, so the request only pays for an enqueue.
+# When a journal path is given every mutation is appended to it before it is
+# acknowledged to the caller and replayed on startup if it was never applied.
+
+MAX_ATTEMPTS = 3
+# Pause after a failed batch: doubles per consecutive failure, up to the cap
+RETRY_BACKOFF = 0.5
+MAX_RETRY_BACKOFF = 30.0
+
+
+def apply_links(payloads):
+    # Coalesce: the same (query, link) click is only written once per batch
+    pairs = {(p["query"], link) for p in payloads for link in p["links"]}
+    result = connect_links_to_queries([(Query(q, intent=""), Link(l)) for q, l in pairs])
+
+    if isinstance(result, str):
+        raise RuntimeError(result)
+
+
+def apply_queries(payloads):
+    # Coalesce: repeated submissions of the same query are only classified once
+    unique = {(p["query"], p["intent"]) for p in payloads}
+    for content, intent in unique:
+        add_query_to_graph(Query(content, intent))
+
+
+HANDLERS = {
+    "links": apply_links,
+    "query": apply_queries,
+}
+
+
+class WriteBehindQueue:
+    def __init__(self, journal_path=None, batch_size=100, flush_interval=0.5, fsync=True,
+                 retry_backoff=RETRY_BACKOFF, max_retry_backoff=MAX_RETRY_BACKOFF):
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+        self._queue = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._journal = None
+        self._worker = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """
+        Replays any unapplied mutations from the journal and starts the
+        background worker thread.
+        """
+        if self._worker is not None:
+            return
+
+        if self.journal_path:
+            for entry in self._recover():
+                self._queue.put(entry)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+        self._worker = threading.Thread(target=self._run, name="graph-write-behind", daemon=True)
+        self._worker.start()
+
+    def submit(self, kind, payload):
+        """
+        Accepts a mutation for background application.
+
+        Args:
+            kind: One of the keys in HANDLERS.
+            payload: JSON-serialisable dictionary for that handler.
+
+        Returns:
+            The id assigned to the mutation.
+        """
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown mutation kind: {kind}")
+
+        entry = {"id": uuid.uuid4().hex, "kind": kind, "payload": payload, "attempts": 0}
+        self._append({"op": "put", **entry})
+        self._queue.put(entry)
+
+        return entry["id"]
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stop(self, timeout=5.0):
+        """Drains what is already queued and stops the worker."""
+        self._stopped.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _run(self):
+        # Concept/intent calls made while applying writes queue behind searches
+        with llm_priority(BACKGROUND):
+            failures = 0
+            while not (self._stopped.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                if self._apply(batch):
+                    failures = 0
+                    continue
+                # Back off before the re-queued entries are retried, so a
+                # database outage is not hammered with the same batch
+                failures += 1
+                delay = min(self.max_retry_backoff, self.retry_backoff * 2 ** (failures - 1))
+                self._stopped.wait(delay)
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        # Let a burst accumulate briefly so it can be coalesced into one write
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _apply(self, batch):
+        """
+        Returns:
+            False if any handler failed (its entries are re-queued or dropped).
+        """
+        ok = True
+        by_kind = {}
+        for entry in batch:
+            by_kind.setdefault(entry["kind"], []).append(entry)
+
+        for kind, entries in by_kind.items():
+            try:
+                HANDLERS[kind]([e["payload"] for e in entries])
+            except Exception as e:
+                print(f"Write-behind {kind} batch of {len(entries)} failed: {e}")
+                ok = False
+                if len(entries) > 1:
+                    # Apply one by one so a single bad payload cannot take
+                    # the other requests' writes down with it
+                    self._apply_each(kind, entries)
+                else:
+                    self._retry(entries[0])
+                continue
+
+            self._append({"op": "ack", "ids": [e["id"] for e in entries]})
+
+        return ok
+
+    def _apply_each(self, kind, entries):
+        for entry in entries:
+            try:
+                HANDLERS[kind]([entry["payload"]])
+            except Exception as e:
+                print(f"Write-behind {kind} mutation {entry['id']} failed: {e}")
+                self._retry(entry)
+                continue
+            self._append({"op": "ack", "ids": [entry["id"]]})
+
+    def _retry(self, entry):
+        entry["attempts"] += 1
+        if entry["attempts"] < MAX_ATTEMPTS:
+            self._queue.put(entry)
+        else:
+            # Left unacknowledged in the journal so a restart retries it
+            print(f"Dropping mutation {entry['id']} after {MAX_ATTEMPTS} attempts")
+
+    def _append(self, record):
+        if self._journal is None:
+            return
+
+        with self._journal_lock:
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+
+    def _recover(self):
+        """
+        Reads the journal, returns the mutations that were never acknowledged
+        and compacts the file down to just those entries.
+        """
+        if not os.path.exists(self.journal_path):
+            return []
+
+        pending = {}
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write
+                    continue
+                if record.get("op") == "put":
+                    pending[record["id"]] = {
+                        "id": record["id"],
+                        "kind": record["kind"],
+                        "payload": record["payload"],
+                        "attempts": 0,
+                    }
+                elif record.get("op") == "ack":
+                    for entry_id in record["ids"]:
+                        pending.pop(entry_id, None)
+
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in pending.values():
+                f.write(json.dumps({"op": "put", **entry}) + "\n")
+        os.replace(tmp_path, self.journal_path)
+
+        if pending:
+            print(f"Replaying {len(pending)} unapplied graph mutations from {self.journal_path}")
+
+        return list(pending.values())
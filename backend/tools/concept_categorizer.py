@@ -1,30 +1,39 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from dotenv import load_dotenv
 from backend.tools.chaap_anonymize import SimplePIIObfuscator
-import os
+from backend.tools.llm_gateway import get_gateway
 
-load_dotenv()
-
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-
-def get_concept(sentence):
-    prompt = PromptTemplate.from_template(
-        """You are an expert in topic classification.
+CONCEPT_PROMPT = PromptTemplate.from_template(
+    """You are an expert in topic classification.
     Given the following sentence, return a high-level concept that categorizes its meaning.
 
     Respond with ONLY the concept, no explanation.
 
     Sentence: "{input}"
     Concept:"""
-    )
+)
 
+def normalize_concept(concept):
+    """Concept names are graph keys: the single and batched paths must agree on them."""
+    return concept.strip().strip('"\'').strip()
+
+def get_concept(sentence):
     obfuscator = SimplePIIObfuscator()
     sentence = obfuscator.quick_scrub(text=sentence)
 
-    llm = ChatOpenAI(model='gpt-4o-mini', temperature=0, api_key=OPENAI_API_KEY)
-    concept_chain = LLMChain(llm=llm, prompt=prompt)
-    result = concept_chain.run(sentence)
+    result = get_gateway().complete(CONCEPT_PROMPT.format(input=sentence), caller='get_concept')
+    return normalize_concept(result)
+
+def get_concepts(sentences, max_concurrency=8):
+    """
+    Batched form of get_concept: scrubs every sentence and runs the concept
+    prompts concurrently instead of one blocking call per sentence.
+
+    Returns:
+        A list of concepts in the same order as `sentences`.
+    """
+    obfuscator = SimplePIIObfuscator()
+    prompts = [CONCEPT_PROMPT.format(input=obfuscator.quick_scrub(text=s)) for s in sentences]
+
+    results = get_gateway().complete_many(prompts, caller='get_concepts', max_concurrency=max_concurrency)
 
-    return result
\ No newline at end of file
+    return [normalize_concept(r) for r in results]
@@ -1,15 +1,10 @@
+import re
 from backend.src.query_orch import find_similar_concepts
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from backend.src.db_schema import Query
-from dotenv import load_dotenv
 from backend.tools.chaap_anonymize import SimplePIIObfuscator
-import os
+from backend.tools.llm_gateway import get_gateway
 
-load_dotenv()
-
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 obfuscator = SimplePIIObfuscator()
 
 # For reference
@@ -22,6 +17,13 @@ intent_label_map = {
 }
 
 
+# "News: 0.7", "2. **News** - 70%", ...
+SCORE_LINE = re.compile(
+    r"^\W*(?:\d+\.\s*)?\**(" + "|".join(intent_label_map) + r")\**\s*[:=-]\s*(\d+(?:\.\d+)?)\s*(%)?",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
 def concept_parser(concepts):
     counter = 1
     string = ""
@@ -32,16 +34,28 @@ def concept_parser(concepts):
     return string
 
 def agent_output_parser(agent_output):
-    separated = agent_output.split('\n')
+    """
+    Reads "Intent: score" lines into a full score dict. Small local models
+    add prose, numbering or percentages around the scores, so only lines
+    naming a known intent are used and scores are clamped to [0, 1].
+
+    Raises:
+        ValueError: if no line carries a score for a known intent.
+    """
     baseline = {"Research": 0, "Answer": 0, "Transactional": 0, "News": 0, "Navigational": 0}
+    found = False
 
-    for value in separated:
-        vals = value.split(':')
-        key = vals[0]
-        val = float(vals[1].strip())
+    for match in SCORE_LINE.finditer(agent_output):
+        key = match.group(1).capitalize()
+        val = float(match.group(2))
+        if match.group(3) or val > 1:
+            val /= 100
 
-        baseline[key] = val
+        baseline[key] = min(max(val, 0.0), 1.0)
+        found = True
 
+    if not found:
+        raise ValueError(f"No intent scores in LLM output: {agent_output[:200]!r}")
     return baseline
 
 
@@ -66,6 +80,7 @@ def get_intent(sentence):
         the intent behind those searches and how similar they are to the current query.
 
         Respond with ONLY the probabilities for each intent in line-by-line format, no explanation.
+        Use exactly one line per intent in the form "Intent: probability", e.g. "Research: 0.7".
 
 
         Sentence: "{sentence}"
@@ -75,24 +90,17 @@ def get_intent(sentence):
         """
             )
 
-    # Setup the LLM (make sure `OPENAI_API_KEY` is defined elsewhere or passed securely)
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0,
-        api_key=OPENAI_API_KEY  # or set via environment var
+    # Format inputs and run through the shared LLM gateway
+    prompt = prompt_template.format(
+        sentence=sentence,
+        concepts=concept_parser(similar_concepts),
+        research=intent_label_map["Research"],
+        answer=intent_label_map["Answer"],
+        transactional=intent_label_map["Transactional"],
+        news=intent_label_map["News"],
+        navigational=intent_label_map["Navigational"],
     )
-
-    # Now format inputs and run
-    chain = LLMChain(llm=llm, prompt=prompt_template)
-    result = chain.run({
-        "sentence": sentence,
-        "concepts": concept_parser(similar_concepts),
-        "research": intent_label_map["Research"],
-        "answer": intent_label_map["Answer"],
-        "transactional": intent_label_map["Transactional"],
-        "news": intent_label_map["News"],
-        "navigational": intent_label_map["Navigational"],
-    })
+    result = get_gateway().complete(prompt, caller='get_intent')
 
 
     return agent_output_parser(result.strip())
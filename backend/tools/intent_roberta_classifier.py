@@ -0,0 +1,208 @@
+import os
+from typing import Dict, List
+import numpy as np
+from backend.config import ROBERTA_INTENT_MODEL_PATH, ROBERTA_INTENT_LABELS, ROBERTA_INT8
+from backend.tools.chaap_anonymize import SimplePIIObfuscator
+from backend.tools.intent_router import INTENT_LABELS
+from backend.src.metrics import observe_inference
+from backend.src.inference_client import use_inference_server, RemoteRoberta, InferenceUnavailable
+
+obfuscator = SimplePIIObfuscator()
+
+# The fine-tuned model predicts ORCAS-I labels; spread each one onto our
+# five intents. Informational is split between Research and Answer so it
+# can never be "confident" on its own and always escalates.
+ORCAS_TO_INTENTS = {
+    "Navigational": {"Navigational": 1.0},
+    "Transactional": {"Transactional": 1.0},
+    "Informational": {"Research": 0.5, "Answer": 0.5},
+    # level_2 labels, if the model was trained on those instead
+    "Factual": {"Answer": 1.0},
+    "Instrumental": {"Answer": 0.7, "Research": 0.3},
+    "Abstain": {"Research": 1.0},
+}
+
+ONNX_FILES = ["model.int8.onnx", "model.onnx"]
+
+# Global variable to hold the loaded backend (torch or onnxruntime).
+# This prevents re-loading the checkpoint on every call.
+ROBERTA_CLASSIFIER = None
+
+
+class _TorchBackend:
+    def __init__(self, path):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(path, use_fast=True)
+        self.model = AutoModelForSequenceClassification.from_pretrained(path).eval()
+        if ROBERTA_INT8:
+            # Dynamic int8 quantization of the Linear layers, CPU only
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.id2label = self.model.config.id2label
+
+    def logits(self, texts):
+        encodings = self.tokenizer(texts, padding=True, truncation=True, max_length=32, return_tensors="pt")
+        with self.torch.inference_mode():
+            return self.model(**encodings).logits.numpy()
+
+
+class _OnnxBackend:
+    def __init__(self, path, onnx_file):
+        import onnxruntime
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(path, use_fast=True)
+        self.session = onnxruntime.InferenceSession(os.path.join(path, onnx_file), providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.id2label = AutoConfig.from_pretrained(path).id2label
+
+    def logits(self, texts):
+        encodings = self.tokenizer(texts, padding=True, truncation=True, max_length=32, return_tensors="np")
+        feed = {k: v.astype(np.int64) for k, v in encodings.items() if k in self.input_names}
+        return self.session.run(["logits"], feed)[0]
+
+
+def _label_names(id2label):
+    names = [id2label[i] for i in sorted(id2label)]
+    # Trainer checkpoints from roberta.py keep the default LABEL_<n> names
+    if ROBERTA_INTENT_LABELS and all(n.startswith("LABEL_") for n in names):
+        names = ROBERTA_INTENT_LABELS
+    return names
+
+
+def initialize_roberta_classifier():
+    """
+    Loads the fine-tuned checkpoint if ROBERTA_INTENT_MODEL_PATH is set.
+    An exported ONNX model in the same directory is preferred over torch,
+    and with INFERENCE_SERVER_ADDRESS set the inference server runs it instead.
+
+    Returns:
+        True when a classifier is available.
+    """
+    global ROBERTA_CLASSIFIER
+    if ROBERTA_CLASSIFIER is None and ROBERTA_INTENT_MODEL_PATH and use_inference_server():
+        ROBERTA_CLASSIFIER = RemoteRoberta(_load_roberta)
+    if ROBERTA_CLASSIFIER is None and ROBERTA_INTENT_MODEL_PATH:
+        ROBERTA_CLASSIFIER = _load_roberta()
+
+    return ROBERTA_CLASSIFIER is not None
+
+
+def _load_roberta():
+    print("Initializing fine-tuned RoBERTa intent classifier (one-time setup)...")
+    onnx_file = next((f for f in ONNX_FILES if os.path.exists(os.path.join(ROBERTA_INTENT_MODEL_PATH, f))), None)
+    if onnx_file:
+        classifier = _OnnxBackend(ROBERTA_INTENT_MODEL_PATH, onnx_file)
+    else:
+        classifier = _TorchBackend(ROBERTA_INTENT_MODEL_PATH)
+    print(f"RoBERTa classifier initialized ({onnx_file or 'torch'})")
+    return classifier
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def _to_intent_scores(probs, label_names) -> Dict[str, float]:
+    scores = {intent: 0.0 for intent in INTENT_LABELS}
+    for prob, label in zip(probs, label_names):
+        for intent, weight in ORCAS_TO_INTENTS.get(label, {"Research": 0.5, "Answer": 0.5}).items():
+            scores[intent] += float(prob) * weight
+    return scores
+
+
+def classify_intent_roberta_batch(queries: List[str], batch_size: int = 64) -> List[Dict]:
+    """
+    Classifies a list of queries with one forward pass per batch.
+
+    Returns:
+        A list of dictionaries in the same format as classify_intent_zero_shot
+        ({"query", "predicted_intent", "confidence", "all_scores"}), or None
+        entries when no fine-tuned checkpoint is configured or the inference
+        server is unavailable.
+    """
+    if not initialize_roberta_classifier():
+        return [None for _ in queries]
+
+    try:
+        label_names = _label_names(ROBERTA_CLASSIFIER.id2label)
+    except InferenceUnavailable as e:
+        print(f"Skipping RoBERTa intent stage: {e}")
+        return [None for _ in queries]
+    outputs = []
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        scrubbed = [obfuscator.quick_scrub(text=q) for q in batch]
+        try:
+            with observe_inference("roberta_intent"):
+                probs = _softmax(ROBERTA_CLASSIFIER.logits(scrubbed))
+        except InferenceUnavailable as e:
+            print(f"Skipping RoBERTa intent stage: {e}")
+            return [None for _ in queries]
+
+        for query, row in zip(batch, probs):
+            all_scores = _to_intent_scores(row, label_names)
+            best_intent = max(all_scores, key=all_scores.get)
+            outputs.append({
+                "query": query,
+                "predicted_intent": best_intent,
+                "confidence": float(f"{all_scores[best_intent]:.4f}"),
+                "all_scores": {intent: float(f"{score:.4f}") for intent, score in all_scores.items()}
+            })
+
+    return outputs
+
+
+def classify_intent_roberta(query: str):
+    return classify_intent_roberta_batch([query])[0]
+
+
+def export_onnx(checkpoint_path: str, quantize: bool = True):
+    """
+    Exports a fine-tuned checkpoint to <checkpoint_path>/model.onnx and,
+    optionally, a dynamically int8-quantized model.int8.onnx next to it.
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(checkpoint_path, use_fast=True)
+    model = AutoModelForSequenceClassification.from_pretrained(checkpoint_path).eval()
+    sample = tokenizer(["example query"], return_tensors="pt")
+    onnx_path = os.path.join(checkpoint_path, "model.onnx")
+
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"]),
+        onnx_path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=17,
+    )
+    print(f"Exported {onnx_path}")
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        int8_path = os.path.join(checkpoint_path, "model.int8.onnx")
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"Quantized {int8_path}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the fine-tuned RoBERTa intent model to ONNX.")
+    parser.add_argument("checkpoint", help="Directory written by trainer.save_model()")
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    export_onnx(args.checkpoint, quantize=not args.no_quantize)
@@ -0,0 +1,100 @@
+import re
+from typing import Dict, Optional
+
+# Fixed order shared by every intent source (and the 5-wide intent vectors)
+INTENT_LABELS = ["Research", "Answer", "Transactional", "News", "Navigational"]
+
+# Scores at or above this short-circuit the cascade (see is_confident)
+CONFIDENCE_THRESHOLD = 0.85
+
+# --- Navigational: the query is itself an address ---
+URL_PATTERN = re.compile(r"^(https?://|www\.)\S+$", re.IGNORECASE)
+DOMAIN_PATTERN = re.compile(
+    r"^[a-z0-9-]+(\.[a-z0-9-]+)*\.(com|org|net|io|ai|dev|edu|gov|co|app|me|tv|uk|de|fr|ca|in)(/\S*)?$",
+    re.IGNORECASE
+)
+PORTAL_PATTERN = re.compile(r"\b(log ?in|sign ?in|homepage|official site|portal)\b", re.IGNORECASE)
+
+# --- Transactional: a commercial action with an object ---
+# Verbs like "order"/"rent" and words like "price"/"deal" are common in
+# non-commercial queries ("order of operations", "rent seeking", "price
+# elasticity", "how to deal with ..."), so only explicit forms short-circuit.
+TRANSACTIONAL_PATTERN = re.compile(
+    r"^(buy|purchase|order)\s+(?!(of|in|to|for|by|on|from|and|or|vs|with)\b)\S+|"
+    r"^(rent|book)\s+(a|an|the)\s+\S+|"
+    r"\b(coupon|promo code|discount code|for sale|add to cart|checkout|track (my )?order|book tickets?|buy online)\b",
+    re.IGNORECASE
+)
+# Weaker commercial words: scored below the threshold, so the cascade continues
+# and the rule vector only votes alongside the model stages
+TRANSACTIONAL_HINT_PATTERN = re.compile(
+    r"\b(buy|purchase|order|price|prices|pricing|cheap|cheapest|discount|deal|deals|"
+    r"subscribe|subscription|shipping|rent)\b",
+    re.IGNORECASE
+)
+
+# --- News: explicit news context ---
+NEWS_PATTERN = re.compile(
+    r"\b(breaking news|latest news|news (about|on|from|today)|headlines?|live updates?|press release)\b|"
+    r"\bnews$",
+    re.IGNORECASE
+)
+# "latest python version features" is not News: timeliness words alone are weak
+NEWS_HINT_PATTERN = re.compile(
+    r"\b(news|breaking|latest|today|this week|announced?)\b",
+    re.IGNORECASE
+)
+
+# Score for hint-only matches, below CONFIDENCE_THRESHOLD
+HINT_SCORE = 0.6
+
+# --- Answer: short factual question openers ---
+ANSWER_PATTERN = re.compile(
+    r"^(what is|what are|who is|who was|when (is|was|did)|where is|how (many|much|old|tall|far|long)|"
+    r"define|definition of|meaning of|convert)\b",
+    re.IGNORECASE
+)
+
+
+def is_confident(score: float) -> bool:
+    """The one bar every cascade stage is held to."""
+    return score >= CONFIDENCE_THRESHOLD
+
+
+def _vector(intent: str, score: float) -> Dict[str, float]:
+    # Spread the remaining mass evenly so the vector still sums to 1
+    rest = (1.0 - score) / (len(INTENT_LABELS) - 1)
+    return {label: (score if label == intent else rest) for label in INTENT_LABELS}
+
+
+def rule_intent(query: str) -> Optional[Dict]:
+    """
+    Cheap regex rules for unambiguous queries.
+
+    Returns:
+        {"intent", "score", "all_scores"} for the first rule that fires,
+        or None when no rule applies. Hint rules score HINT_SCORE, which
+        does not short-circuit the cascade; collect_all_intent adds their
+        vector to the intent matrix instead.
+    """
+    text = query.strip()
+    words = text.split()
+
+    if len(words) == 1 and (URL_PATTERN.match(text) or DOMAIN_PATTERN.match(text)):
+        intent, score = "Navigational", 0.97
+    elif len(words) <= 4 and PORTAL_PATTERN.search(text):
+        intent, score = "Navigational", 0.9
+    elif TRANSACTIONAL_PATTERN.search(text):
+        intent, score = "Transactional", 0.9
+    elif NEWS_PATTERN.search(text):
+        intent, score = "News", 0.88
+    elif ANSWER_PATTERN.match(text) and len(words) <= 8:
+        intent, score = "Answer", 0.86
+    elif TRANSACTIONAL_HINT_PATTERN.search(text):
+        intent, score = "Transactional", HINT_SCORE
+    elif NEWS_HINT_PATTERN.search(text):
+        intent, score = "News", HINT_SCORE
+    else:
+        return None
+
+    return {"intent": intent, "score": score, "all_scores": _vector(intent, score)}
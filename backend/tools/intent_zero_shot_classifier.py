@@ -1,9 +1,10 @@
-# Import necessary libraries
-from transformers import pipeline
-import torch
+# Import necessary libraries (transformers/torch are imported when the model loads)
 import json
 from typing import List, Tuple, Dict
 from backend.tools.chaap_anonymize import SimplePIIObfuscator
+from backend.src.tracing import span
+from backend.src.metrics import observe_inference
+from backend.src.inference_client import use_inference_server, RemoteZeroShot, InferenceUnavailable
 
 obfuscator = SimplePIIObfuscator()
 
@@ -47,19 +48,30 @@ def initialize_classifier():
     Uses the smallest and fastest DeBERTa model for efficiency.
     """
     global CLASSIFIER
+    if CLASSIFIER is None and use_inference_server():
+        CLASSIFIER = RemoteZeroShot(_load_classifier)
     if CLASSIFIER is None:
-        print("Initializing zero-shot classifier (one-time setup)...")
-        # Use the smallest model for speed
-        model_name = "MoritzLaurer/deberta-v3-large-zeroshot-v2.0"
-        # Auto-detect device (GPU if available, otherwise CPU)
-        device = 0 if torch.cuda.is_available() else -1
-        
-        CLASSIFIER = pipeline(
+        CLASSIFIER = _load_classifier()
+
+
+def _load_classifier():
+    import torch
+    from transformers import pipeline
+
+    print("Initializing zero-shot classifier (one-time setup)...")
+    # Use the smallest model for speed
+    model_name = "MoritzLaurer/deberta-v3-large-zeroshot-v2.0"
+    # Auto-detect device (GPU if available, otherwise CPU)
+    device = 0 if torch.cuda.is_available() else -1
+    
+    with span("deberta.load"):
+        classifier = pipeline(
             "zero-shot-classification", 
             model=model_name,
             device=device
         )
-        print(f"Classifier initialized on device: {'cuda:0' if device == 0 else 'cpu'}")
+    print(f"Classifier initialized on device: {'cuda:0' if device == 0 else 'cpu'}")
+    return classifier
 
 def create_enhanced_candidates() -> Dict[str, List[str]]:
     """
@@ -105,7 +117,8 @@ def classify_intent_zero_shot(query: str) -> str:
 
     Returns:
         A JSON formatted string containing the predicted intent, confidence score,
-        and a dictionary of scores for all possible intents.
+        and a dictionary of scores for all possible intents, or None when the
+        inference server is unavailable (the cascade skips this stage).
     """
     # Ensure the classifier is ready to use
     initialize_classifier()
@@ -134,20 +147,29 @@ def classify_intent_zero_shot(query: str) -> str:
             
     # Run the query through the pipeline with each hypothesis template
     for template in hypothesis_templates:
-        result = CLASSIFIER(
-            query, 
-            all_candidates, 
-            hypothesis_template=template,
-            multi_label=False
-        )
+        try:
+            with observe_inference("deberta_zero_shot"):
+                result = CLASSIFIER(
+                    query, 
+                    all_candidates, 
+                    hypothesis_template=template,
+                    multi_label=False
+                )
+        except InferenceUnavailable as e:
+            print(f"Skipping zero-shot intent stage: {e}")
+            return None
         
-        # Aggregate the scores for each intent based on the results
+        # The softmax runs over all candidates, so an intent's probability is
+        # the sum over its descriptions (a per-description average can never
+        # exceed 1/len(candidates) and would not reach the cascade threshold)
+        template_scores = {intent: 0.0 for intent in INTENT_LABEL_MAP}
         for candidate, score in zip(result['labels'], result['scores']):
-            intent = intent_to_candidate_map[candidate]
+            template_scores[intent_to_candidate_map[candidate]] += score
+        for intent, score in template_scores.items():
             intent_scores[intent].append(score)
             
     # --- Aggregation and Final Result ---
-    # Average the scores from the different templates for each intent
+    # Average each intent's probability over the templates (sums to 1)
     avg_scores = {
         intent: sum(scores) / len(scores) if scores else 0
         for intent, scores in intent_scores.items()
@@ -0,0 +1,88 @@
+import threading
+from backend.config import OPENAI_API_KEY, LLM_BACKEND, LLM_BASE_URL, LLM_LOCAL_MODEL, LLM_MAX_NEW_TOKENS
+
+################################################
+# PLUGGABLE LLM BACKENDS
+################################################
+# The gateway (llm_gateway.py) sends every formatted prompt to one backend,
+# chosen by LLM_BACKEND:
+#   * "openai"    - the OpenAI API (default)
+#   * "local"     - any OpenAI-compatible server at LLM_BASE_URL (vLLM,
+#                   llama.cpp server, Ollama, ...) serving LLM_LOCAL_MODEL
+#   * "inprocess" - a small Hugging Face chat model (LLM_LOCAL_MODEL) run
+#                   with transformers inside this process, CPU friendly
+# Prompt templates are unchanged; only where they are answered differs.
+
+
+class OpenAIBackend:
+    def __init__(self, api_key, base_url=None, model_override=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model_override = model_override
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def model_name(self, model):
+        return self.model_override or model
+
+    def _client(self, model, temperature):
+        key = (model, temperature)
+        with self._lock:
+            if key not in self._clients:
+                from langchain_openai import ChatOpenAI
+
+                self._clients[key] = ChatOpenAI(
+                    model=model, temperature=temperature,
+                    api_key=self.api_key, base_url=self.base_url,
+                    # The gateway retries with its own backoff and rate limits
+                    max_retries=0,
+                )
+            return self._clients[key]
+
+    def invoke(self, prompt, model, temperature=0):
+        return self._client(self.model_name(model), temperature).invoke(prompt).content
+
+
+class InProcessBackend:
+    def __init__(self, model_id, max_new_tokens=64):
+        self.model_id = model_id
+        self.max_new_tokens = max_new_tokens
+        self._generator = None
+        self._lock = threading.Lock()
+
+    def model_name(self, model):
+        return self.model_id
+
+    def _load(self):
+        if self._generator is None:
+            from transformers import pipeline
+
+            print(f"Loading in-process LLM {self.model_id} (one-time setup)...")
+            self._generator = pipeline("text-generation", model=self.model_id, device=-1)
+        return self._generator
+
+    def invoke(self, prompt, model, temperature=0):
+        # One generate at a time; the model is not safe to share across threads
+        with self._lock:
+            generator = self._load()
+            # Greedy at temperature 0, like the API backends
+            sampling = {"do_sample": True, "temperature": temperature} if temperature > 0 else {"do_sample": False}
+            output = generator(
+                [{"role": "user", "content": prompt}],
+                max_new_tokens=self.max_new_tokens,
+                return_full_text=False,
+                **sampling,
+            )
+        return output[0]["generated_text"].strip()
+
+
+def create_llm_backend(kind=LLM_BACKEND):
+    if kind == "openai":
+        return OpenAIBackend(OPENAI_API_KEY)
+    if kind == "local":
+        if not LLM_BASE_URL:
+            raise ValueError("LLM_BACKEND=local requires LLM_BASE_URL")
+        return OpenAIBackend(OPENAI_API_KEY or "local", base_url=LLM_BASE_URL, model_override=LLM_LOCAL_MODEL)
+    if kind == "inprocess":
+        return InProcessBackend(LLM_LOCAL_MODEL, max_new_tokens=LLM_MAX_NEW_TOKENS)
+    raise ValueError(f"Unknown LLM_BACKEND: {kind}")
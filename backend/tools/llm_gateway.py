@@ -0,0 +1,272 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from contextvars import ContextVar
+from backend.config import (
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE,
+    LLM_CACHE_TTL, LLM_CACHE_SIZE, LLM_MAX_RETRIES,
+)
+from backend.src.metrics import llm_call, record_cache
+from backend.src.cancellation import check_cancelled
+from backend.tools.llm_backend import create_llm_backend
+
+################################################
+# SHARED LLM GATEWAY
+################################################
+# Every single-prompt LLM call in the backend (concepts, intent, source
+# parsing) goes through one gateway, which provides:
+#   * request- and token-per-minute buckets shared by all callers,
+#   * priorities, so INTERACTIVE calls get the next free slot ahead of
+#     BACKGROUND ones (write-behind queue, bulk ingest),
+#   * single-flight coalescing, so concurrent identical prompts share one call,
+#   * a TTL cache of prompt -> response (calls run at temperature 0),
+#   * retries with full-jitter exponential backoff on rate limits and
+#     transient API errors.
+# Prompts are answered by the backend selected in llm_backend.py.
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# How often a caller waiting on another caller's identical prompt checks
+# whether its own search was cancelled
+FOLLOWER_POLL_SECONDS = 0.25
+
+
+class _LeaderAbandoned(Exception):
+    """The call a follower was waiting on stopped for the leader's own reasons (e.g. its search was cancelled)."""
+
+_priority = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority):
+    """Sets the default priority for gateway calls made in the enclosed block."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_tokens(prompt):
+    # ~4 characters per token is close enough for budgeting
+    return max(1, len(prompt) // 4)
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill()
+        # A request larger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+
+class TTLCache:
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _is_retryable(error):
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(error, (
+        openai.RateLimitError, openai.APIConnectionError,
+        openai.APITimeoutError, openai.InternalServerError,
+    ))
+
+
+class LLMGateway:
+    def __init__(self, backend, requests_per_minute, tokens_per_minute, cache_ttl, cache_size,
+                 max_retries=4, backoff_base=0.5, backoff_cap=20.0):
+        self.backend = backend
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.cache = TTLCache(cache_ttl, cache_size)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._lock = threading.Condition()
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._inflight = {}
+
+    ################################################
+    # SCHEDULING
+    ################################################
+    def _acquire(self, priority, tokens):
+        """Blocks until this call is first in line and both buckets have room."""
+        ticket = (priority, next(self._seq))
+        with self._lock:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                        if wait == 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            return
+                        self._lock.wait(timeout=wait)
+                    else:
+                        self._lock.wait()
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._lock.notify_all()
+
+    def _call(self, prompt, caller, model, temperature, priority):
+        for attempt in range(self.max_retries + 1):
+            self._acquire(priority, estimate_tokens(prompt))
+            try:
+                with llm_call(caller, self.backend.model_name(model)):
+                    return self.backend.invoke(prompt, model, temperature)
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                print(f"LLM call from {caller} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+    ################################################
+    # PUBLIC API
+    ################################################
+    def complete(self, prompt, caller, model="gpt-4o-mini", temperature=0, priority=None, use_cache=True):
+        """
+        Runs one prompt through the shared scheduler.
+
+        Args:
+            prompt: Fully formatted prompt text.
+            caller: Name used for metrics and logs.
+            priority: INTERACTIVE or BACKGROUND; defaults to the llm_priority() context.
+            use_cache: Serve and store the response via the prompt cache.
+
+        Returns:
+            The response text.
+        """
+        priority = _priority.get() if priority is None else priority
+        key = (self.backend.model_name(model), temperature, prompt)
+
+        if use_cache:
+            cached = self.cache.get(key)
+            record_cache("llm_prompt", cached is not None)
+            if cached is not None:
+                return cached
+
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = self._inflight[key] = Future()
+
+            if leader:
+                return self._lead(future, key, prompt, caller, model, temperature, priority, use_cache)
+            try:
+                return self._follow(future)
+            except _LeaderAbandoned:
+                # Make the call ourselves (or follow whoever leads it now)
+                continue
+
+    def _lead(self, future, key, prompt, caller, model, temperature, priority, use_cache):
+        try:
+            result = self._call(prompt, caller, model, temperature, priority)
+            if use_cache:
+                self.cache.put(key, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException as e:
+            # SearchCancelled/KeyboardInterrupt concern this caller only:
+            # followers must not hang on the future or inherit the cancellation
+            future.set_exception(_LeaderAbandoned(repr(e)))
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    @staticmethod
+    def _follow(future):
+        while True:
+            try:
+                return future.result(timeout=FOLLOWER_POLL_SECONDS)
+            except FutureTimeout:
+                check_cancelled()
+
+    def complete_many(self, prompts, caller, max_concurrency=8, **kwargs):
+        """complete() for a list of prompts, keeping their order."""
+        if not prompts:
+            return []
+        priority = kwargs.pop("priority", None)
+        priority = _priority.get() if priority is None else priority
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return list(pool.map(lambda p: self.complete(p, caller, priority=priority, **kwargs), prompts))
+
+
+# Global variable to hold the gateway shared by every caller in the process
+GATEWAY = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    global GATEWAY
+    if GATEWAY is None:
+        with _gateway_lock:
+            if GATEWAY is None:
+                GATEWAY = LLMGateway(
+                    create_llm_backend(), LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE,
+                    LLM_CACHE_TTL, LLM_CACHE_SIZE, max_retries=LLM_MAX_RETRIES,
+                )
+    return GATEWAY
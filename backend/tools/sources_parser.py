@@ -1,15 +1,9 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from backend.MCP.researchcrew import run as run_research
 from backend.MCP.newscrew import run as run_news
-from dotenv import load_dotenv
-import os
-
-
-load_dotenv()
-
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+from backend.src.tracing import span
+from backend.src.cancellation import check_cancelled
+from backend.tools.llm_gateway import get_gateway
 
 
 def get_titles(json):
@@ -26,11 +20,7 @@ def get_titles(json):
     Concept:"""
     )
 
-    llm = ChatOpenAI(model='gpt-4o-mini', temperature=0, api_key=OPENAI_API_KEY)
-    concept_chain = LLMChain(llm=llm, prompt=prompt)
-    result = concept_chain.run({'input':json})
-
-    return result
+    return get_gateway().complete(prompt.format(input=json), caller='get_titles')
 
 
 def get_links(json):
@@ -47,11 +37,7 @@ def get_links(json):
     Concept:"""
     )
 
-    llm = ChatOpenAI(model='gpt-4o-mini', temperature=0, api_key=OPENAI_API_KEY)
-    concept_chain = LLMChain(llm=llm, prompt=prompt)
-    result = concept_chain.run({'input':json})
-
-    return result
+    return get_gateway().complete(prompt.format(input=json), caller='get_links')
 
 def get_snipped(json):
     prompt = PromptTemplate.from_template(
@@ -67,20 +53,21 @@ def get_snipped(json):
     Concept:"""
     )
 
-    llm = ChatOpenAI(model='gpt-4o-mini', temperature=0, api_key=OPENAI_API_KEY)
-    concept_chain = LLMChain(llm=llm, prompt=prompt)
-    result = concept_chain.run({'input':json})
-
-    return result
+    return get_gateway().complete(prompt.format(input=json), caller='get_snipped')
 
 
 def consolidate(query, func):
-    json = func(query)
+    with span("crew.run", crew=getattr(func, '__module__', '')):
+        json = func(query)
 
     retlist = []
-    titles = get_titles(json).split('/')
-    links = get_links(json).split(' ')
-    snippets = get_snipped(json).split('//')
+    check_cancelled()
+    with span("consolidate.titles"):
+        titles = get_titles(json).split('/')
+    with span("consolidate.links"):
+        links = get_links(json).split(' ')
+    with span("consolidate.snippets"):
+        snippets = get_snipped(json).split('//')
 
     for i in range(len(titles)):
         retlist.append({
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Tokenize-once data pipeline for roberta.py.
+
+The ORCAS-I TSV is read straight into Arrow (never into pandas as a whole),
+tokenized in bulk with the fast tokenizer and written to an on-disk cache.
+Later runs memory-map that cache, so a retrain starts training immediately.
+The cache records what it was built from (TSV size and mtime, tokenizer,
+max_len, split and sample) and is rebuilt when any of that changes.
+Sequences are stored unpadded; padding happens per batch in the collator and
+batches are grouped by length (TrainingArguments(group_by_length=True)).
+"""
+
+import json
+import os
+import shutil
+from datasets import load_dataset, load_from_disk, DatasetDict
+from transformers import DataCollatorWithPadding
+
+TEXT_COLUMN = "query"
+LABEL_COLUMN = "level_1"
+PARAMS_FILE = "cache_params.json"
+
+
+def _drop_duplicates(dataset):
+    seen = set()
+
+    def first_occurrence(example):
+        key = (example[TEXT_COLUMN], example[LABEL_COLUMN])
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    # Single process on purpose: `seen` must be shared across all rows
+    return dataset.filter(first_occurrence)
+
+
+def cache_params(tsv_path, tokenizer, max_len=32, test_size=0.1, seed=42, sample=None):
+    """Everything the cached token ids depend on, as a JSON-serialisable dict."""
+    stat = os.stat(tsv_path)
+    return {
+        "tsv": os.path.abspath(tsv_path),
+        "tsv_size": stat.st_size,
+        "tsv_mtime": stat.st_mtime,
+        "tokenizer": tokenizer.name_or_path,
+        "vocab_size": len(tokenizer),
+        "max_len": max_len,
+        "test_size": test_size,
+        "seed": seed,
+        "sample": sample,
+    }
+
+
+def build_token_cache(tsv_path, cache_dir, tokenizer, max_len=32, test_size=0.1, seed=42, num_proc=None,
+                      sample=None):
+    """
+    Reads the TSV, cleans it, splits it, tokenizes it once and saves the
+    result as a memory-mappable Arrow DatasetDict in `cache_dir`.
+    With `sample`, only that many random rows are cleaned and tokenized.
+
+    Returns:
+        (DatasetDict with "train"/"validation", list of label names in id order)
+    """
+    raw = load_dataset(
+        "csv",
+        data_files=tsv_path,
+        delimiter="\t",
+        usecols=[TEXT_COLUMN, LABEL_COLUMN],
+        split="train",
+    )
+    if sample is not None:
+        # Before any per-row work, so a smoke run never touches the full set
+        raw = raw.shuffle(seed=seed).select(range(min(sample, len(raw)))).flatten_indices()
+    raw = raw.filter(lambda ex: ex[TEXT_COLUMN] is not None and ex[LABEL_COLUMN] is not None, num_proc=num_proc)
+    raw = _drop_duplicates(raw)
+
+    # Same ids as sklearn's LabelEncoder (sorted class names)
+    raw = raw.class_encode_column(LABEL_COLUMN).rename_column(LABEL_COLUMN, "label")
+    label_names = raw.features["label"].names
+
+    splits = raw.train_test_split(test_size=test_size, stratify_by_column="label", seed=seed)
+
+    def tokenize(batch):
+        encodings = tokenizer(batch[TEXT_COLUMN], truncation=True, max_length=max_len)
+        encodings["length"] = [len(ids) for ids in encodings["input_ids"]]
+        return encodings
+
+    tokenized = DatasetDict({
+        "train": splits["train"],
+        "validation": splits["test"],
+    }).map(tokenize, batched=True, batch_size=10_000, num_proc=num_proc, remove_columns=[TEXT_COLUMN])
+
+    tokenized.save_to_disk(cache_dir)
+    params = cache_params(tsv_path, tokenizer, max_len=max_len, test_size=test_size, seed=seed, sample=sample)
+    with open(os.path.join(cache_dir, PARAMS_FILE), "w") as f:
+        json.dump(params, f, indent=2)
+    return tokenized, label_names
+
+
+def load_token_cache(tsv_path, cache_dir, tokenizer, max_len=32, test_size=0.1, seed=42, num_proc=None,
+                     sample=None):
+    """
+    Returns the cached DatasetDict if `cache_dir` holds one built from the same
+    inputs (memory-mapped from disk), otherwise (re)builds it first.
+
+    Returns:
+        (DatasetDict with "train"/"validation", list of label names in id order)
+    """
+    params = cache_params(tsv_path, tokenizer, max_len=max_len, test_size=test_size, seed=seed, sample=sample)
+    if os.path.isdir(cache_dir):
+        params_path = os.path.join(cache_dir, PARAMS_FILE)
+        cached = None
+        if os.path.exists(params_path):
+            with open(params_path) as f:
+                cached = json.load(f)
+        if cached == params:
+            tokenized = load_from_disk(cache_dir)
+            print(f"Loaded token cache from {cache_dir}")
+            return tokenized, tokenized["train"].features["label"].names
+
+        changed = sorted(k for k in params if cached is None or cached.get(k) != params[k])
+        print(f"Token cache in {cache_dir} is stale ({', '.join(changed)} changed); rebuilding...")
+        shutil.rmtree(cache_dir)
+    else:
+        print(f"Building token cache in {cache_dir} (one-time)...")
+
+    return build_token_cache(tsv_path, cache_dir, tokenizer, max_len=max_len, test_size=test_size, seed=seed,
+                             num_proc=num_proc, sample=sample)
+
+
+def make_collator(tokenizer):
+    """Pads each batch to its own longest sequence (rounded for tensor cores)."""
+    return DataCollatorWithPadding(tokenizer, pad_to_multiple_of=8)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""Configurable fine-tuning entry point for the RoBERTa intent classifier.
+
+Usage:
+    python train.py --tsv ORCAS-I-2M.tsv                 # full run
+    python train.py --tsv ORCAS-I-2M.tsv --smoke         # quick CPU sanity check
+    python train.py --tsv ORCAS-I-2M.tsv --resume auto   # continue the last run
+
+Training stops early once validation macro-F1 stops improving, keeps only the
+best/latest few checkpoints and uses bf16/fp16 when the GPU supports it.
+"""
+
+import argparse
+import os
+import numpy as np
+import torch
+from sklearn.metrics import accuracy_score, f1_score
+from transformers import (
+    EarlyStoppingCallback,
+    RobertaForSequenceClassification,
+    RobertaTokenizerFast,
+    Trainer,
+    TrainingArguments,
+)
+from transformers.trainer_utils import get_last_checkpoint
+from data_pipeline import load_token_cache, make_collator
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fine-tune RoBERTa on ORCAS-I intents.")
+    parser.add_argument("--tsv", default="ORCAS-I-2M.tsv")
+    parser.add_argument("--cache-dir", default="orcas_token_cache")
+    parser.add_argument("--output-dir", default=None,
+                        help="Default ./results, or ./results-smoke with --smoke")
+    parser.add_argument("--model", default="roberta-base")
+    parser.add_argument("--max-len", type=int, default=32)
+    parser.add_argument("--epochs", type=float, default=5)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--eval-batch-size", type=int, default=64)
+    parser.add_argument("--grad-accum", type=int, default=1, help="Gradient accumulation steps")
+    parser.add_argument("--lr", type=float, default=2e-5)
+    parser.add_argument("--warmup-ratio", type=float, default=0.06)
+    parser.add_argument("--weight-decay", type=float, default=0.01)
+    parser.add_argument("--precision", choices=["auto", "bf16", "fp16", "fp32"], default="auto")
+    parser.add_argument("--eval-steps", type=int, default=None,
+                        help="Evaluate/save every N steps instead of every epoch")
+    parser.add_argument("--early-stopping-patience", type=int, default=2,
+                        help="Evaluations without macro-F1 improvement before stopping (0 disables)")
+    parser.add_argument("--save-total-limit", type=int, default=2)
+    parser.add_argument("--resume", default=None,
+                        help="Checkpoint path, or 'auto' for the latest one in --output-dir")
+    parser.add_argument("--smoke", action="store_true",
+                        help="Train briefly on a small sample; runs on CPU in minutes. Uses its own "
+                             "token cache and output dir so it never mixes with a full run")
+    parser.add_argument("--smoke-samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def precision_flags(precision):
+    """Returns TrainingArguments kwargs for the requested mixed precision."""
+    if precision == "auto":
+        if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+            precision = "bf16"
+        elif torch.cuda.is_available():
+            precision = "fp16"
+        else:
+            precision = "fp32"
+
+    print(f"Training precision: {precision}")
+    return {"bf16": precision == "bf16", "fp16": precision == "fp16"}
+
+
+def compute_metrics(eval_pred):
+    logits, labels = eval_pred
+    predictions = np.argmax(logits, axis=-1)
+    return {
+        "accuracy": accuracy_score(labels, predictions),
+        "macro_f1": f1_score(labels, predictions, average="macro"),
+    }
+
+
+def resolve_resume(resume, output_dir):
+    if resume != "auto":
+        return resume
+    if os.path.isdir(output_dir):
+        return get_last_checkpoint(output_dir)
+    return None
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.output_dir is None:
+        args.output_dir = "./results-smoke" if args.smoke else "./results"
+    cache_dir = args.cache_dir
+    sample = None
+    if args.smoke:
+        # Sampled before tokenizing; train + validation rows
+        sample = args.smoke_samples + args.smoke_samples // 4
+        cache_dir = f"{args.cache_dir}-smoke-{sample}"
+
+    tokenizer = RobertaTokenizerFast.from_pretrained(args.model)
+    tokenized, label_names = load_token_cache(
+        args.tsv, cache_dir, tokenizer, max_len=args.max_len, test_size=0.2 if args.smoke else 0.1,
+        seed=args.seed, sample=sample
+    )
+    label_map = {name: i for i, name in enumerate(label_names)}
+    print("Label mapping:", label_map)
+
+    train_dataset = tokenized["train"]
+    val_dataset = tokenized["validation"]
+    if args.smoke:
+        args.epochs = 1
+        args.precision = "fp32"
+
+    model = RobertaForSequenceClassification.from_pretrained(
+        args.model,
+        num_labels=len(label_names),
+        id2label=dict(enumerate(label_names)),
+        label2id=label_map
+    )
+
+    strategy = "steps" if args.eval_steps else "epoch"
+    training_args = TrainingArguments(
+        output_dir=args.output_dir,
+        num_train_epochs=args.epochs,
+        per_device_train_batch_size=args.batch_size,
+        per_device_eval_batch_size=args.eval_batch_size,
+        gradient_accumulation_steps=args.grad_accum,
+        learning_rate=args.lr,
+        warmup_ratio=args.warmup_ratio,
+        weight_decay=args.weight_decay,
+        eval_strategy=strategy,
+        save_strategy=strategy,
+        eval_steps=args.eval_steps,
+        save_steps=args.eval_steps,
+        save_total_limit=args.save_total_limit,
+        load_best_model_at_end=True,
+        metric_for_best_model="macro_f1",
+        greater_is_better=True,
+        logging_dir=os.path.join(args.output_dir, "logs"),
+        logging_steps=10 if args.smoke else 100,
+        # Length-bucketed batches + dynamic padding instead of padding='max_length'
+        group_by_length=True,
+        length_column_name="length",
+        dataloader_num_workers=0 if args.smoke else 2,
+        seed=args.seed,
+        **precision_flags(args.precision)
+    )
+
+    callbacks = []
+    if args.early_stopping_patience > 0:
+        callbacks.append(EarlyStoppingCallback(early_stopping_patience=args.early_stopping_patience))
+
+    trainer = Trainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=val_dataset,
+        tokenizer=tokenizer,
+        data_collator=make_collator(tokenizer),
+        compute_metrics=compute_metrics,
+        callbacks=callbacks
+    )
+
+    trainer.train(resume_from_checkpoint=resolve_resume(args.resume, args.output_dir))
+
+    # The best checkpoint (by macro-F1) is what the backend serves
+    best_dir = os.path.join(args.output_dir, "best")
+    trainer.save_model(best_dir)
+    tokenizer.save_pretrained(best_dir)
+    print(f"Saved best model to {best_dir}")
+    print(trainer.evaluate())
+
+
+if __name__ == "__main__":
+    main()